@@ -0,0 +1,135 @@
+"""
+Adaptive scrape cadence
+Works out how often each source should be scraped from how often it actually changes
+"""
+from collections import deque
+from typing import Deque, Dict, Iterable, Tuple
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+# Absolute bounds on any source's interval, in minutes
+MIN_INTERVAL_MINUTES = float(os.getenv("SCRAPE_MIN_INTERVAL_MINUTES", "15"))
+MAX_INTERVAL_MINUTES = float(os.getenv("SCRAPE_MAX_INTERVAL_MINUTES", "720"))
+# Number of recent runs used to judge how volatile a source is
+HISTORY_SIZE = int(os.getenv("SCRAPE_CADENCE_HISTORY", "6"))
+# Chromium minutes all browser-backed sources together may spend per hour
+BROWSER_MINUTES_PER_HOUR = float(os.getenv("SCRAPE_BROWSER_MINUTES_PER_HOUR", "10"))
+
+
+class SourceCadence:
+    """Recent change history and current interval for one source"""
+
+    def __init__(self, base_minutes: float, uses_browser: bool = False):
+        """
+        Initialize a source cadence
+
+        Args:
+            base_minutes: Interval used until the source has some history
+            uses_browser: Whether runs count against the browser-minutes budget
+        """
+        self.base_minutes = min(max(base_minutes, MIN_INTERVAL_MINUTES), MAX_INTERVAL_MINUTES)
+        self.uses_browser = uses_browser
+        self.changes: Deque[int] = deque(maxlen=HISTORY_SIZE)
+        self.durations: Deque[float] = deque(maxlen=HISTORY_SIZE)
+
+    def record(self, changes: int, duration: float):
+        """Record one successful run: postings added plus postings removed, and wall time in seconds"""
+        self.changes.append(changes)
+        self.durations.append(duration)
+
+    @property
+    def volatility(self) -> float:
+        """Fraction of recent runs that found new or removed postings"""
+        if not self.changes:
+            return 0.0
+        return sum(1 for c in self.changes if c > 0) / len(self.changes)
+
+    @property
+    def average_minutes(self) -> float:
+        """Average wall time of recent runs, in minutes"""
+        if not self.durations:
+            return 0.0
+        return sum(self.durations) / len(self.durations) / 60
+
+    def desired_minutes(self) -> float:
+        """
+        Interval this source would like, ignoring the browser budget
+
+        Always-changing sources head towards MIN_INTERVAL_MINUTES and never-changing ones towards
+        MAX_INTERVAL_MINUTES (geometrically, so halving and doubling are symmetric). With only a
+        few runs of history the result stays close to the base interval.
+        """
+        target = MAX_INTERVAL_MINUTES * (MIN_INTERVAL_MINUTES / MAX_INTERVAL_MINUTES) ** self.volatility
+        weight = len(self.changes) / HISTORY_SIZE
+        return math.exp((1 - weight) * math.log(self.base_minutes) + weight * math.log(target))
+
+
+class CadencePlanner:
+    """Keeps a cadence per source and balances browser-backed sources against the hourly budget"""
+
+    def __init__(self, browser_minutes_per_hour: float = BROWSER_MINUTES_PER_HOUR):
+        self.browser_minutes_per_hour = browser_minutes_per_hour
+        self.sources: Dict[str, SourceCadence] = {}
+
+    def register(self, key: str, base_minutes: float, uses_browser: bool = False):
+        """Start tracking a source (no-op if it is already tracked)"""
+        if key not in self.sources:
+            self.sources[key] = SourceCadence(base_minutes, uses_browser)
+
+    def record(self, key: str, changes: int, duration: float):
+        """Record a successful run for a tracked source"""
+        if key in self.sources:
+            self.sources[key].record(changes, duration)
+
+    def seed(self, key: str, runs: Iterable[Tuple[int, float]]):
+        """Replace a tracked source's history with (changes, duration) of past runs, oldest first"""
+        cadence = self.sources.get(key)
+        if cadence is None:
+            return
+        cadence.changes.clear()
+        cadence.durations.clear()
+        for changes, duration in runs:
+            cadence.record(changes, duration)
+
+    def intervals(self) -> Dict[str, float]:
+        """
+        Current interval for every tracked source, in minutes
+
+        Browser-backed intervals are stretched together when their projected Chromium time would
+        exceed the hourly budget, so volatile sources still get a larger share than static ones.
+        """
+        intervals = {key: cadence.desired_minutes() for key, cadence in self.sources.items()}
+
+        browser_cost = sum(
+            cadence.average_minutes * 60 / intervals[key]
+            for key, cadence in self.sources.items()
+            if cadence.uses_browser
+        )
+        if self.browser_minutes_per_hour > 0 and browser_cost > self.browser_minutes_per_hour:
+            stretch = browser_cost / self.browser_minutes_per_hour
+            for key, cadence in self.sources.items():
+                if cadence.uses_browser:
+                    intervals[key] = min(intervals[key] * stretch, MAX_INTERVAL_MINUTES)
+            logger.info(
+                f"Browser scrapes projected at {browser_cost:.1f} min/hour, "
+                f"stretching browser intervals x{stretch:.2f}"
+            )
+
+        return intervals
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-source cadence state, for logging and the API"""
+        intervals = self.intervals()
+        return {
+            key: {
+                "interval_minutes": round(intervals[key], 1),
+                "base_minutes": cadence.base_minutes,
+                "volatility": round(cadence.volatility, 2),
+                "average_run_minutes": round(cadence.average_minutes, 2),
+                "uses_browser": cadence.uses_browser,
+            }
+            for key, cadence in self.sources.items()
+        }
@@ -0,0 +1,288 @@
+"""
+Job detail enrichment
+Fetches the detail page (or detail API response) of new and changed jobs and stores their descriptions
+in job_descriptions. Runs in the scheduler leader next to the scrape queue, so listings are stored as
+soon as they are scraped and details follow in the background.
+
+A job is pending when its listing_hash (recorded by app/ingest.py on every scrape) differs from the
+enriched_hash its details were fetched for; an unchanged listing is never fetched twice.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import bindparam, or_, update
+
+from app.ingest import store_descriptions
+from app.sources import SOURCES
+from models import JobEnrichment, JobPosting
+from models.database import SessionLocal
+from scrapers.browser_pool import browser_pool
+from scrapers.http_client import borrow_client
+from scrapers.job_details import parse_job_page
+from scrapers.parse_pool import parse_html
+from scrapers.resilience import get_with_retries, goto_with_retries
+from scrapers.resource_blocking import block_resources
+from scrapers.stats import ScrapeStats, current_stats, increment, record_page
+
+logger = logging.getLogger(__name__)
+
+# Turn the enrichment stage off entirely (listings are still recorded as pending)
+ENRICH_ENABLED = os.getenv("ENRICH_ENABLED", "true").lower() == "true"
+# Pending jobs picked up per pass
+ENRICH_BATCH_SIZE = int(os.getenv("ENRICH_BATCH_SIZE", "200"))
+# Detail fetches in flight at once, across all hosts
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+# Detail fetches in flight at once against a single host
+ENRICH_HOST_CONCURRENCY = int(os.getenv("ENRICH_HOST_CONCURRENCY", "2"))
+# Fetched details written back per UPDATE batch
+ENRICH_WRITE_BATCH = int(os.getenv("ENRICH_WRITE_BATCH", "25"))
+# Failed fetches of one listing before it is left alone until the listing changes
+ENRICH_MAX_ATTEMPTS = int(os.getenv("ENRICH_MAX_ATTEMPTS", "3"))
+# How often the worker looks for pending jobs when no scrape wakes it
+ENRICH_POLL_SECONDS = float(os.getenv("ENRICH_POLL_SECONDS", "600"))
+
+# (job ID, URL, listing_hash) of one pending job
+PendingJob = Tuple[str, str, str]
+
+
+def _pending_jobs(limit: int) -> List[PendingJob]:
+    """
+    Active jobs whose details were never fetched or were fetched for an older listing, oldest change first
+
+    Args:
+        limit: Maximum number of jobs to return
+
+    Returns:
+        List of (job ID, URL, listing_hash)
+    """
+    db = SessionLocal()
+    try:
+        rows = db.query(JobEnrichment.job_id, JobPosting.url, JobEnrichment.listing_hash).join(
+            JobPosting, JobPosting.id == JobEnrichment.job_id
+        ).filter(
+            JobPosting.is_active.is_(True),
+            or_(
+                JobEnrichment.enriched_hash.is_(None),
+                JobEnrichment.enriched_hash != JobEnrichment.listing_hash
+            ),
+            JobEnrichment.attempts < ENRICH_MAX_ATTEMPTS
+        ).order_by(JobEnrichment.updated_at).limit(limit).all()
+        return [tuple(row) for row in rows]
+    finally:
+        db.close()
+
+
+def _has_detail_page(url: str) -> bool:
+    """Whether a job URL points at a posting (Google's placeholder link is the careers home page)"""
+    return urlsplit(url).path not in ("", "/")
+
+
+async def _fetch_page(url: str) -> Optional[str]:
+    """Description from a job page fetched over HTTP"""
+    async with borrow_client("html") as client:
+        response = await get_with_retries(client, url)
+        record_page(len(response.content))
+        return await parse_html(parse_job_page, response.text)
+
+
+async def _fetch_rendered_page(url: str) -> Optional[str]:
+    """Description from a job page rendered in a browser pool tab"""
+    async with browser_pool.page() as page:
+        await block_resources(page)
+        await goto_with_retries(page, url, wait_until="networkidle", timeout=30000)
+        html = await page.content()
+        record_page(len(html))
+    return await parse_html(parse_job_page, html)
+
+
+async def fetch_description(job_id: str, url: str) -> Optional[str]:
+    """
+    Fetch the description of one job the way its source serves details
+
+    Args:
+        job_id: Job ID (source key prefix included)
+        url: Job URL
+
+    Returns:
+        Plain text description, or None when the detail page has none
+
+    Raises:
+        KeyError: If the job's source is not registered
+    """
+    key, native_id = job_id.split("_", 1)
+    source = SOURCES[key]
+    if source.details == "api":
+        return await source.create_scraper().fetch_job_detail(native_id)
+    if source.details == "browser":
+        return await _fetch_rendered_page(url)
+    return await _fetch_page(url)
+
+
+def _write_results(enriched: List[Tuple[str, str, Optional[str]]], failed: List[Tuple[str, str, str]]):
+    """
+    Store one batch of fetched descriptions and failures
+
+    Args:
+        enriched: (job ID, listing_hash fetched for, description or None)
+        failed: (job ID, listing_hash fetched for, error)
+    """
+    now = datetime.utcnow()
+    state = JobEnrichment.__table__
+    db = SessionLocal()
+    try:
+        with db.begin():
+            store_descriptions(
+                db, {job_id: description for job_id, _, description in enriched if description}, updated_at=now
+            )
+            if enriched:
+                # Matching the hash too: a listing that changed meanwhile stays pending
+                db.execute(
+                    update(state).where(
+                        state.c.job_id == bindparam("b_id"),
+                        state.c.listing_hash == bindparam("b_hash")
+                    ).values(enriched_hash=state.c.listing_hash, attempts=0, last_error=None, enriched_at=now),
+                    [{"b_id": job_id, "b_hash": digest} for job_id, digest, _ in enriched]
+                )
+            if failed:
+                db.execute(
+                    update(state).where(
+                        state.c.job_id == bindparam("b_id"),
+                        state.c.listing_hash == bindparam("b_hash")
+                    ).values(attempts=state.c.attempts + 1, last_error=bindparam("b_error"), updated_at=now),
+                    [{"b_id": job_id, "b_hash": digest, "b_error": error[:1000]} for job_id, digest, error in failed]
+                )
+    finally:
+        db.close()
+
+
+async def enrich_pending_jobs(limit: Optional[int] = None) -> Dict:
+    """
+    Fetch details of up to `limit` pending jobs and write them back in batches
+
+    Fetches run ENRICH_CONCURRENCY at a time overall and ENRICH_HOST_CONCURRENCY at a time per host.
+    A failed fetch is retried on later passes until ENRICH_MAX_ATTEMPTS, or until the listing changes.
+
+    Args:
+        limit: Pending jobs to pick up (default ENRICH_BATCH_SIZE)
+
+    Returns:
+        Summary dict with keys: pending, enriched, empty, skipped, failed, duration, plus fetch stats
+    """
+    start = time.monotonic()
+    pending = await asyncio.to_thread(_pending_jobs, limit or ENRICH_BATCH_SIZE)
+    summary = {"pending": len(pending), "enriched": 0, "empty": 0, "skipped": 0, "failed": 0}
+    if not pending:
+        return {**summary, "duration": 0.0}
+
+    stats = ScrapeStats()
+    stats_token = current_stats.set(stats)
+    overall = asyncio.Semaphore(max(1, ENRICH_CONCURRENCY))
+    hosts: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(max(1, ENRICH_HOST_CONCURRENCY)))
+    enriched: List[Tuple[str, str, Optional[str]]] = []
+    failed: List[Tuple[str, str, str]] = []
+    writes: List[asyncio.Task] = []
+
+    def flush(force: bool = False):
+        # Hand full batches to a thread so fetching continues while they are written
+        if len(enriched) + len(failed) >= ENRICH_WRITE_BATCH or (force and (enriched or failed)):
+            writes.append(asyncio.create_task(asyncio.to_thread(_write_results, enriched.copy(), failed.copy())))
+            enriched.clear()
+            failed.clear()
+
+    async def enrich(job: PendingJob):
+        job_id, url, digest = job
+        if not _has_detail_page(url):
+            # Nothing to fetch; mark the listing done so it isn't picked up again
+            summary["skipped"] += 1
+            enriched.append((job_id, digest, None))
+            flush()
+            return
+
+        async with hosts[urlsplit(url).hostname], overall:
+            try:
+                description = await fetch_description(job_id, url)
+            except Exception as e:
+                summary["failed"] += 1
+                increment("detail_fetch_failures")
+                logger.warning(f"Could not fetch details of {job_id}: {e}")
+                failed.append((job_id, digest, str(e) or type(e).__name__))
+                flush()
+                return
+
+        summary["enriched" if description else "empty"] += 1
+        enriched.append((job_id, digest, description))
+        flush()
+
+    try:
+        await asyncio.gather(*(enrich(job) for job in pending))
+        flush(force=True)
+        await asyncio.gather(*writes)
+    finally:
+        current_stats.reset(stats_token)
+
+    summary["duration"] = round(time.monotonic() - start, 2)
+    summary.update(stats.to_dict())
+    logger.info(
+        f"Enriched {summary['enriched']} of {summary['pending']} pending job(s) in {summary['duration']:.1f}s "
+        f"({summary['empty']} without a description, {summary['skipped']} skipped, {summary['failed']} failed)"
+    )
+    return summary
+
+
+class EnrichmentWorker:
+    """Works through pending jobs in the scheduler leader process, one pass at a time"""
+
+    def __init__(self):
+        self._poll_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._poll_task is not None
+
+    def start(self):
+        """Start enriching pending jobs (call from the event loop, in the leader only)"""
+        if self.running or not ENRICH_ENABLED:
+            return
+        self._wakeup = asyncio.Event()
+        self._poll_task = asyncio.create_task(self._poll())
+        logger.info("Enrichment worker started")
+
+    def notify(self):
+        """Wake the worker now instead of at the next poll (e.g., after a scrape stored new listings)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Stop after cancelling the pass in progress; its unwritten results are fetched again next time"""
+        if self._poll_task is None:
+            return
+        self._poll_task.cancel()
+        await asyncio.gather(self._poll_task, return_exceptions=True)
+        self._poll_task = None
+        self._wakeup = None
+        logger.info("Enrichment worker stopped")
+
+    async def _poll(self):
+        while True:
+            try:
+                # Keep going while full batches come back; a short one means the backlog is drained
+                while (await enrich_pending_jobs())["pending"] >= ENRICH_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                logger.error(f"Error enriching job details: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=ENRICH_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+enrichment_worker = EnrichmentWorker()
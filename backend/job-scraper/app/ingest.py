@@ -0,0 +1,430 @@
+"""
+Job ingestion
+The single code path that writes scraped job records into job_postings
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+import logging
+import os
+
+from models import JobDescription, JobEnrichment, JobPosting
+from models.job_description import description_row
+from models.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Jobs per existence lookup and upsert batch
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+# Pages of scraped jobs buffered for the writer before scrapers have to wait
+INGEST_QUEUE_PAGES = int(os.getenv("INGEST_QUEUE_PAGES", "16"))
+
+
+def source_key(job_id: str) -> str:
+    """Source key a job ID belongs to (job IDs are prefixed with their source key, e.g. rbc_12345)"""
+    return job_id.split("_", 1)[0]
+
+
+def _dedupe(jobs: List[Dict]) -> Dict[str, Dict]:
+    """Collapse records sharing an ID (e.g., a posting listed on two result pages); the last one wins"""
+    records: Dict[str, Dict] = {}
+    for job_data in jobs:
+        previous = records.get(job_data["id"])
+        if previous and not job_data.get("posted_date") and previous.get("posted_date"):
+            job_data = {**job_data, "posted_date": previous["posted_date"]}
+        records[job_data["id"]] = job_data
+    return records
+
+
+def listing_hash(job_data: Dict) -> str:
+    """Digest of the listing fields of a scraped job; when it changes, the job's details are fetched again"""
+    posted_date = job_data.get("posted_date")
+    fields = [
+        job_data.get("title"),
+        job_data.get("team"),
+        job_data.get("location"),
+        job_data.get("url"),
+        posted_date.isoformat() if isinstance(posted_date, datetime) else posted_date,
+    ]
+    return hashlib.sha256("\x1f".join(str(field or "") for field in fields).encode()).hexdigest()
+
+
+def _upsert_for(db: Session):
+    """Dialect-specific insert() supporting ON CONFLICT, or None when the database has none"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    return None
+
+
+def record_listings(db: Session, jobs: List[Dict], seen_at: datetime):
+    """
+    Queue new and changed listings for detail enrichment (app/enrichment.py). Does not commit.
+
+    Stores each job's listing_hash in job_enrichment; a job whose hash differs from the one its details
+    were fetched for is picked up by the enrichment worker. Unchanged listings are left alone.
+
+    Args:
+        db: Database session
+        jobs: Deduplicated scraped job dictionaries
+        seen_at: Timestamp of the scrape
+    """
+    rows = [
+        {"job_id": job_data["id"], "listing_hash": listing_hash(job_data), "attempts": 0, "updated_at": seen_at}
+        for job_data in jobs
+    ]
+    if not rows:
+        return
+
+    insert = _upsert_for(db)
+    if insert is None:
+        states = {
+            state.job_id: state for state in
+            db.query(JobEnrichment).filter(JobEnrichment.job_id.in_([row["job_id"] for row in rows]))
+        }
+        for row in rows:
+            state = states.get(row["job_id"])
+            if state is None:
+                db.add(JobEnrichment(**row))
+            elif state.listing_hash != row["listing_hash"]:
+                state.listing_hash = row["listing_hash"]
+                state.attempts = 0
+                state.last_error = None
+                state.updated_at = seen_at
+        return
+
+    table = JobEnrichment.__table__
+    upsert = insert(table)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[table.c.job_id],
+        set_={
+            "listing_hash": upsert.excluded.listing_hash,
+            "attempts": 0,
+            "last_error": None,
+            "updated_at": upsert.excluded.updated_at,
+        },
+        # Rows of unchanged listings are not touched
+        where=table.c.listing_hash != upsert.excluded.listing_hash,
+    )
+    db.execute(upsert, rows)
+
+
+def store_descriptions(db: Session, descriptions: Dict[str, str], replace: bool = True, updated_at: Optional[datetime] = None):
+    """
+    Write job descriptions to job_descriptions, compressed. Does not commit.
+
+    Args:
+        db: Database session
+        descriptions: Job ID -> description text; empty descriptions are ignored
+        replace: Overwrite a stored description that differs (by content hash); otherwise only jobs
+            without one get theirs
+        updated_at: Timestamp stored with written rows (default: now)
+    """
+    updated_at = updated_at or datetime.utcnow()
+    rows = [description_row(job_id, text, updated_at) for job_id, text in descriptions.items() if text]
+    if not rows:
+        return
+
+    insert = _upsert_for(db)
+    if insert is None:
+        records = {
+            record.job_id: record for record in
+            db.query(JobDescription).filter(JobDescription.job_id.in_([row["job_id"] for row in rows]))
+        }
+        for row in rows:
+            record = records.get(row["job_id"])
+            if record is None:
+                db.add(JobDescription(**row))
+            elif replace and record.content_hash != row["content_hash"]:
+                for name, value in row.items():
+                    setattr(record, name, value)
+        return
+
+    table = JobDescription.__table__
+    upsert = insert(table)
+    if replace:
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[table.c.job_id],
+            set_={
+                name: getattr(upsert.excluded, name)
+                for name in ("codec", "content", "content_hash", "size", "updated_at")
+            },
+            # An unchanged description is not rewritten
+            where=table.c.content_hash != upsert.excluded.content_hash,
+        )
+    else:
+        upsert = upsert.on_conflict_do_nothing(index_elements=[table.c.job_id])
+    db.execute(upsert, rows)
+
+
+def _new_job_row(job_data: Dict, seen_at: datetime) -> Dict:
+    return {
+        "id": job_data["id"],
+        "company": job_data["company"],
+        "title": job_data["title"],
+        "team": job_data.get("team"),
+        "location": job_data.get("location"),
+        "url": job_data["url"],
+        "posted_date": job_data.get("posted_date"),
+        "first_seen": seen_at,
+        "last_seen": seen_at,
+        "is_active": True,
+        "scraped_count": 1,
+    }
+
+
+def store_jobs(db: Session, jobs: List[Dict], seen_at: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Insert new jobs and refresh existing ones with batched INSERT ... ON CONFLICT DO UPDATE. Does not commit.
+
+    Args:
+        db: Database session
+        jobs: Scraped job dictionaries; duplicate IDs are collapsed
+        seen_at: last_seen stamped on every stored job; pass the same value to deactivate_missing_jobs
+
+    Returns:
+        Per-source counts: {source_key: {"new": n, "updated": n}}
+    """
+    seen_at = seen_at or datetime.utcnow()
+    records = list(_dedupe(jobs).values())
+
+    insert = _upsert_for(db)
+    if insert is None:
+        return store_jobs_per_row(db, records, seen_at)
+
+    # Executed with a list of rows so the statement is compiled once and sent as a batch
+    table = JobPosting.__table__
+    upsert = insert(table)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={
+            # Never moves backwards: a concurrent run that started earlier may write after a later one
+            "last_seen": case(
+                (upsert.excluded.last_seen > table.c.last_seen, upsert.excluded.last_seen),
+                else_=table.c.last_seen
+            ),
+            "scraped_count": func.coalesce(table.c.scraped_count, 0) + 1,
+            "is_active": True,
+            # Fill posted_date if it's missing and we have it in the scraped data
+            "posted_date": func.coalesce(table.c.posted_date, upsert.excluded.posted_date),
+        }
+    )
+
+    counts: Dict[str, Dict[str, int]] = {}
+    for start in range(0, len(records), INGEST_BATCH_SIZE):
+        batch = records[start:start + INGEST_BATCH_SIZE]
+
+        # One lookup per batch, only to report new vs updated counts
+        existing_ids = {
+            job_id for (job_id,) in
+            db.query(JobPosting.id).filter(JobPosting.id.in_([job_data["id"] for job_data in batch]))
+        }
+        for job_data in batch:
+            source_counts = counts.setdefault(source_key(job_data["id"]), {"new": 0, "updated": 0})
+            if job_data["id"] in existing_ids:
+                source_counts["updated"] += 1
+            else:
+                source_counts["new"] += 1
+                logger.info(f"Added new job: {job_data['id']} - {job_data['title']}")
+
+        db.execute(upsert, [_new_job_row(job_data, seen_at) for job_data in batch])
+        # Descriptions that come with the listing (e.g., Phenom teasers) only fill in missing ones;
+        # the full description is the enrichment stage's to write
+        store_descriptions(
+            db, {job_data["id"]: job_data.get("description") for job_data in batch}, replace=False, updated_at=seen_at
+        )
+        record_listings(db, batch, seen_at)
+
+    return counts
+
+
+def store_jobs_per_row(db: Session, jobs: List[Dict], seen_at: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Row-at-a-time ORM version of store_jobs, for databases without INSERT ... ON CONFLICT. Does not commit.
+
+    Args:
+        db: Database session
+        jobs: Scraped job dictionaries; duplicate IDs are collapsed
+        seen_at: last_seen stamped on every stored job
+
+    Returns:
+        Per-source counts: {source_key: {"new": n, "updated": n}}
+    """
+    seen_at = seen_at or datetime.utcnow()
+    counts: Dict[str, Dict[str, int]] = {}
+    records = _dedupe(jobs)
+
+    for job_data in records.values():
+        job_id = job_data["id"]
+        source_counts = counts.setdefault(source_key(job_id), {"new": 0, "updated": 0})
+
+        # Check if job already exists
+        existing_job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
+
+        if existing_job:
+            # Update existing job
+            # Never moves backwards; flagged so the onupdate stamp doesn't replace an unchanged value
+            existing_job.last_seen = max(existing_job.last_seen, seen_at)
+            flag_modified(existing_job, "last_seen")
+            existing_job.scraped_count += 1
+            existing_job.is_active = True
+
+            # Update posted_date if it's missing and we have it in the scraped data
+            if not existing_job.posted_date and job_data.get("posted_date"):
+                existing_job.posted_date = job_data.get("posted_date")
+                logger.info(f"Updated posted_date for job: {job_id}")
+
+            source_counts["updated"] += 1
+            logger.debug(f"Updated existing job: {job_id}")
+        else:
+            # Create new job
+            db.add(JobPosting(**_new_job_row(job_data, seen_at)))
+            source_counts["new"] += 1
+            logger.info(f"Added new job: {job_id} - {job_data['title']}")
+
+    store_descriptions(
+        db, {job_id: job_data.get("description") for job_id, job_data in records.items()}, replace=False, updated_at=seen_at
+    )
+    record_listings(db, list(records.values()), seen_at)
+    return counts
+
+
+def deactivate_missing_jobs(db: Session, id_prefix: str, seen_at: datetime) -> int:
+    """
+    Mark active jobs of one source that this scrape did not store as inactive, in a single UPDATE. Does not commit.
+
+    Only call this for a source whose scrape succeeded and was unfiltered; otherwise its jobs keep their state.
+    Relies on last_seen being monotonic (store_jobs never moves it backwards): a filtered run of the same
+    source that started earlier but writes later would otherwise make jobs this scrape saw look missing.
+
+    Args:
+        db: Database session
+        id_prefix: Job ID prefix of the source (e.g., "rbc_")
+        seen_at: The seen_at passed to store_jobs; anything last seen before it was not in this scrape
+
+    Returns:
+        Number of deactivated jobs
+    """
+    # Flush so jobs stored in this session carry seen_at in the database before comparing against it
+    db.flush()
+    deactivated = db.query(JobPosting).filter(
+        JobPosting.is_active == True,
+        JobPosting.id.startswith(id_prefix, autoescape=True),
+        JobPosting.last_seen < seen_at
+    ).update({"is_active": False}, synchronize_session=False)
+
+    if deactivated:
+        logger.info(f"Marked {deactivated} {id_prefix.rstrip('_')} job(s) as inactive")
+    return deactivated
+
+
+class JobWriter:
+    """
+    Stores jobs as scrapers stream them in, committing a batch at a time
+
+    Scrapers put pages of jobs on a bounded queue and wait while it is full, so memory stays flat however
+    many postings a source lists. Once a source's scrape has succeeded and all of its pages are stored,
+    its missing jobs are deactivated. Database work runs in a thread to keep the event loop free.
+    """
+
+    def __init__(self, seen_at: datetime, reconcile: bool = True):
+        """
+        Args:
+            seen_at: last_seen stamped on every job written in this run
+            reconcile: Deactivate missing jobs of finished sources (off for filtered scrapes)
+        """
+        self.seen_at = seen_at
+        self.reconcile = reconcile
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_PAGES)
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.error: Optional[Exception] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name="job-writer")
+
+    async def put(self, jobs: List[Dict]):
+        """Queue a page of scraped jobs, waiting while the writer is behind"""
+        if jobs:
+            await self.queue.put(("jobs", jobs))
+
+    async def source_done(self, id_prefix: str):
+        """Mark a source as successfully scraped; queued after its last page"""
+        await self.queue.put(("done", id_prefix))
+
+    async def close(self) -> Dict[str, Dict[str, int]]:
+        """
+        Wait for everything queued to be written
+
+        Returns:
+            Per-source counts: {source_key: {"new": n, "updated": n, "deactivated": n}}
+
+        Raises:
+            Exception: The first database error the writer hit
+        """
+        await self.queue.put(None)
+        await self._task
+        if self.error is not None:
+            raise self.error
+        return self.counts
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def _source_counts(self, key: str) -> Dict[str, int]:
+        return self.counts.setdefault(key, {"new": 0, "updated": 0, "deactivated": 0})
+
+    async def _run(self):
+        db = SessionLocal()
+        try:
+            while True:
+                items = [await self.queue.get()]
+                while not self.queue.empty():
+                    items.append(self.queue.get_nowait())
+
+                # After an error keep draining so scrapers never block on a full queue
+                if self.error is None:
+                    try:
+                        await asyncio.to_thread(self._write, db, items)
+                    except Exception as e:
+                        logger.error(f"Error storing scraped jobs: {e}")
+                        self.error = e
+                        await asyncio.to_thread(db.rollback)
+
+                if items[-1] is None:
+                    return
+        finally:
+            db.close()
+
+    def _write(self, db: Session, items: List):
+        pending: List[Dict] = []
+
+        def flush():
+            for key, counts in store_jobs(db, pending, self.seen_at).items():
+                self._source_counts(key)["new"] += counts["new"]
+                self._source_counts(key)["updated"] += counts["updated"]
+            pending.clear()
+
+        for item in items:
+            if item is None:
+                continue
+            kind, value = item
+            if kind == "jobs":
+                pending.extend(value)
+            elif self.reconcile:
+                # Store the source's last pages before comparing against seen_at
+                flush()
+                key = source_key(value)
+                self._source_counts(key)["deactivated"] += deactivate_missing_jobs(db, value, self.seen_at)
+
+        flush()
+        db.commit()
@@ -0,0 +1,201 @@
+"""
+Scheduler leader election
+Makes sure only one API worker process runs the scheduler and the startup scrape
+"""
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+import asyncio
+import logging
+import os
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEADER_ELECTION_ENABLED = os.getenv("LEADER_ELECTION", "true").lower() == "true"
+# How often a standby retries the lock and the leader checks it still holds it
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "15"))
+
+
+class _AdvisoryLock:
+    """Session-level Postgres advisory lock, released automatically when the connection dies"""
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.key = zlib.crc32(name.encode())
+        self.conn = None
+
+    def acquire(self) -> bool:
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if acquired:
+            self.conn = conn
+        else:
+            conn.close()
+        return bool(acquired)
+
+    def alive(self) -> bool:
+        try:
+            self.conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"Lost leader connection: {e}")
+            self.conn = None
+            return False
+
+    def release(self):
+        if self.conn is not None:
+            try:
+                self.conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            finally:
+                self.conn.close()
+                self.conn = None
+
+
+class _FileLock:
+    """Exclusive flock on a file next to the SQLite database, released automatically when the process dies"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = None
+
+    def acquire(self) -> bool:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        return True
+
+    def alive(self) -> bool:
+        return self.fd is not None
+
+    def release(self):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+
+class _NoLock:
+    """Used when election is disabled or pointless (in-memory SQLite): this process always leads"""
+
+    def acquire(self) -> bool:
+        return True
+
+    def alive(self) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+
+class LeaderElection:
+    """
+    Elects one process as scheduler leader
+
+    PostgreSQL deployments use an advisory lock, SQLite deployments a file lock beside the database
+    file. Non-leaders stay on standby and retry every LEADER_RETRY_SECONDS, so a standby takes over
+    shortly after the leader process exits or loses its database connection.
+    """
+
+    def __init__(self, engine: Engine, name: str = "job-scraper-scheduler"):
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = self._make_lock(engine, name)
+
+    @staticmethod
+    def _make_lock(engine: Engine, name: str):
+        if not LEADER_ELECTION_ENABLED:
+            return _NoLock()
+
+        if engine.dialect.name == "postgresql":
+            return _AdvisoryLock(engine, name)
+
+        if engine.dialect.name == "sqlite":
+            database = engine.url.database
+            if not database or database == ":memory:":
+                return _NoLock()
+            if fcntl is None:
+                logger.warning("File locking unavailable on this platform, every worker will run the scheduler")
+                return _NoLock()
+            return _FileLock(os.getenv("LEADER_LOCK_FILE", f"{database}.leader.lock"))
+
+        logger.warning(f"No leader lock for {engine.dialect.name}, every worker will run the scheduler")
+        return _NoLock()
+
+    def _try_acquire(self) -> bool:
+        try:
+            self.is_leader = self._lock.acquire()
+        except Exception as e:
+            logger.error(f"Error acquiring scheduler leader lock: {e}")
+            self.is_leader = False
+        return self.is_leader
+
+    async def start(
+        self,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]]
+    ):
+        """
+        Try to become leader now, then keep watching the lock in the background
+
+        Args:
+            on_elected: Called each time this process becomes leader
+            on_demoted: Called if this process loses leadership while still running
+        """
+        if self._try_acquire():
+            logger.info(f"Process {os.getpid()} is the scheduler leader")
+            await on_elected()
+        else:
+            logger.info(f"Process {os.getpid()} is on scheduler standby")
+
+        self._task = asyncio.create_task(self._watch(on_elected, on_demoted))
+
+    async def _watch(
+        self,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]]
+    ):
+        while True:
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+            try:
+                if self.is_leader:
+                    if not self._lock.alive():
+                        self.is_leader = False
+                        logger.warning(f"Process {os.getpid()} lost scheduler leadership")
+                        await on_demoted()
+                elif self._try_acquire():
+                    logger.info(f"Process {os.getpid()} took over as scheduler leader")
+                    await on_elected()
+            except Exception as e:
+                logger.error(f"Error in leader election loop: {e}")
+
+    async def stop(self):
+        """Stop watching the lock and release it if held"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.is_leader:
+            self._lock.release()
+            self.is_leader = False
+            logger.info(f"Process {os.getpid()} released scheduler leadership")
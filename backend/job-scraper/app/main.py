@@ -1,14 +1,29 @@
 from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime, timedelta
 from typing import List, Optional
 import os
 import logging
 
-from models import JobPosting
-from models.database import get_db, init_db
-from app.scheduler import start_scheduler, scrape_and_store_jobs
+from models import JobDescription, JobEnrichment, JobPosting, ScrapeRun, ScrapeRunSource
+from models.database import SessionLocal, engine, get_db, init_db
+from app.enrichment import enrichment_worker
+from app.leader import LeaderElection
+from scrapers.http_client import close_clients
+from scrapers.browser_pool import browser_pool
+from scrapers.parse_pool import shutdown_parse_pool
+from app.scrape_queue import enqueue_scrape, queue_worker
+from app.sources import get_sources
+from app.scheduler import (
+    start_scheduler,
+    stop_scheduler,
+    get_cadence_snapshot,
+    get_last_successful_scrapes,
+    get_stale_sources,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,20 +44,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Skip the startup scrape for sources scraped successfully within this many minutes
+STARTUP_SCRAPE_MAX_AGE_MINUTES = float(os.getenv("STARTUP_SCRAPE_MAX_AGE_MINUTES", "60"))
+# /ready reports scrape data as stale once the newest successful scrape is older than this
+SCRAPE_STALE_AFTER_MINUTES = float(os.getenv("SCRAPE_STALE_AFTER_MINUTES", "180"))
+
+# Only the elected worker process scrapes; the others serve the API and stand by
+leader_election = LeaderElection(engine)
+
+# State of this process's startup scrape: standby, skipped, queued or failed (run_id tracks progress)
+initial_scrape = {"state": "standby", "run_id": None}
+
+async def run_initial_scrape():
+    """Queue a scrape of the sources whose data is missing or older than STARTUP_SCRAPE_MAX_AGE_MINUTES"""
+    stale_sources = get_stale_sources(STARTUP_SCRAPE_MAX_AGE_MINUTES)
+    if not stale_sources:
+        initial_scrape["state"] = "skipped"
+        logger.info(f"All sources scraped within {STARTUP_SCRAPE_MAX_AGE_MINUTES:.0f} minutes, skipping initial scrape")
+        return
+    
+    logger.info(f"Queueing initial scrape of: {', '.join(stale_sources)}")
+    db = SessionLocal()
+    try:
+        queued = enqueue_scrape(db, stale_sources, trigger="startup")
+        initial_scrape["state"] = "queued"
+        initial_scrape["run_id"] = queued["run"].id
+    except Exception as e:
+        initial_scrape["state"] = "failed"
+        logger.error(f"Could not queue initial scrape: {e}")
+    finally:
+        db.close()
+
+async def become_scheduler_leader():
+    """Start the scrape queue and enrichment workers and the scheduler, then queue the initial scrape in the elected process"""
+    queue_worker.start()
+    enrichment_worker.start()
+    start_scheduler()
+    logger.info("Scheduler started")
+    
+    await run_initial_scrape()
+
+async def step_down_as_scheduler_leader():
+    """Stop scheduling and running scrapes after losing leadership"""
+    stop_scheduler()
+    await queue_worker.stop()
+    await enrichment_worker.stop()
+    await browser_pool.close()
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and start scheduler on startup"""
+    """Initialize database and, in the elected worker, start scheduler on startup"""
     logger.info("Starting up Job Scraper API...")
     init_db()
     logger.info("Database initialized")
     
-    # Run initial scrape
-    logger.info("Running initial scrape...")
-    await scrape_and_store_jobs()
-    
-    # Start scheduler
-    start_scheduler()
-    logger.info("Scheduler started")
+    await leader_election.start(
+        on_elected=become_scheduler_leader,
+        on_demoted=step_down_as_scheduler_leader
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the scheduler and workers and hand leadership to a standby worker"""
+    stop_scheduler()
+    await queue_worker.stop()
+    await enrichment_worker.stop()
+    shutdown_parse_pool()
+    await close_clients()
+    await browser_pool.close()
+    await leader_election.stop()
 
 @app.get("/")
 async def root():
@@ -54,12 +124,25 @@ async def root():
             "jobs": "/api/jobs",
             "stats": "/api/stats",
             "scrape": "/api/scrape",
+            "scrape_runs": "/api/scrape/runs",
+            "scrape_cadence": "/api/scrape/cadence",
             "rbc_scrape": "/api/scrape/rbc",
             "bmo_scrape": "/api/scrape/bmo",
             "cibc_scrape": "/api/scrape/cibc"
         }
     }
 
+def _job_dicts(db: Session, jobs: List[JobPosting], include_description: bool) -> List[dict]:
+    """to_dict() of each job; descriptions, when asked for, are loaded for these jobs only, in one query"""
+    if include_description and jobs:
+        records = {
+            record.job_id: record for record in
+            db.query(JobDescription).filter(JobDescription.job_id.in_([job.id for job in jobs]))
+        }
+        for job in jobs:
+            set_committed_value(job, "description_record", records.get(job.id))
+    return [job.to_dict(include_description=include_description) for job in jobs]
+
 @app.get("/api/jobs")
 async def get_jobs(
     company: Optional[str] = Query(None, description="Filter by company"),
@@ -67,6 +150,7 @@ async def get_jobs(
     keywords: Optional[str] = Query(None, description="Filter by keywords (comma-separated, e.g., 'intern,internship,co-op')"),
     limit: int = Query(100, ge=1, le=500, description="Number of jobs to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    include_description: bool = Query(False, description="Include each job's full description"),
     db: Session = Depends(get_db)
 ):
     """Get job postings with optional filtering"""
@@ -111,7 +195,7 @@ async def get_jobs(
         "total": total,
         "limit": limit,
         "offset": offset,
-        "jobs": [job.to_dict() for job in jobs]
+        "jobs": _job_dicts(db, jobs, include_description)
     }
 
 @app.get("/api/jobs/{job_id}")
@@ -122,11 +206,13 @@ async def get_job(job_id: str, db: Session = Depends(get_db)):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return job.to_dict()
+    # The description is loaded from job_descriptions only here
+    return job.to_dict(include_description=True)
 
 @app.get("/api/jobs/new/today")
 async def get_new_jobs_today(
     company: Optional[str] = Query(None, description="Filter by company"),
+    include_description: bool = Query(False, description="Include each job's full description"),
     db: Session = Depends(get_db)
 ):
     """Get jobs first seen today"""
@@ -145,7 +231,7 @@ async def get_new_jobs_today(
     return {
         "date": today_start.isoformat(),
         "count": len(jobs),
-        "jobs": [job.to_dict() for job in jobs]
+        "jobs": _job_dicts(db, jobs, include_description)
     }
 
 @app.get("/api/stats")
@@ -170,9 +256,9 @@ async def get_stats(db: Session = Depends(get_db)):
     companies = db.query(JobPosting.company).distinct().all()
     companies = [c[0] for c in companies]
     
-    # Last scrape time (most recent last_seen)
-    last_job = db.query(JobPosting).order_by(JobPosting.last_seen.desc()).first()
-    last_scraped = last_job.last_seen if last_job else None
+    # Last scrape time (most recent successfully finished source scrape)
+    last_success = get_last_successful_scrapes(db)
+    last_scraped = max(last_success.values()) if last_success else None
     
     return {
         "total_jobs": total_jobs,
@@ -184,232 +270,145 @@ async def get_stats(db: Session = Depends(get_db)):
         "last_scraped": last_scraped.isoformat() if last_scraped else None
     }
 
-@app.post("/api/scrape")
+@app.get("/api/scrape/runs")
+async def get_scrape_runs(
+    source: Optional[str] = Query(None, description="Only runs that included this source (e.g., rbc)"),
+    status: Optional[str] = Query(None, description="Filter by status (queued, running, success, partial, failed)"),
+    limit: int = Query(20, ge=1, le=200, description="Number of runs to return"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    db: Session = Depends(get_db)
+):
+    """List scrape runs, newest first, with per-source timings and counts"""
+    query = db.query(ScrapeRun)
+    
+    if source:
+        try:
+            key = get_sources([source.lower()])[0].key
+        except KeyError as e:
+            raise HTTPException(status_code=400, detail=str(e.args[0]))
+        # Match the run's own source list, so queued and running runs (no per-source rows yet) show up too
+        query = query.filter(("," + ScrapeRun.sources + ",").contains(f",{key},", autoescape=True))
+    
+    if status:
+        query = query.filter(ScrapeRun.status == status)
+    
+    total = query.count()
+    runs = query.order_by(ScrapeRun.id.desc()).offset(offset).limit(limit).all()
+    
+    return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "runs": [run.to_dict(include_sources=True) for run in runs]
+    }
+
+@app.get("/api/scrape/runs/{run_id}")
+async def get_scrape_run(run_id: int, db: Session = Depends(get_db)):
+    """Get a single scrape run with its per-source results"""
+    run = db.query(ScrapeRun).filter(ScrapeRun.id == run_id).first()
+    
+    if not run:
+        raise HTTPException(status_code=404, detail="Scrape run not found")
+    
+    return run.to_dict(include_sources=True)
+
+@app.get("/api/scrape/cadence")
+async def get_scrape_cadence(db: Session = Depends(get_db)):
+    """Adaptive scrape interval of each source, with the volatility and run time it is based on"""
+    return {"sources": get_cadence_snapshot(db)}
+
+@app.get("/api/scrape/selector-hits")
+async def get_selector_hits(
+    source: str = Query(..., description="Source key (e.g., rbc)"),
+    runs: int = Query(50, ge=1, le=1000, description="Number of recent runs of the source to add up"),
+    db: Session = Depends(get_db)
+):
+    """How often each fallback selector supplied a field in recent runs, most used first, to guide pruning"""
+    rows = (
+        db.query(ScrapeRunSource)
+        .filter(ScrapeRunSource.source == source.lower(), ScrapeRunSource.metrics.isnot(None))
+        .order_by(ScrapeRunSource.id.desc())
+        .limit(runs)
+        .all()
+    )
+    
+    totals = {}
+    for row in rows:
+        for field, counts in row.to_dict()["metrics"].get("selector_hits", {}).items():
+            field_totals = totals.setdefault(field, {})
+            for selector, count in counts.items():
+                field_totals[selector] = field_totals.get(selector, 0) + count
+    
+    return {
+        "source": source.lower(),
+        "runs": len(rows),
+        "fields": {
+            field: dict(sorted(counts.items(), key=lambda item: -item[1]))
+            for field, counts in totals.items()
+        }
+    }
+
+def _queued_response(queued: dict) -> JSONResponse:
+    """202 response pointing the caller at the run to poll"""
+    run = queued["run"]
+    return JSONResponse(status_code=202, content={
+        "status": run.status,
+        "run_id": run.id,
+        "sources": run.source_keys,
+        "merged": queued["merged"],
+        "merged_run_ids": queued["merged_run_ids"],
+        "status_url": f"/api/scrape/runs/{run.id}",
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+def _enqueue_filtered_scrape(db: Session, key: str, keywords: Optional[str], location: Optional[str]) -> JSONResponse:
+    """Queue a single-source scrape with keyword/location filters"""
+    keyword_list = [kw.strip() for kw in keywords.split(',')] if keywords else None
+    logger.info(f"Manual {key} scrape requested with keywords: {keywords}")
+    return _queued_response(
+        enqueue_scrape(db, [key], overrides={"keywords": keyword_list, "location": location}, trigger="manual")
+    )
+
+@app.post("/api/scrape", status_code=202)
 async def trigger_scrape(
-    company: str = Query("all", description="Company to scrape (all, microsoft, rbc, bmo, cibc)"),
+    company: str = Query("all", description="Sources to scrape: all, or comma-separated keys (e.g., rbc,bmo)"),
     db: Session = Depends(get_db)
 ):
-    """Manually trigger a scrape"""
-    logger.info(f"Manual scrape triggered for: {company}")
+    """Queue a manual scrape and return its run ID; poll /api/scrape/runs/{run_id} for progress"""
+    logger.info(f"Manual scrape requested for: {company}")
     
+    keys = None if company.lower() == "all" else [key.strip() for key in company.split(',') if key.strip()]
     try:
-        await scrape_and_store_jobs()
-        
-        return {
-            "status": "success",
-            "message": f"Scrape completed for {company}",
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error during manual scrape: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        return _queued_response(enqueue_scrape(db, keys, trigger="manual"))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
 
-@app.post("/api/scrape/rbc")
+@app.post("/api/scrape/rbc", status_code=202)
 async def trigger_rbc_scrape(
     keywords: Optional[str] = Query("intern,internship,co-op,coop", description="Keywords to search for"),
     location: Optional[str] = Query(None, description="Location filter"),
     db: Session = Depends(get_db)
 ):
-    """Manually trigger RBC scraper for intern positions"""
-    logger.info(f"Manual RBC scrape triggered with keywords: {keywords}")
-    
-    try:
-        from scrapers.rbc_scraper import RBCScraper
-        
-        keyword_list = [kw.strip() for kw in keywords.split(',')] if keywords else ["intern", "internship", "co-op", "coop"]
-        
-        rbc_scraper = RBCScraper(
-            keywords=keyword_list,
-            location=location,
-            job_type="Internship"
-        )
-        
-        rbc_jobs = await rbc_scraper.scrape()
-        
-        # Store jobs in database
-        scraped_job_ids = set()
-        for job_data in rbc_jobs:
-            job_id = job_data["id"]
-            scraped_job_ids.add(job_id)
-            
-            # Check if job already exists
-            existing_job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
-            
-            if existing_job:
-                # Update existing job
-                existing_job.last_seen = datetime.utcnow()
-                existing_job.scraped_count += 1
-                existing_job.is_active = True
-                logger.debug(f"Updated existing RBC job: {job_id}")
-            else:
-                # Create new job
-                new_job = JobPosting(
-                    id=job_id,
-                    company=job_data["company"],
-                    title=job_data["title"],
-                    team=job_data.get("team"),
-                    location=job_data.get("location"),
-                    url=job_data["url"],
-                    description=job_data.get("description"),
-                    posted_date=job_data.get("posted_date"),
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    is_active=True,
-                    scraped_count=1
-                )
-                db.add(new_job)
-                logger.info(f"Added new RBC job: {job_id} - {job_data['title']}")
-        
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": f"RBC scrape completed",
-            "jobs_found": len(rbc_jobs),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error during RBC scrape: {e}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+    """Queue an RBC scrape for intern positions"""
+    return _enqueue_filtered_scrape(db, "rbc", keywords, location)
 
-@app.post("/api/scrape/bmo")
+@app.post("/api/scrape/bmo", status_code=202)
 async def trigger_bmo_scrape(
     keywords: Optional[str] = Query("intern,internship,co-op,coop", description="Keywords to search for"),
     location: Optional[str] = Query(None, description="Location filter"),
     db: Session = Depends(get_db)
 ):
-    """Manually trigger BMO scraper for intern positions"""
-    logger.info(f"Manual BMO scrape triggered with keywords: {keywords}")
-    
-    try:
-        from scrapers.bmo_scraper import BMOScraper
-        
-        keyword_list = [kw.strip() for kw in keywords.split(',')] if keywords else ["intern", "internship", "co-op", "coop"]
-        
-        bmo_scraper = BMOScraper(
-            keywords=keyword_list,
-            location=location,
-            job_type="Internship"
-        )
-        
-        bmo_jobs = await bmo_scraper.scrape()
-        
-        # Store jobs in database
-        scraped_job_ids = set()
-        for job_data in bmo_jobs:
-            job_id = job_data["id"]
-            scraped_job_ids.add(job_id)
-            
-            # Check if job already exists
-            existing_job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
-            
-            if existing_job:
-                # Update existing job
-                existing_job.last_seen = datetime.utcnow()
-                existing_job.scraped_count += 1
-                existing_job.is_active = True
-                logger.debug(f"Updated existing BMO job: {job_id}")
-            else:
-                # Create new job
-                new_job = JobPosting(
-                    id=job_id,
-                    company=job_data["company"],
-                    title=job_data["title"],
-                    team=job_data.get("team"),
-                    location=job_data.get("location"),
-                    url=job_data["url"],
-                    description=job_data.get("description"),
-                    posted_date=job_data.get("posted_date"),
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    is_active=True,
-                    scraped_count=1
-                )
-                db.add(new_job)
-                logger.info(f"Added new BMO job: {job_id} - {job_data['title']}")
-        
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": f"BMO scrape completed",
-            "jobs_found": len(bmo_jobs),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error during BMO scrape: {e}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+    """Queue a BMO scrape for intern positions"""
+    return _enqueue_filtered_scrape(db, "bmo", keywords, location)
 
-@app.post("/api/scrape/cibc")
+@app.post("/api/scrape/cibc", status_code=202)
 async def trigger_cibc_scrape(
     keywords: Optional[str] = Query("intern,internship,co-op,coop", description="Keywords to search for"),
     location: Optional[str] = Query(None, description="Location filter"),
     db: Session = Depends(get_db)
 ):
-    """Manually trigger CIBC scraper for intern positions"""
-    logger.info(f"Manual CIBC scrape triggered with keywords: {keywords}")
-    
-    try:
-        from scrapers.cibc_scraper import CIBCScraper
-        
-        keyword_list = [kw.strip() for kw in keywords.split(',')] if keywords else ["intern", "internship", "co-op", "coop"]
-        
-        cibc_scraper = CIBCScraper(
-            keywords=keyword_list,
-            location=location,
-            job_type="Internship"
-        )
-        
-        cibc_jobs = await cibc_scraper.scrape()
-        
-        # Store jobs in database
-        scraped_job_ids = set()
-        for job_data in cibc_jobs:
-            job_id = job_data["id"]
-            scraped_job_ids.add(job_id)
-            
-            # Check if job already exists
-            existing_job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
-            
-            if existing_job:
-                # Update existing job
-                existing_job.last_seen = datetime.utcnow()
-                existing_job.scraped_count += 1
-                existing_job.is_active = True
-                logger.debug(f"Updated existing CIBC job: {job_id}")
-            else:
-                # Create new job
-                new_job = JobPosting(
-                    id=job_id,
-                    company=job_data["company"],
-                    title=job_data["title"],
-                    team=job_data.get("team"),
-                    location=job_data.get("location"),
-                    url=job_data["url"],
-                    description=job_data.get("description"),
-                    posted_date=job_data.get("posted_date"),
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    is_active=True,
-                    scraped_count=1
-                )
-                db.add(new_job)
-                logger.info(f"Added new CIBC job: {job_id} - {job_data['title']}")
-        
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": f"CIBC scrape completed",
-            "jobs_found": len(cibc_jobs),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Error during CIBC scrape: {e}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+    """Queue a CIBC scrape for intern positions"""
+    return _enqueue_filtered_scrape(db, "cibc", keywords, location)
 
 @app.delete("/api/jobs/company/{company}")
 async def delete_jobs_by_company(company: str, db: Session = Depends(get_db)):
@@ -421,6 +420,10 @@ async def delete_jobs_by_company(company: str, db: Session = Depends(get_db)):
         for job in jobs_to_delete:
             db.delete(job)
         
+        # Their enrichment state too, or a re-scraped listing would count as already enriched
+        db.query(JobEnrichment).filter(
+            JobEnrichment.job_id.in_([job.id for job in jobs_to_delete])
+        ).delete(synchronize_session=False)
         db.commit()
         
         return {
@@ -439,8 +442,10 @@ async def delete_all_jobs(db: Session = Depends(get_db)):
     try:
         total_jobs = db.query(JobPosting).count()
         
-        # Delete all jobs
+        # Delete all jobs, with their descriptions and enrichment state
         db.query(JobPosting).delete()
+        db.query(JobDescription).delete()
+        db.query(JobEnrichment).delete()
         db.commit()
         
         logger.info(f"Deleted all {total_jobs} jobs from database")
@@ -463,3 +468,35 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/ready")
+async def readiness_check(db: Session = Depends(get_db)):
+    """Readiness endpoint: database reachable, plus how fresh the scraped data is"""
+    try:
+        last_success = get_last_successful_scrapes(db)
+    except Exception as e:
+        logger.error(f"Readiness check failed: {e}")
+        return JSONResponse(status_code=503, content={"ready": False, "error": str(e)})
+    
+    now = datetime.utcnow()
+    last_scraped = max(last_success.values()) if last_success else None
+    stale_cutoff = now - timedelta(minutes=SCRAPE_STALE_AFTER_MINUTES)
+    
+    sources = {}
+    for source in get_sources():
+        scraped_at = last_success.get(source.key)
+        sources[source.key] = {
+            "last_scraped": scraped_at.isoformat() if scraped_at else None,
+            "stale": scraped_at is None or scraped_at < stale_cutoff,
+        }
+    
+    return {
+        "ready": True,
+        "fresh": not any(source["stale"] for source in sources.values()),
+        "last_scraped": last_scraped.isoformat() if last_scraped else None,
+        "age_seconds": round((now - last_scraped).total_seconds()) if last_scraped else None,
+        "sources": sources,
+        "scheduler_leader": leader_election.is_leader,
+        "initial_scrape": {"state": initial_scrape["state"], "run_id": initial_scrape["run_id"]},
+        "timestamp": now.isoformat()
+    }
+
@@ -1,17 +1,24 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+import asyncio
+import json
 import logging
 import os
+import time
 
-from scrapers import MicrosoftScraper
-from scrapers.rbc_scraper import RBCScraper
-from scrapers.bmo_scraper import BMOScraper
-from scrapers.cibc_scraper import CIBCScraper
-from scrapers.google_scraper import GoogleScraper
-from scrapers.interac_scraper import InteracScraper
-from models import JobPosting
+from app.cadence import HISTORY_SIZE, CadencePlanner
+from app.enrichment import enrichment_worker
+from app.ingest import JobWriter
+from app.sources import ScrapeSource, get_sources
+from models import ScrapeRun, ScrapeRunSource
+from scrapers.browser_pool import browser_pool
+from scrapers.resilience import get_breaker
+from scrapers.stats import ScrapeStats, current_stats
 from models.database import SessionLocal
 
 logging.basicConfig(level=logging.INFO)
@@ -19,170 +26,469 @@ logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
-async def scrape_and_store_jobs():
+
+def _new_cadence_planner() -> CadencePlanner:
+    """Planner tracking every registered source at its base interval"""
+    planner = CadencePlanner()
+    for source in get_sources():
+        planner.register(source.key, source.interval_minutes, source.uses_browser)
+    return planner
+
+
+cadence_planner = _new_cadence_planner()
+
+# "concurrent" fans all sources out at once, "sequential" keeps the old one-at-a-time behaviour
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "concurrent").lower()
+# Hard ceiling on a whole run, in seconds
+RUN_BUDGET_SECONDS = float(os.getenv("SCRAPE_RUN_BUDGET_SECONDS", "900"))
+# How many Playwright-backed scrapers may have Chromium open at once
+MAX_BROWSER_SCRAPERS = int(os.getenv("SCRAPE_MAX_BROWSER_SCRAPERS", "1"))
+# Launch the shared Chromium this many seconds before a browser-backed scrape is due
+BROWSER_PREWARM_SECONDS = float(os.getenv("BROWSER_PREWARM_SECONDS", "120"))
+
+_browser_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_browser_slots() -> asyncio.Semaphore:
+    """Process-wide semaphore capping concurrent browser-backed scrapers"""
+    global _browser_slots
+    if _browser_slots is None:
+        _browser_slots = asyncio.Semaphore(max(1, MAX_BROWSER_SCRAPERS))
+    return _browser_slots
+
+
+async def _scrape_all_at_once(scraper):
+    """Stream adapter for scrapers that only implement scrape()"""
+    yield await scraper.scrape()
+
+
+async def _stream_to_writer(scraper, writer: JobWriter, result: Dict):
+    """Hand each page of jobs to the writer as soon as the scraper yields it"""
+    pages = scraper.stream() if hasattr(scraper, "stream") else _scrape_all_at_once(scraper)
+    async for page_jobs in pages:
+        result["jobs_found"] += len(page_jobs)
+        await writer.put(page_jobs)
+
+
+async def _run_source(
+    source: ScrapeSource,
+    deadline: float,
+    stats: ScrapeStats,
+    writer: JobWriter,
+    overrides: Optional[Dict] = None
+) -> Dict:
+    """
+    Scrape a single source under its own deadline, streaming its jobs to the writer
+
+    Args:
+        source: Source to scrape
+        deadline: time.monotonic() value the whole run must finish by
+        stats: Collects the pages, bytes and counters the scraper reports
+        writer: Stores the jobs; told when the source finished successfully
+        overrides: Scraper filter overrides (e.g., keywords, location)
+
+    Returns:
+        Dict with keys: source, jobs_found, error, skipped, duration, started_at, finished_at, stats
+    """
+    result = {
+        "source": source.key,
+        "jobs_found": 0,
+        "error": None,
+        "skipped": False,
+        "duration": 0.0,
+        "started_at": datetime.utcnow(),
+        "finished_at": None,
+        "stats": stats,
+    }
+    breaker = get_breaker(source.key)
+    if not breaker.allow():
+        result["skipped"] = True
+        result["error"] = f"skipped: circuit open until {breaker.retry_at:%Y-%m-%d %H:%M} UTC"
+        result["finished_at"] = result["started_at"]
+        logger.warning(f"Skipping {source.name}: circuit breaker open after {breaker.consecutive_failures} failures")
+        return result
+
+    start = time.monotonic()
+    stats_token = current_stats.set(stats)
+
+    try:
+        slot = _get_browser_slots() if source.uses_browser else nullcontext()
+        async with slot:
+            # The source deadline starts once it holds a browser slot, but never outlives the run budget
+            timeout = min(source.timeout_seconds, deadline - time.monotonic())
+            if timeout <= 0:
+                raise asyncio.TimeoutError()
+            scraper = source.create_scraper(**(overrides or {}))
+            await asyncio.wait_for(_stream_to_writer(scraper, writer, result), timeout=timeout)
+        await writer.source_done(source.id_prefix)
+        breaker.record_success()
+        logger.info(f"Scraped {result['jobs_found']} jobs from {source.name}")
+    except asyncio.TimeoutError:
+        result["error"] = f"timed out after {time.monotonic() - start:.1f}s"
+        breaker.record_failure()
+        logger.error(f"Scraping {source.name} {result['error']}")
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+        breaker.record_failure()
+        logger.error(f"Error scraping {source.name}: {e}")
+    finally:
+        current_stats.reset(stats_token)
+        result["duration"] = time.monotonic() - start
+        result["finished_at"] = datetime.utcnow()
+
+    return result
+
+
+async def _scrape_sources(
+    sources: List[ScrapeSource],
+    writer: JobWriter,
+    overrides: Optional[Dict] = None
+) -> List[Dict]:
     """
-    Scrape jobs from all sources (Microsoft, RBC, BMO, CIBC, Interac, Google) and store them in the database.
-    Updates existing jobs and marks inactive ones.
+    Scrape every source, either concurrently or one at a time depending on SCRAPE_MODE
+
+    Sources still running when the run budget is spent are cancelled and reported as failed.
     """
-    logger.info("Starting scheduled scrape...")
+    run_start = time.monotonic()
+    started_at = datetime.utcnow()
+    deadline = run_start + RUN_BUDGET_SECONDS
+    stats = {source.key: ScrapeStats() for source in sources}
+
+    if SCRAPE_MODE == "sequential":
+        return [await _run_source(source, deadline, stats[source.key], writer, overrides) for source in sources]
+
+    tasks = {
+        asyncio.create_task(
+            _run_source(source, deadline, stats[source.key], writer, overrides), name=f"scrape-{source.key}"
+        ): source
+        for source in sources
+    }
+    done, pending = await asyncio.wait(tasks, timeout=RUN_BUDGET_SECONDS)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        # Let the cancelled sources unwind (close browsers, clients) before returning
+        await asyncio.wait(pending)
+
+    results = []
+    for task, source in tasks.items():
+        if task.cancelled():
+            logger.error(f"Scraping {source.name} cancelled: run budget exhausted")
+            results.append({
+                "source": source.key,
+                "jobs_found": 0,
+                "error": "cancelled: run budget exhausted",
+                "skipped": False,
+                "duration": time.monotonic() - run_start,
+                "started_at": started_at,
+                "finished_at": datetime.utcnow(),
+                "stats": stats[source.key],
+            })
+        else:
+            results.append(task.result())
+    return results
+
+
+async def scrape_and_store_jobs(
+    sources: Optional[List[str]] = None,
+    trigger: str = "scheduled",
+    run_id: Optional[int] = None,
+    overrides: Optional[Dict] = None
+) -> Dict:
+    """
+    Scrape jobs from the given sources (default: Microsoft, RBC, BMO, CIBC, Interac, Google) and store them
+    in the database. Updates existing jobs and marks inactive the ones successfully scraped sources no
+    longer list.
+
+    Args:
+        sources: Source keys to scrape (e.g., ["rbc", "bmo"]); jobs from other sources are left untouched
+        trigger: What started the run (startup, scheduled or manual), recorded in scrape_runs
+        run_id: Existing scrape_runs row to fill in (queued runs); a new row is created when omitted
+        overrides: Scraper filter overrides (e.g., keywords, location). A filtered scrape only sees a
+            subset of a source's postings, so it never marks jobs inactive.
+
+    Returns:
+        Summary dict with per-source counts, durations and errors
+    """
+    selected = get_sources(sources)
+    overrides = overrides or {}
+    logger.info(f"Starting scrape of: {', '.join(source.name for source in selected)}")
+    run_start = time.monotonic()
     db = SessionLocal()
+
+    if run_id is None:
+        run = ScrapeRun(
+            trigger=trigger,
+            status="running",
+            sources=",".join(source.key for source in selected),
+            started_at=datetime.utcnow()
+        )
+        db.add(run)
+        db.commit()
+    else:
+        run = db.query(ScrapeRun).filter(ScrapeRun.id == run_id).one()
     
+    # Jobs are written as each source streams them in; last_seen is the run's start for all of them
+    writer = JobWriter(seen_at=datetime.utcnow(), reconcile=not overrides)
     try:
-        all_jobs = []
-        scraped_job_ids = set()
-        
-        # Scrape from Microsoft (Software Engineering internships for students and graduates)
-        try:
-            microsoft_scraper = MicrosoftScraper(
-                professions=["Engineering", "Software Engineering"],
-                experience="Students and graduates",
-                employment_type="Internship"
-            )
-            microsoft_jobs = await microsoft_scraper.scrape()
-            all_jobs.extend(microsoft_jobs)
-            logger.info(f"Scraped {len(microsoft_jobs)} internship jobs from Microsoft")
-        except Exception as e:
-            logger.error(f"Error scraping Microsoft: {e}")
-        
-        # Scrape from RBC (Intern and Co-op positions)
-        try:
-            rbc_scraper = RBCScraper(
-                keywords=["intern", "internship", "co-op", "coop"],
-                location=None,  # Search all locations
-                job_type="Internship"
-            )
-            rbc_jobs = await rbc_scraper.scrape()
-            all_jobs.extend(rbc_jobs)
-            logger.info(f"Scraped {len(rbc_jobs)} intern/co-op jobs from RBC")
-        except Exception as e:
-            logger.error(f"Error scraping RBC: {e}")
-        
-        # Scrape from BMO (Intern and Co-op positions)
-        try:
-            bmo_scraper = BMOScraper(
-                keywords=["intern", "internship", "co-op", "coop"],
-                location=None,  # Search all locations
-                job_type="Internship"
-            )
-            bmo_jobs = await bmo_scraper.scrape()
-            all_jobs.extend(bmo_jobs)
-            logger.info(f"Scraped {len(bmo_jobs)} intern/co-op jobs from BMO")
-        except Exception as e:
-            logger.error(f"Error scraping BMO: {e}")
-        
-        # Scrape from CIBC (Intern and Co-op positions)
-        try:
-            cibc_scraper = CIBCScraper(
-                keywords=["intern", "internship", "co-op", "coop"],
-                location=None,  # Search all locations
-                job_type="Internship"
-            )
-            cibc_jobs = await cibc_scraper.scrape()
-            all_jobs.extend(cibc_jobs)
-            logger.info(f"Scraped {len(cibc_jobs)} intern/co-op jobs from CIBC")
-        except Exception as e:
-            logger.error(f"Error scraping CIBC: {e}")
-        
-        # Scrape from Interac (Intern and Co-op positions)
-        try:
-            interac_scraper = InteracScraper(
-                keywords=["intern", "internship", "co-op", "coop"],
-                location=None,  # Search all locations
-                job_type="Internship"
-            )
-            interac_jobs = await interac_scraper.scrape()
-            all_jobs.extend(interac_jobs)
-            logger.info(f"Scraped {len(interac_jobs)} intern/co-op jobs from Interac")
-        except Exception as e:
-            logger.error(f"Error scraping Interac: {e}")
-        
-        # Scrape from Google (Software Developer Intern positions)
-        try:
-            google_scraper = GoogleScraper(
-                employment_type="INTERN",
-                target_level="INTERN_AND_APPRENTICE",
-                search_query="Software Developer",
-                locations=["Canada", "United States"]
-            )
-            google_jobs = await google_scraper.scrape()
-            all_jobs.extend(google_jobs)
-            logger.info(f"Scraped {len(google_jobs)} software developer intern jobs from Google")
-        except Exception as e:
-            logger.error(f"Error scraping Google: {e}")
+        writer.start()
+        results = await _scrape_sources(selected, writer, overrides)
+        # Missing jobs are only deactivated for sources that scraped successfully;
+        # a failed source's jobs keep their current state
+        store_counts = await writer.close()
+        jobs_found = sum(result["jobs_found"] for result in results)
         
-        logger.info(f"Total scraped {len(all_jobs)} jobs from all sources")
+        logger.info(
+            f"Total scraped {jobs_found} jobs from {len(selected)} source(s) "
+            f"in {time.monotonic() - run_start:.1f}s"
+        )
         
-        # Process each scraped job
-        for job_data in all_jobs:
-            job_id = job_data["id"]
-            scraped_job_ids.add(job_id)
-            
-            # Check if job already exists
-            existing_job = db.query(JobPosting).filter(JobPosting.id == job_id).first()
-            
-            if existing_job:
-                # Update existing job
-                existing_job.last_seen = datetime.utcnow()
-                existing_job.scraped_count += 1
-                existing_job.is_active = True
-                
-                # Update posted_date if it's missing and we have it in the scraped data
-                if not existing_job.posted_date and job_data.get("posted_date"):
-                    existing_job.posted_date = job_data.get("posted_date")
-                    logger.info(f"Updated posted_date for job: {job_id}")
-                
-                logger.debug(f"Updated existing job: {job_id}")
-            else:
-                # Create new job
-                new_job = JobPosting(
-                    id=job_id,
-                    company=job_data["company"],
-                    title=job_data["title"],
-                    team=job_data.get("team"),
-                    location=job_data.get("location"),
-                    url=job_data["url"],
-                    description=job_data.get("description"),
-                    posted_date=job_data.get("posted_date"),
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
-                    is_active=True,
-                    scraped_count=1
-                )
-                db.add(new_job)
-                logger.info(f"Added new job: {job_id} - {job_data['title']}")
+        new_counts = {key: counts["new"] for key, counts in store_counts.items()}
+        updated_counts = {key: counts["updated"] for key, counts in store_counts.items()}
+        deactivated_counts = {key: counts["deactivated"] for key, counts in store_counts.items()}
         
-        # Mark jobs not seen in this scrape as inactive
-        all_active_jobs = db.query(JobPosting).filter(
-            JobPosting.is_active == True
-        ).all()
+        for result in results:
+            key = result["source"]
+            run.source_results.append(ScrapeRunSource(
+                source=key,
+                status="skipped" if result["skipped"] else "failed" if result["error"] else "success",
+                started_at=result["started_at"],
+                finished_at=result["finished_at"],
+                duration_seconds=round(result["duration"], 3),
+                pages_fetched=result["stats"].pages_fetched,
+                bytes_downloaded=result["stats"].bytes_downloaded,
+                jobs_found=result["jobs_found"],
+                jobs_new=new_counts.get(key, 0),
+                jobs_updated=updated_counts.get(key, 0),
+                jobs_deactivated=deactivated_counts.get(key, 0),
+                error=result["error"],
+                metrics=json.dumps({
+                    **result["stats"].counters,
+                    **get_breaker(key).snapshot(),
+                    **({"selector_hits": result["stats"].selector_hits} if result["stats"].selector_hits else {}),
+                })
+            ))
         
-        for job in all_active_jobs:
-            if job.id not in scraped_job_ids:
-                job.is_active = False
-                logger.info(f"Marked job as inactive: {job.id}")
+        failed = [result["source"] for result in results if result["error"]]
+        run.status = "success" if not failed else "failed" if len(failed) == len(results) else "partial"
+        run.finished_at = datetime.utcnow()
+        run.jobs_found = jobs_found
+        run.jobs_new = sum(new_counts.values())
+        run.jobs_updated = sum(updated_counts.values())
+        run.jobs_deactivated = sum(deactivated_counts.values())
+        run.failed_sources = ",".join(failed) or None
+        run.error = "; ".join(f"{r['source']}: {r['error']}" for r in results if r["error"]) or None
         
         db.commit()
-        logger.info("Scrape completed successfully")
+        logger.info(f"Scrape completed with status {run.status}")
+        # Details of new and changed listings are fetched in the background, after the listings are stored
+        if run.jobs_new or run.jobs_updated:
+            enrichment_worker.notify()
+
+        summary = {
+            "run_id": run.id,
+            "status": run.status,
+            "jobs_found": jobs_found,
+            "duration": round(time.monotonic() - run_start, 2),
+            "sources": {
+                result["source"]: {
+                    "jobs_found": result["jobs_found"],
+                    "jobs_new": new_counts.get(result["source"], 0),
+                    "jobs_updated": updated_counts.get(result["source"], 0),
+                    "jobs_deactivated": deactivated_counts.get(result["source"], 0),
+                    "error": result["error"],
+                    "duration": round(result["duration"], 2),
+                    **result["stats"].to_dict(),
+                    **get_breaker(result["source"]).snapshot(),
+                }
+                for result in results
+            },
+        }
+        if not overrides:
+            _update_cadence(summary)
+        return summary
         
     except Exception as e:
         logger.error(f"Error during scrape: {e}")
         db.rollback()
+        run.status = "failed"
+        run.finished_at = datetime.utcnow()
+        run.failed_sources = run.sources
+        run.error = str(e)
+        db.commit()
         raise
+    finally:
+        writer.cancel()
+        db.close()
+
+
+def get_last_successful_scrapes(db: Session) -> Dict[str, datetime]:
+    """
+    When each source last finished a successful scrape
+
+    Returns:
+        Dict of source key to finish time; sources that never succeeded are missing
+    """
+    rows = db.query(
+        ScrapeRunSource.source,
+        func.max(ScrapeRunSource.finished_at)
+    ).join(ScrapeRun).filter(
+        ScrapeRunSource.status == "success",
+        # Filtered manual scrapes only cover part of a source
+        ScrapeRun.params.is_(None)
+    ).group_by(ScrapeRunSource.source).all()
+    
+    wanted = {source.key for source in get_sources()}
+    return {key: finished_at for key, finished_at in rows if key in wanted and finished_at}
+
+
+def load_cadence_history(db: Session, planner: CadencePlanner):
+    """
+    Seed a cadence planner from each source's most recent successful full scrapes, so adaptive
+    intervals survive restarts and leader failover
+
+    Args:
+        db: Database session
+        planner: Planner whose tracked sources are seeded
+    """
+    for key in planner.sources:
+        rows = db.query(
+            ScrapeRunSource.jobs_new,
+            ScrapeRunSource.jobs_deactivated,
+            ScrapeRunSource.duration_seconds
+        ).join(ScrapeRun).filter(
+            ScrapeRunSource.source == key,
+            ScrapeRunSource.status == "success",
+            # Filtered manual scrapes don't say how often the whole source changes
+            ScrapeRun.params.is_(None)
+        ).order_by(ScrapeRunSource.id.desc()).limit(HISTORY_SIZE).all()
+        planner.seed(key, [
+            ((new or 0) + (deactivated or 0), duration or 0.0)
+            for new, deactivated, duration in reversed(rows)
+        ])
+
+
+def get_cadence_snapshot(db: Session) -> Dict[str, Dict]:
+    """
+    Current per-source cadence: the scheduler's own planner in the leader, else one rebuilt from the
+    scrape journal (the same history the leader was seeded from and has been recording)
+    """
+    if scheduler.running:
+        return cadence_planner.snapshot()
+    planner = _new_cadence_planner()
+    load_cadence_history(db, planner)
+    return planner.snapshot()
+
+
+def get_stale_sources(max_age_minutes: float) -> List[str]:
+    """Sources whose last successful scrape is missing or older than max_age_minutes"""
+    db = SessionLocal()
+    try:
+        last_success = get_last_successful_scrapes(db)
+    finally:
+        db.close()
+    
+    cutoff = datetime.utcnow() - timedelta(minutes=max_age_minutes)
+    return [
+        source.key for source in get_sources()
+        if source.key not in last_success or last_success[source.key] < cutoff
+    ]
+
+
+def _update_cadence(summary: Dict):
+    """Feed a run's results into the cadence planner and retime the affected scheduler jobs"""
+    for key, source_summary in summary["sources"].items():
+        if source_summary["error"] is None:
+            cadence_planner.record(
+                key,
+                changes=source_summary["jobs_new"] + source_summary["jobs_deactivated"],
+                duration=source_summary["duration"],
+            )
+
+    if not scheduler.running:
+        return
+
+    now = datetime.now(scheduler.timezone)
+    for key, minutes in cadence_planner.intervals().items():
+        job = scheduler.get_job(f"scrape_{key}")
+        if job is None or abs(job.trigger.interval.total_seconds() / 60 - minutes) < 1:
+            continue
+
+        trigger = IntervalTrigger(minutes=minutes)
+        if key in summary["sources"]:
+            # Just ran: count the new interval from now
+            job.reschedule(trigger)
+        else:
+            # Keep the pending run unless the new interval would bring it forward
+            next_run = min(job.next_run_time, now + timedelta(minutes=minutes))
+            job.modify(trigger=trigger, next_run_time=next_run)
+        logger.info(f"Rescheduled {key} scrape every {minutes:.0f} minute(s)")
+
+
+async def scrape_source(key: str):
+    """Scheduler entry point: queue a scrape of a single source"""
+    # Imported here because app.scrape_queue imports this module
+    from app.scrape_queue import enqueue_scrape
+    
+    db = SessionLocal()
+    try:
+        enqueue_scrape(db, [key], trigger="scheduled")
     finally:
         db.close()
 
+
+async def manage_browser_pool():
+    """Scheduler job: pre-warm Chromium shortly before a browser-backed scrape is due, close it while idle"""
+    now = datetime.now(scheduler.timezone)
+    due_soon = False
+    for source in get_sources():
+        job = scheduler.get_job(f"scrape_{source.key}") if source.uses_browser else None
+        if job is not None and job.next_run_time is not None:
+            due_soon = due_soon or job.next_run_time - now <= timedelta(seconds=BROWSER_PREWARM_SECONDS)
+    
+    try:
+        if due_soon:
+            if not browser_pool.is_running:
+                logger.info("Pre-warming Chromium for an upcoming scrape")
+            await browser_pool.start()
+        else:
+            await browser_pool.close_if_idle()
+    except Exception as e:
+        logger.warning(f"Browser pool maintenance failed: {e}")
+
+
 def start_scheduler():
-    """Start the job scraping scheduler"""
-    interval_hours = int(os.getenv("SCRAPE_INTERVAL_HOURS", "1"))
+    """Start the job scraping scheduler with one adaptive interval job per source"""
+    db = SessionLocal()
+    try:
+        load_cadence_history(db, cadence_planner)
+    except Exception as e:
+        logger.warning(f"Could not load scrape history, starting from base intervals: {e}")
+    finally:
+        db.close()
     
-    logger.info(f"Scheduling scraper to run every {interval_hours} hour(s)")
+    for key, minutes in cadence_planner.intervals().items():
+        logger.info(f"Scheduling {key} scraper to run every {minutes:.0f} minute(s)")
+        scheduler.add_job(
+            scrape_source,
+            trigger=IntervalTrigger(minutes=minutes),
+            args=[key],
+            id=f"scrape_{key}",
+            name=f"Scrape {key} job postings",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1
+        )
     
     scheduler.add_job(
-        scrape_and_store_jobs,
-        trigger=IntervalTrigger(hours=interval_hours),
-        id="scrape_jobs",
-        name="Scrape job postings",
-        replace_existing=True
+        manage_browser_pool,
+        trigger=IntervalTrigger(seconds=max(10, min(60, BROWSER_PREWARM_SECONDS / 2))),
+        id="manage_browser_pool",
+        name="Pre-warm and idle-close the shared browser",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1
     )
     
     scheduler.start()
@@ -193,4 +499,3 @@ def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Scheduler stopped")
-
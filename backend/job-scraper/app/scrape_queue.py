@@ -0,0 +1,222 @@
+"""
+Scrape queue
+Scrape requests are stored as queued scrape_runs rows and executed by the scheduler leader.
+Requests for a source that is already queued or running merge into the in-flight run.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+import asyncio
+import json
+import logging
+import os
+
+from app.scheduler import scrape_and_store_jobs
+from app.sources import get_sources
+from models import ScrapeRun
+from models.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# How often the leader checks for runs queued by other worker processes
+QUEUE_POLL_SECONDS = float(os.getenv("SCRAPE_QUEUE_POLL_SECONDS", "2"))
+
+IN_FLIGHT_STATUSES = ["queued", "running"]
+
+
+def _normalize_overrides(source_keys: List[str], overrides: Optional[Dict]) -> Dict:
+    """Drop unset overrides and ones equal to every selected source's default, so they coalesce with plain runs"""
+    sources = get_sources(source_keys)
+    return {
+        name: value
+        for name, value in (overrides or {}).items()
+        if value is not None and any(source.defaults.get(name) != value for source in sources)
+    }
+
+
+def enqueue_scrape(
+    db: Session,
+    sources: Optional[List[str]] = None,
+    overrides: Optional[Dict] = None,
+    trigger: str = "manual"
+) -> Dict:
+    """
+    Queue a scrape, merging with in-flight runs where possible
+
+    Sources already queued or running with the same overrides are not scraped again; the caller
+    gets the in-flight run instead. Remaining sources are added to a queued run that has not
+    started yet, or to a new queued run.
+
+    Args:
+        db: Database session
+        sources: Source keys to scrape (default: every source)
+        overrides: Scraper filter overrides (e.g., {"keywords": [...], "location": "Toronto"})
+        trigger: What requested the run (startup, scheduled or manual)
+
+    Returns:
+        Dict with keys: run (the run tracking the first requested source), merged, merged_run_ids
+
+    Raises:
+        KeyError: If a source key is not registered
+    """
+    requested = [source.key for source in get_sources(sources)]
+    overrides = _normalize_overrides(requested, overrides)
+    params = json.dumps(overrides, sort_keys=True) if overrides else None
+
+    in_flight = db.query(ScrapeRun).filter(
+        ScrapeRun.status.in_(IN_FLIGHT_STATUSES),
+        ScrapeRun.params.is_(None) if params is None else ScrapeRun.params == params
+    ).order_by(ScrapeRun.id).all()
+
+    merged_into: Dict[str, ScrapeRun] = {}
+    for run in in_flight:
+        for key in run.source_keys:
+            if key in requested and key not in merged_into:
+                merged_into[key] = run
+    remaining = [key for key in requested if key not in merged_into]
+    merged_run_ids = sorted({run.id for run in merged_into.values()})
+
+    if not remaining:
+        run = merged_into[requested[0]]
+        logger.info(f"Scrape of {', '.join(requested)} merged into in-flight run {run.id}")
+        return {"run": run, "merged": True, "merged_run_ids": merged_run_ids}
+
+    # Fold the remaining sources into a run that has not been picked up yet
+    for run in in_flight:
+        if run.status != "queued":
+            continue
+        combined = run.source_keys + [key for key in remaining if key not in run.source_keys]
+        extended = db.query(ScrapeRun).filter(
+            ScrapeRun.id == run.id,
+            ScrapeRun.status == "queued",
+            ScrapeRun.sources == run.sources
+        ).update({"sources": ",".join(combined)}, synchronize_session=False)
+        db.commit()
+        if extended:
+            db.refresh(run)
+            logger.info(f"Added {', '.join(remaining)} to queued run {run.id}")
+            queue_worker.notify()
+            return {"run": run, "merged": True, "merged_run_ids": sorted(set(merged_run_ids) | {run.id})}
+
+    now = datetime.utcnow()
+    run = ScrapeRun(
+        trigger=trigger,
+        status="queued",
+        sources=",".join(remaining),
+        params=params,
+        queued_at=now,
+        started_at=now
+    )
+    db.add(run)
+    db.commit()
+    logger.info(f"Queued {trigger} scrape run {run.id} for: {', '.join(remaining)}")
+    queue_worker.notify()
+    return {"run": run, "merged": bool(merged_run_ids), "merged_run_ids": merged_run_ids}
+
+
+class ScrapeQueueWorker:
+    """Runs queued scrapes in the scheduler leader process, each queued run as its own task"""
+
+    def __init__(self):
+        self._poll_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runs: Dict[int, asyncio.Task] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._poll_task is not None
+
+    def start(self):
+        """Start picking up queued runs (call from the event loop, in the leader only)"""
+        if self.running:
+            return
+        self._fail_interrupted_runs()
+        self._wakeup = asyncio.Event()
+        self._poll_task = asyncio.create_task(self._poll())
+        logger.info("Scrape queue worker started")
+
+    def notify(self):
+        """Wake the worker now instead of at the next poll (same process only)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Stop polling and cancel runs in progress; the next leader marks them failed"""
+        tasks = list(self._runs.values())
+        if self._poll_task is not None:
+            tasks.append(self._poll_task)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._poll_task = None
+        self._wakeup = None
+        self._runs.clear()
+        logger.info("Scrape queue worker stopped")
+
+    @staticmethod
+    def _fail_interrupted_runs():
+        """Runs left 'running' by a previous leader will never finish; close them out"""
+        db = SessionLocal()
+        try:
+            interrupted = db.query(ScrapeRun).filter(ScrapeRun.status == "running").update({
+                "status": "failed",
+                "finished_at": datetime.utcnow(),
+                "error": "interrupted: scheduler leader stopped",
+            }, synchronize_session=False)
+            db.commit()
+            if interrupted:
+                logger.warning(f"Marked {interrupted} interrupted scrape run(s) as failed")
+        finally:
+            db.close()
+
+    async def _poll(self):
+        while True:
+            try:
+                self._start_queued_runs()
+            except Exception as e:
+                logger.error(f"Error starting queued scrape runs: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=QUEUE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _start_queued_runs(self):
+        db = SessionLocal()
+        try:
+            queued_ids = [
+                run_id for (run_id,) in
+                db.query(ScrapeRun.id).filter(ScrapeRun.status == "queued").order_by(ScrapeRun.id).all()
+            ]
+            for run_id in queued_ids:
+                # Claim atomically so a run is only ever started once
+                claimed = db.query(ScrapeRun).filter(
+                    ScrapeRun.id == run_id,
+                    ScrapeRun.status == "queued"
+                ).update({"status": "running", "started_at": datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+                if not claimed:
+                    continue
+
+                run = db.query(ScrapeRun).filter(ScrapeRun.id == run_id).one()
+                task = asyncio.create_task(
+                    self._execute(run.id, run.source_keys, run.trigger, run.overrides),
+                    name=f"scrape-run-{run.id}"
+                )
+                self._runs[run.id] = task
+                task.add_done_callback(lambda _, run_id=run.id: self._runs.pop(run_id, None))
+        finally:
+            db.close()
+
+    async def _execute(self, run_id: int, sources: List[str], trigger: str, overrides: Dict):
+        logger.info(f"Starting scrape run {run_id} ({trigger}): {', '.join(sources)}")
+        try:
+            await scrape_and_store_jobs(sources, trigger=trigger, run_id=run_id, overrides=overrides)
+        except Exception as e:
+            logger.error(f"Scrape run {run_id} failed: {e}")
+
+
+queue_worker = ScrapeQueueWorker()
@@ -0,0 +1,147 @@
+"""
+Scrape source registry
+Describes every company source the scheduler knows how to scrape
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from scrapers import MicrosoftScraper
+from scrapers.rbc_scraper import RBCScraper
+from scrapers.bmo_scraper import BMOScraper
+from scrapers.cibc_scraper import CIBCScraper
+from scrapers.google_scraper import GoogleScraper
+from scrapers.interac_scraper import InteracScraper
+
+INTERN_KEYWORDS = ["intern", "internship", "co-op", "coop"]
+
+# Default deadline for a single source, in seconds
+DEFAULT_SOURCE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_SOURCE_TIMEOUT_SECONDS", "300"))
+# Default base interval between scrapes of a source, in minutes
+DEFAULT_INTERVAL_MINUTES = float(os.getenv("SCRAPE_INTERVAL_HOURS", "1")) * 60
+
+
+class ScrapeSource:
+    """A company source: which scraper to build, with which defaults, and how expensive it is"""
+
+    def __init__(
+        self,
+        key: str,
+        name: str,
+        scraper_cls: type,
+        defaults: Dict[str, Any],
+        uses_browser: bool = False,
+        timeout_seconds: Optional[float] = None,
+        interval_minutes: Optional[float] = None,
+        details: str = "page"
+    ):
+        """
+        Initialize a scrape source
+
+        Args:
+            key: Short lowercase identifier (e.g., "rbc"), also the job ID prefix
+            name: Display name used in logs
+            scraper_cls: Scraper class to instantiate
+            defaults: Keyword arguments passed to the scraper constructor
+            uses_browser: Whether the scraper launches Chromium through Playwright
+            timeout_seconds: Deadline for one scrape of this source
+            interval_minutes: Base interval between scheduled scrapes of this source
+            details: How the enrichment stage fetches a job's details: "page" (job page over HTTP),
+                "browser" (job page rendered in Chromium) or "api" (the scraper's fetch_job_detail())
+        """
+        self.key = key
+        self.name = name
+        self.scraper_cls = scraper_cls
+        self.defaults = defaults
+        self.uses_browser = uses_browser
+        self.details = details
+        self.timeout_seconds = float(
+            os.getenv(f"SCRAPE_TIMEOUT_{key.upper()}_SECONDS", timeout_seconds or DEFAULT_SOURCE_TIMEOUT_SECONDS)
+        )
+        self.interval_minutes = float(
+            os.getenv(f"SCRAPE_INTERVAL_{key.upper()}_MINUTES", interval_minutes or DEFAULT_INTERVAL_MINUTES)
+        )
+
+    @property
+    def id_prefix(self) -> str:
+        """Prefix shared by the IDs of every job this source produces"""
+        return f"{self.key}_"
+
+    def create_scraper(self, **overrides):
+        """Build a scraper instance, letting callers override the default filters"""
+        kwargs = dict(self.defaults)
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        return self.scraper_cls(**kwargs)
+
+
+SOURCES: Dict[str, ScrapeSource] = {
+    source.key: source
+    for source in [
+        # Software Engineering internships for students and graduates
+        ScrapeSource(
+            "microsoft", "Microsoft", MicrosoftScraper,
+            {
+                "professions": ["Engineering", "Software Engineering"],
+                "experience": "Students and graduates",
+                "employment_type": "Internship",
+            },
+            # A single JSON API, cheap enough to poll often
+            interval_minutes=30,
+            details="api",
+        ),
+        ScrapeSource(
+            "rbc", "RBC", RBCScraper,
+            {"keywords": INTERN_KEYWORDS, "location": None, "job_type": "Internship"},
+        ),
+        ScrapeSource(
+            "bmo", "BMO", BMOScraper,
+            {"keywords": INTERN_KEYWORDS, "location": None, "job_type": "Internship"},
+            uses_browser=True,
+            interval_minutes=120,
+        ),
+        ScrapeSource(
+            "cibc", "CIBC", CIBCScraper,
+            {"keywords": INTERN_KEYWORDS, "location": None, "job_type": "Internship"},
+        ),
+        ScrapeSource(
+            "interac", "Interac", InteracScraper,
+            {"keywords": INTERN_KEYWORDS, "location": None, "job_type": "Internship"},
+        ),
+        # Software Developer intern positions
+        ScrapeSource(
+            "google", "Google", GoogleScraper,
+            {
+                "employment_type": "INTERN",
+                "target_level": "INTERN_AND_APPRENTICE",
+                "search_query": "Software Developer",
+                "locations": ["Canada", "United States"],
+            },
+            uses_browser=True,
+            timeout_seconds=600,
+            interval_minutes=120,
+            details="browser",
+        ),
+    ]
+}
+
+
+def get_sources(keys: Optional[List[str]] = None) -> List[ScrapeSource]:
+    """
+    Resolve source keys to sources, preserving registry order
+
+    Args:
+        keys: Source keys to select (default: every registered source)
+
+    Returns:
+        List of matching sources
+
+    Raises:
+        KeyError: If a key is not registered
+    """
+    if not keys:
+        return list(SOURCES.values())
+
+    wanted = {key.lower() for key in keys}
+    unknown = wanted - set(SOURCES)
+    if unknown:
+        raise KeyError(f"Unknown scrape source(s): {', '.join(sorted(unknown))}")
+    return [source for key, source in SOURCES.items() if key in wanted]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML parser backends on a saved search results page
+
+For each installed backend, parses bmo_sample.html (by default) twice: the whole document as served,
+and the way the scrapers do (raw-text elements stripped, only the body built), and reports parse time
+and peak memory. Peak memory is what tracemalloc sees, i.e. the Python objects of the tree; memory lxml
+and lexbor allocate in C is not counted.
+
+    python benchmark_parsers.py
+    python benchmark_parsers.py --repeat 100 --file page.html
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scrapers import html_parser
+from scrapers.bmo_scraper import BMOScraper
+
+
+def parse_full(html: str, backend: str) -> BeautifulSoup:
+    """The whole document, nothing stripped"""
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        html = LexborHTMLParser(html).html
+        backend = "lxml"
+    return BeautifulSoup(html, backend)
+
+
+def parse_region(html: str, backend: str) -> BeautifulSoup:
+    """What the scrapers build: the body, script and style bodies removed"""
+    return html_parser.parse_document(html, backend=backend)
+
+
+def measure(parse, html: str, backend: str, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        soup = parse(html, backend)
+    seconds = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    soup = parse(html, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, soup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    parser.add_argument("--file", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "bmo_sample.html"))
+    parser.add_argument("--repeat", type=int, default=20, help="Parses per backend and mode")
+    args = parser.parse_args()
+
+    # Per-element selector logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    with open(args.file, encoding="utf-8") as f:
+        html = f.read()
+
+    scraper = BMOScraper()
+    modes = [("full document", parse_full), ("body, stripped", parse_region)]
+
+    print(f"Page: {args.file} ({len(html) / 1024:.0f} KB)")
+    print(f"Backends installed: {', '.join(html_parser.available_backends())}")
+    print(f"{'backend':<12}  {'mode':<15}  {'ms/parse':>8}  {'peak KB':>8}  {'tags':>6}  {'jobs':>5}")
+    for backend in html_parser.available_backends():
+        for mode, parse in modes:
+            seconds, peak, soup = measure(parse, html, backend, args.repeat)
+            tags = len(soup.find_all(True))
+            jobs = scraper._extract_jobs_from_html(soup)
+            print(
+                f"{backend:<12}  {mode:<15}  {seconds * 1000:>8.2f}  {peak / 1024:>8.0f}  "
+                f"{tags:>6}  {len(jobs):>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
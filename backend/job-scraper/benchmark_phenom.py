@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark Phenom search page extraction: embedded JSON scan vs BeautifulSoup selector cascade
+
+Runs both extractors over a saved search results page (bmo_sample.html by default). The sample was
+saved with no matching jobs, so --jobs injects that many synthetic results into its embedded payload
+to show the JSON path returning complete records.
+
+    python benchmark_phenom.py
+    python benchmark_phenom.py --jobs 50 --repeat 200
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scrapers import phenom
+from scrapers.bmo_scraper import BMOScraper
+
+
+def inject_jobs(html: str, count: int) -> str:
+    """Put count synthetic intern postings into the page's embedded search results"""
+    start = html.index(phenom.SEARCH_KEY, html.index(phenom.DDO_MARKER)) + len(phenom.SEARCH_KEY)
+    search, end = json.JSONDecoder().raw_decode(html, start)
+    search["data"]["jobs"] = [
+        {
+            "jobId": f"R25{i:05d}",
+            "title": f"Software Developer Intern {i}",
+            "category": "Technology",
+            "city": "Toronto",
+            "state": "Ontario",
+            "location": "Toronto, Ontario, Canada",
+            "postedDate": "2025-09-01T00:00:00.000+0000",
+        }
+        for i in range(count)
+    ]
+    search["hits"] = search["totalHits"] = count
+    return html[:start] + json.dumps(search) + html[end:]
+
+
+def time_extractor(extract, html: str, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        jobs = extract(html)
+    return (time.perf_counter() - started) / repeat, jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Phenom search page extraction")
+    parser.add_argument("--file", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "bmo_sample.html"))
+    parser.add_argument("--jobs", type=int, default=0, help="Synthetic jobs to inject into the embedded payload")
+    parser.add_argument("--repeat", type=int, default=50, help="Extractions per path")
+    args = parser.parse_args()
+
+    # Per-element selector logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    with open(args.file, encoding="utf-8") as f:
+        html = f.read()
+    if args.jobs:
+        html = inject_jobs(html, args.jobs)
+
+    scraper = BMOScraper()
+    paths = [
+        ("embedded json", scraper._parse_embedded_page),
+        ("selector cascade", scraper._parse_page),
+    ]
+
+    print(f"Page: {args.file} ({len(html) / 1024:.0f} KB)")
+    print(f"{'path':<18}  {'ms/page':>8}  {'jobs':>5}  {'with posted date':>16}")
+    for name, extract in paths:
+        seconds, jobs = time_extractor(extract, html, args.repeat)
+        jobs = jobs or []
+        dated = sum(1 for job in jobs if job.get("posted_date"))
+        print(f"{name:<18}  {seconds * 1000:>8.2f}  {len(jobs):>5}  {dated:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from models.database import SessionLocal, engine
-from models.job import JobPosting, Base
+from models import JobDescription, JobEnrichment, JobPosting, Base
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,8 +30,10 @@ def clean_database():
             logger.info("Database is already empty. Nothing to clean.")
             return
         
-        # Delete all jobs
+        # Delete all jobs, with their descriptions and enrichment state
         deleted_count = db.query(JobPosting).delete()
+        db.query(JobDescription).delete()
+        db.query(JobEnrichment).delete()
         db.commit()
         
         logger.info(f"✅ Successfully deleted {deleted_count} jobs from database")
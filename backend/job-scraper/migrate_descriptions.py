@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+One-off migration of job descriptions out of job_postings.
+
+Descriptions used to be a Text column of job_postings, read by every listing query. They now live
+compressed in job_descriptions. This script copies the old column over in batches and then drops it.
+Descriptions the enrichment stage fetched since the upgrade are kept; listing teasers scraped in the
+meantime are overwritten by the full descriptions they stood in for.
+
+    python migrate_descriptions.py --dry-run
+    python migrate_descriptions.py
+    python migrate_descriptions.py --keep-column
+"""
+import sys
+import os
+import logging
+from typing import Dict
+
+from sqlalchemy import func, inspect, text
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.ingest import store_descriptions
+from models import JobDescription, JobEnrichment
+from models.database import SessionLocal, engine, init_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+SELECT_BATCH = text(
+    "SELECT id, description FROM job_postings "
+    "WHERE description IS NOT NULL AND description != '' AND id > :after "
+    "ORDER BY id LIMIT :limit"
+)
+
+
+def migrate_descriptions(dry_run: bool = False, keep_column: bool = False) -> Dict[str, int]:
+    """
+    Copy job_postings.description into job_descriptions, then drop the column
+
+    Args:
+        dry_run: Report what would be copied without writing
+        keep_column: Leave job_postings.description in place after copying
+
+    Returns:
+        Counts of descriptions copied, their bytes before and after compression
+    """
+    counts = {"descriptions": 0, "bytes": 0, "compressed_bytes": 0}
+    columns = {column["name"] for column in inspect(engine).get_columns("job_postings")}
+    if "description" not in columns:
+        logger.info("job_postings has no description column; nothing to migrate")
+        return counts
+
+    # Creates job_descriptions if the service hasn't started since upgrading
+    init_db()
+    db = SessionLocal()
+    try:
+        after = ""
+        while True:
+            rows = db.execute(SELECT_BATCH, {"after": after, "limit": BATCH_SIZE}).all()
+            if not rows:
+                break
+            after = rows[-1][0]
+            counts["descriptions"] += len(rows)
+            counts["bytes"] += sum(len(description.encode("utf-8")) for _, description in rows)
+            if not dry_run:
+                descriptions = dict(rows)
+                enriched = {
+                    job_id for (job_id,) in db.query(JobEnrichment.job_id).filter(
+                        JobEnrichment.job_id.in_(list(descriptions)),
+                        JobEnrichment.enriched_hash.isnot(None)
+                    )
+                }
+                store_descriptions(db, {job_id: descriptions.pop(job_id) for job_id in enriched}, replace=False)
+                store_descriptions(db, descriptions)
+                db.commit()
+
+        if dry_run:
+            return counts
+
+        counts["compressed_bytes"] = db.query(func.coalesce(func.sum(func.length(JobDescription.content)), 0)).scalar()
+        if not keep_column:
+            try:
+                db.execute(text("ALTER TABLE job_postings DROP COLUMN description"))
+                db.commit()
+                logger.info("Dropped job_postings.description")
+            except Exception as e:
+                # SQLite before 3.35 can't drop columns; the unused column is harmless
+                db.rollback()
+                logger.warning(f"Could not drop job_postings.description, leaving it unused: {e}")
+        return counts
+
+    except Exception as e:
+        logger.error(f"❌ Error migrating descriptions: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move job descriptions to the compressed job_descriptions table")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be copied without writing")
+    parser.add_argument("--keep-column", action="store_true", help="Don't drop job_postings.description afterwards")
+    args = parser.parse_args()
+
+    counts = migrate_descriptions(dry_run=args.dry_run, keep_column=args.keep_column)
+    if args.dry_run:
+        logger.info(f"Dry run: would have copied {counts['descriptions']} descriptions ({counts['bytes'] / 1024:.0f} KB)")
+    else:
+        logger.info(
+            f"✅ Copied {counts['descriptions']} descriptions ({counts['bytes'] / 1024:.0f} KB); "
+            f"job_descriptions now holds {counts['compressed_bytes'] / 1024:.0f} KB compressed"
+        )
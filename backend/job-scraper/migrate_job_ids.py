@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+One-off migration to deterministic job IDs.
+
+Jobs scraped before scrapers/identity.py were keyed by hash(url), which Python salts per process,
+or (Google) by title and position in the results. The same posting could therefore be stored many
+times. This script computes the ID each job gets now, canonicalizes its URL and merges rows that
+turn out to be the same posting into one, along with their job_enrichment rows.
+
+    python migrate_job_ids.py --dry-run
+    python migrate_job_ids.py
+"""
+import sys
+import os
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.ingest import source_key
+from app.sources import SOURCES
+from models.database import SessionLocal
+from models.job import JobPosting
+from models.job_enrichment import JobEnrichment
+from scrapers.identity import canonicalize_url, job_id_from_url
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def new_identity(job: JobPosting) -> Tuple[str, str]:
+    """
+    ID and URL the current scrapers would give a stored job
+
+    Returns:
+        (job ID, URL); unchanged for sources whose IDs always came from the site (e.g., Microsoft)
+    """
+    source = SOURCES.get(source_key(job.id))
+    scraper_cls = source.scraper_cls if source else None
+    if scraper_cls is None or not hasattr(scraper_cls, "JOB_ID_PATTERN"):
+        return job.id, job.url
+
+    url = canonicalize_url(job.url)
+    if hasattr(scraper_cls, "job_id"):
+        return scraper_cls.job_id(url, job.title, job.location), url
+    return job_id_from_url(source.key, url, scraper_cls.JOB_ID_PATTERN), url
+
+
+def merge_into(keeper: JobPosting, duplicates: List[JobPosting]):
+    """Fold the history of duplicate rows into the row that is kept"""
+    for duplicate in duplicates:
+        keeper.first_seen = min(keeper.first_seen, duplicate.first_seen)
+        keeper.last_seen = max(keeper.last_seen, duplicate.last_seen)
+        keeper.is_active = keeper.is_active or duplicate.is_active
+        keeper.scraped_count = (keeper.scraped_count or 0) + (duplicate.scraped_count or 0)
+        keeper.posted_date = keeper.posted_date or duplicate.posted_date
+        keeper.description = keeper.description or duplicate.description
+        keeper.team = keeper.team or duplicate.team
+
+
+def merge_enrichment(
+    keeper: JobPosting,
+    duplicates: List[JobPosting],
+    states: Dict[str, JobEnrichment],
+    db: Session
+) -> Optional[JobEnrichment]:
+    """
+    Keep one enrichment state for a merged group and delete the rest
+
+    The keeper's own state wins if its details were fetched, else the first duplicate's that was (whose
+    description then replaces the keeper's), else whichever state exists.
+
+    Returns:
+        The state kept, to be re-keyed with the keeper, or None when the group had none
+    """
+    group = [job for job in [keeper, *duplicates] if job.id in states]
+    if not group:
+        return None
+    owner = next((job for job in group if states[job.id].enriched_hash), group[0])
+    if owner is not keeper and owner.description:
+        keeper.description = owner.description
+    for job in group:
+        if job is not owner:
+            db.delete(states[job.id])
+    return states[owner.id]
+
+
+def migrate_job_ids(dry_run: bool = False) -> Dict[str, int]:
+    """
+    Re-key every job to its deterministic ID, merging duplicates
+
+    Args:
+        dry_run: Report what would change without writing
+
+    Returns:
+        Counts of jobs examined, re-keyed and merged away
+    """
+    db: Session = SessionLocal()
+    counts = {"jobs": 0, "rekeyed": 0, "merged": 0}
+
+    try:
+        jobs = db.query(JobPosting).all()
+        counts["jobs"] = len(jobs)
+        states = {state.job_id: state for state in db.query(JobEnrichment)}
+
+        groups: Dict[str, List[JobPosting]] = defaultdict(list)
+        urls: Dict[str, str] = {}
+        for job in jobs:
+            new_id, url = new_identity(job)
+            groups[new_id].append(job)
+            urls[job.id] = url
+
+        renames: List[Tuple[JobPosting, Optional[JobEnrichment], str]] = []
+        for new_id, group in groups.items():
+            # Keep the row already carrying the new ID, else the most recently seen one
+            group.sort(key=lambda job: (job.id == new_id, job.last_seen), reverse=True)
+            keeper, duplicates = group[0], group[1:]
+            state = merge_enrichment(keeper, duplicates, states, db)
+            if duplicates:
+                logger.info(f"Merging {', '.join(job.id for job in duplicates)} into {new_id}")
+                merge_into(keeper, duplicates)
+                counts["merged"] += len(duplicates)
+                for duplicate in duplicates:
+                    db.delete(duplicate)
+            keeper.url = urls[keeper.id]
+            # last_seen is stamped on every UPDATE unless the statement sets it; keep the scraped one
+            flag_modified(keeper, "last_seen")
+            if keeper.id != new_id:
+                renames.append((keeper, state, new_id))
+        counts["rekeyed"] = len(renames)
+
+        if dry_run:
+            db.rollback()
+            return counts
+
+        db.flush()
+        # Move renamed rows out of the way first, so a new ID can't collide with an old one that is
+        # itself about to change; enrichment state moves with its job
+        for keeper, state, new_id in renames:
+            keeper.id = f"~{new_id}"
+            flag_modified(keeper, "last_seen")
+            if state is not None:
+                state.job_id = keeper.id
+        db.flush()
+        for keeper, state, new_id in renames:
+            keeper.id = new_id
+            flag_modified(keeper, "last_seen")
+            if state is not None:
+                state.job_id = new_id
+        db.commit()
+        return counts
+
+    except Exception as e:
+        logger.error(f"❌ Error migrating job IDs: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-key jobs to deterministic IDs and merge duplicates")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    counts = migrate_job_ids(dry_run=args.dry_run)
+    prefix = "Dry run: would have re-keyed" if args.dry_run else "✅ Re-keyed"
+    logger.info(f"{prefix} {counts['rekeyed']} of {counts['jobs']} jobs, merging {counts['merged']} duplicates")
@@ -1,4 +1,7 @@
 from .job import JobPosting, Base
+from .scrape_run import ScrapeRun, ScrapeRunSource
+from .fetch_state import FetchState
+from .job_enrichment import JobEnrichment
+from .job_description import JobDescription
 
-__all__ = ["JobPosting", "Base"]
-
+__all__ = ["JobPosting", "ScrapeRun", "ScrapeRunSource", "FetchState", "JobEnrichment", "JobDescription", "Base"]
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from .job import Base
 import os
@@ -22,6 +22,28 @@ def init_db():
         # If tables already exist, that's okay - just log and continue
         print(f"Note: Some tables may already exist: {e}")
         pass
+    
+    add_missing_columns()
+
+def add_missing_columns():
+    """
+    Add nullable columns that were added to a model after its table was created.
+    create_all() only creates missing tables, it never alters existing ones.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"Note: Added column {table.name}.{column.name}")
 
 def get_db() -> Session:
     """Dependency to get database session"""
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+
+from .job import Base
+
+class FetchState(Base):
+    """What a scraped page looked like last time: HTTP validators, body digest and the jobs parsed from it"""
+    __tablename__ = "fetch_states"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of the URL plus the parse settings
+    url = Column(Text, nullable=False)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    body_hash = Column(String(64), nullable=True)  # sha256 of the response body
+    result = Column(Text, nullable=True)  # JSON of what the scraper's parse method returned
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
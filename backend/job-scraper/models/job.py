@@ -1,6 +1,8 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, Index
+from sqlalchemy import Column, String, DateTime, Boolean, Integer
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Optional
 
 Base = declarative_base()
 
@@ -13,7 +15,6 @@ class JobPosting(Base):
     team = Column(String(255), nullable=True)
     location = Column(String(255), nullable=True)
     url = Column(String(500), nullable=False)
-    description = Column(Text, nullable=True)
     
     # Metadata
     first_seen = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -24,19 +25,48 @@ class JobPosting(Base):
     posted_date = Column(DateTime, nullable=True)
     scraped_count = Column(Integer, default=1)
     
-    def to_dict(self):
-        return {
+    # Description lives in job_descriptions (compressed) and is only loaded when asked for
+    description_record = relationship(
+        "JobDescription",
+        primaryjoin="JobPosting.id == foreign(JobDescription.job_id)",
+        uselist=False,
+        cascade="all, delete-orphan",
+        # No foreign key in the database; the ORM carries job ID changes over itself
+        passive_updates=False,
+    )
+    
+    @property
+    def description(self) -> Optional[str]:
+        """Full description, loaded and decompressed on first access"""
+        record = self.description_record
+        return record.text if record is not None else None
+    
+    @description.setter
+    def description(self, text: Optional[str]):
+        from .job_description import JobDescription, description_row
+        
+        if not text:
+            self.description_record = None
+        elif self.description_record is None:
+            self.description_record = JobDescription(**description_row(self.id, text))
+        else:
+            self.description_record.replace(text)
+    
+    def to_dict(self, include_description: bool = False):
+        data = {
             "id": self.id,
             "company": self.company,
             "title": self.title,
             "team": self.team,
             "location": self.location,
             "url": self.url,
-            "description": self.description,
             "first_seen": self.first_seen.isoformat() if self.first_seen else None,
             "last_seen": self.last_seen.isoformat() if self.last_seen else None,
             "is_active": self.is_active,
             "posted_date": self.posted_date.isoformat() if self.posted_date else None,
             "scraped_count": self.scraped_count,
         }
+        if include_description:
+            data["description"] = self.description
+        return data
 
@@ -0,0 +1,106 @@
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary
+from datetime import datetime
+from typing import Dict, Optional
+import hashlib
+import logging
+import os
+import zlib
+
+from .job import Base
+
+try:
+    import zstandard
+except ImportError:  # Descriptions are compressed with zlib without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# zlib, or zstd (opt-in: pip install zstandard; falls back to zlib), for descriptions written from now on
+DESCRIPTION_CODEC = os.getenv("DESCRIPTION_CODEC", "zlib").lower()
+# Compression level (zlib 1-9, zstd 1-22); unset uses each codec's default
+DESCRIPTION_COMPRESSION_LEVEL = os.getenv("DESCRIPTION_COMPRESSION_LEVEL")
+
+CODECS = ["zlib", "zstd"]
+DEFAULT_LEVELS = {"zlib": 6, "zstd": 3}
+
+
+def _resolve_codec(codec: str) -> str:
+    if codec not in CODECS:
+        logger.warning(f"Unknown DESCRIPTION_CODEC {codec}, using zlib")
+        return "zlib"
+    if codec == "zstd" and zstandard is None:
+        logger.warning("DESCRIPTION_CODEC is zstd but the zstandard package is not installed, using zlib")
+        return "zlib"
+    return codec
+
+
+_codec: Optional[str] = None
+
+
+def get_codec() -> str:
+    """The configured codec, checked once per process"""
+    global _codec
+    if _codec is None:
+        _codec = _resolve_codec(DESCRIPTION_CODEC)
+    return _codec
+
+
+def compress(text: str, codec: Optional[str] = None) -> bytes:
+    """UTF-8 text compressed with the given codec (default: the configured one)"""
+    codec = codec or get_codec()
+    level = int(DESCRIPTION_COMPRESSION_LEVEL or DEFAULT_LEVELS[codec])
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def decompress(content: bytes, codec: str) -> str:
+    """Text stored by compress(); rows keep the codec they were written with"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Description is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(content).decode("utf-8")
+    return zlib.decompress(content).decode("utf-8")
+
+
+def content_hash(text: str) -> str:
+    """sha256 of a description, to tell whether a fetched one differs from the stored one"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def description_row(job_id: str, text: str, updated_at: Optional[datetime] = None) -> Dict:
+    """Column values of the job_descriptions row holding a description"""
+    codec = get_codec()
+    return {
+        "job_id": job_id,
+        "codec": codec,
+        "content": compress(text, codec),
+        "content_hash": content_hash(text),
+        "size": len(text.encode("utf-8")),
+        "updated_at": updated_at or datetime.utcnow(),
+    }
+
+
+class JobDescription(Base):
+    """Full description of a job, compressed and kept out of job_postings so listing queries stay narrow"""
+    __tablename__ = "job_descriptions"
+
+    job_id = Column(String(255), primary_key=True)  # job_postings.id
+    codec = Column(String(8), nullable=False)  # zlib or zstd
+    content = Column(LargeBinary, nullable=False)  # UTF-8 text compressed with codec
+    content_hash = Column(String(64), nullable=False)  # sha256 of the uncompressed text
+    size = Column(Integer, nullable=False)  # Uncompressed bytes
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def text(self) -> str:
+        return decompress(self.content, self.codec)
+
+    def replace(self, text: str):
+        """Store a new description in this row, unless it is the one already stored"""
+        row = description_row(self.job_id, text)
+        if row["content_hash"] == self.content_hash:
+            return
+        for name, value in row.items():
+            setattr(self, name, value)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text
+from datetime import datetime
+
+from .job import Base
+
+class JobEnrichment(Base):
+    """Detail enrichment state of a job: the listing as last scraped and the listing its details were fetched for"""
+    __tablename__ = "job_enrichment"
+    
+    job_id = Column(String(255), primary_key=True)  # job_postings.id
+    listing_hash = Column(String(64), nullable=False)  # sha256 of the listing fields as last scraped
+    enriched_hash = Column(String(64), nullable=True)  # listing_hash the stored details were fetched for
+    attempts = Column(Integer, default=0, nullable=False)  # Failed detail fetches of the current listing
+    last_error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Listing changed or fetch failed
+    enriched_at = Column(DateTime, nullable=True)
@@ -0,0 +1,108 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float, Text, ForeignKey, BigInteger
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import json
+
+from .job import Base
+
+class ScrapeRun(Base):
+    __tablename__ = "scrape_runs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    trigger = Column(String(20), nullable=False)  # startup, scheduled or manual
+    status = Column(String(20), nullable=False, index=True)  # queued, running, success, partial or failed
+    sources = Column(String(255), nullable=False)  # Comma-separated source keys
+    params = Column(Text, nullable=True)  # JSON object of scraper filter overrides, null for a full scrape
+    failed_sources = Column(String(255), nullable=True)  # Comma-separated keys of sources that errored
+    
+    queued_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    jobs_found = Column(Integer, default=0)
+    jobs_new = Column(Integer, default=0)
+    jobs_updated = Column(Integer, default=0)
+    jobs_deactivated = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    
+    source_results = relationship(
+        "ScrapeRunSource",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        order_by="ScrapeRunSource.id"
+    )
+    
+    @property
+    def source_keys(self):
+        return self.sources.split(",") if self.sources else []
+    
+    @property
+    def overrides(self):
+        return json.loads(self.params) if self.params else {}
+    
+    def to_dict(self, include_sources: bool = False):
+        data = {
+            "id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "sources": self.source_keys,
+            "failed_sources": self.failed_sources.split(",") if self.failed_sources else [],
+            "params": self.overrides,
+            "queued_at": self.queued_at.isoformat() if self.queued_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": (
+                round((self.finished_at - self.started_at).total_seconds(), 2)
+                if self.finished_at and self.started_at else None
+            ),
+            "jobs_found": self.jobs_found,
+            "jobs_new": self.jobs_new,
+            "jobs_updated": self.jobs_updated,
+            "jobs_deactivated": self.jobs_deactivated,
+            "error": self.error,
+        }
+        if include_sources:
+            data["source_results"] = [result.to_dict() for result in self.source_results]
+        return data
+
+class ScrapeRunSource(Base):
+    __tablename__ = "scrape_run_sources"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey("scrape_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    source = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # success, failed, or skipped while its circuit breaker is open
+    
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, nullable=True)  # Wall time spent scraping this source
+    
+    pages_fetched = Column(Integer, default=0)
+    bytes_downloaded = Column(BigInteger, default=0)
+    
+    jobs_found = Column(Integer, default=0)
+    jobs_new = Column(Integer, default=0)
+    jobs_updated = Column(Integer, default=0)
+    jobs_deactivated = Column(Integer, default=0)
+    
+    error = Column(Text, nullable=True)
+    metrics = Column(Text, nullable=True)  # JSON object of extra scraper counters
+    
+    run = relationship("ScrapeRun", back_populates="source_results")
+    
+    def to_dict(self):
+        return {
+            "source": self.source,
+            "status": self.status,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "pages_fetched": self.pages_fetched,
+            "bytes_downloaded": self.bytes_downloaded,
+            "jobs_found": self.jobs_found,
+            "jobs_new": self.jobs_new,
+            "jobs_updated": self.jobs_updated,
+            "jobs_deactivated": self.jobs_deactivated,
+            "error": self.error,
+            "metrics": json.loads(self.metrics) if self.metrics else {},
+        }
@@ -2,15 +2,22 @@
 BMO Careers Scraper
 Scrapes job listings from BMO's career page
 """
-import asyncio
-from typing import List, Dict, Optional
-import httpx
+from typing import AsyncIterator, List, Dict, Optional
 import logging
-from datetime import datetime
 from bs4 import BeautifulSoup
 import re
-import json
-from playwright.async_api import async_playwright
+from playwright.async_api import Page
+
+from .browser_pool import browser_pool
+from . import phenom
+from .html_parser import parse_document
+from .identity import canonicalize_url, job_id_from_url
+from .parse_pool import parse_html
+from .resilience import goto_with_retries
+from .resource_blocking import block_resources
+from .response_capture import RESPONSE_CAPTURE_ENABLED, ResponseCapture
+from .stats import increment, record_page
+from .selector_cascade import Cascade, CascadeExtractor, has_href
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +28,70 @@ class BMOScraper:
     BASE_URL = "https://jobs.bmo.com"
     SEARCH_URL = "https://jobs.bmo.com/global/en/search-results"
     COMPANY_NAME = "BMO"
+    # Job ID segment of links on the site (/job/<jobId>/<slug>)
+    JOB_ID_PATTERN = phenom.JOB_PATH_ID
+    SITE_URL = "https://jobs.bmo.com/global/en"
+    # Selector cascades, most specific first, compiled once; which selector each field came from is
+    # counted in the run metrics (selector_hits)
+    SELECTORS = CascadeExtractor(
+        containers=[
+            'div[data-automation-id="jobTitle"]',
+            '.job-title',
+            '.job-listing',
+            '.search-result',
+            'article',
+            '.job-item',
+            '[data-testid="job-card"]',
+            '.job-card',
+            '.search-result-item',
+              # BMO-specific selectors
+            '[data-automation-id*="job"]',
+            '[data-testid*="job"]',
+            '.css-1q2dra3',  # Common BMO selector
+            '.css-19uc56f',  # Common BMO selector
+            'div[class*="job"]',
+            'div[class*="result"]',
+            'div[class*="card"]',
+            'div[class*="item"]',
+        ],
+        fields={
+            "title": Cascade([
+                'a[data-automation-id="jobTitle"]',
+                '.job-title a',
+                'h3 a',
+                'h2 a',
+                'a[href*="/job/"]',
+                '.title a',
+                '.job-title',
+                'h3',
+                'h2',
+            ]),
+            "url": Cascade([
+                'a[data-automation-id="jobTitle"]',
+                '.job-title a',
+                'h3 a',
+                'h2 a',
+                'a[href*="/job/"]',
+            ], require=has_href),
+            "location": Cascade([
+                '[data-automation-id="jobLocation"]',
+                '.job-location',
+                '.location',
+                '.job-city',
+                '.city',
+                '.job-location-text',
+            ]),
+            "team": Cascade([
+                '[data-automation-id="jobCategory"]',
+                '.job-category',
+                '.department',
+                '.team',
+                '.job-category-text',
+            ]),
+        }
+    )
+    # Phenom search API the results page calls to load and page through listings
+    SEARCH_API_PATTERN = r"jobs\.bmo\.com/widgets(\?|$)"
     
     def __init__(
         self, 
@@ -60,15 +131,26 @@ class BMOScraper:
             List of job dictionaries with keys: id, company, title, team, location, url
         """
         jobs = []
+        async for page_jobs in self.stream():
+            jobs.extend(page_jobs)
+        return jobs
+    
+    async def stream(self) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Scrape all job postings from BMO careers page using Playwright, yielding the jobs of each page as soon as it is parsed
+        
+        Yields:
+            Lists of job dictionaries with keys: id, company, title, team, location, url
+        """
+        jobs_scraped = 0
         
         try:
-            async with async_playwright() as p:
-                # Launch browser
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
-                page = await context.new_page()
+            # Page in a fresh context of the shared browser
+            async with browser_pool.page(
+                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            ) as page:
+                # Skip images, fonts, media and trackers; extraction only needs the DOM
+                await block_resources(page)
                 
                 # Build the search URL with parameters
                 search_params = self._build_search_params(1)
@@ -76,22 +158,17 @@ class BMOScraper:
                 
                 logger.info(f"Scraping BMO careers: {search_url}")
                 
-                # Navigate to the page
-                await page.goto(search_url, wait_until="networkidle")
+                # Listen for the search API responses the page's own scripts fetch
+                capture = ResponseCapture(page, [self.SEARCH_API_PATTERN]) if RESPONSE_CAPTURE_ENABLED else None
+                if capture:
+                    capture.start()
                 
-                # Wait for job listings to load
-                try:
-                    await page.wait_for_selector('[data-automation-id="jobTitle"], .job-title, .search-result, article', timeout=10000)
-                except:
-                    logger.warning("No job selectors found, trying alternative approach")
-                
-                # Get the page content
-                content = await page.content()
-                soup = BeautifulSoup(content, 'html.parser')
+                # Navigate to the page
+                await goto_with_retries(page, search_url, wait_until="networkidle")
                 
-                # Extract jobs from the page
-                page_jobs = self._extract_jobs_from_html(soup)
-                jobs.extend(page_jobs)
+                page_jobs = await self._extract_current_page(page, capture, first_load=True)
+                jobs_scraped += len(page_jobs)
+                yield page_jobs
                 logger.info(f"Scraped {len(page_jobs)} jobs from page 1")
                 
                 # Check for pagination and scrape additional pages
@@ -118,58 +195,91 @@ class BMOScraper:
                             await page.wait_for_load_state("networkidle")
                             
                             # Extract jobs from next page
-                            content = await page.content()
-                            soup = BeautifulSoup(content, 'html.parser')
-                            page_jobs = self._extract_jobs_from_html(soup)
-                            jobs.extend(page_jobs)
+                            page_jobs = await self._extract_current_page(page, capture)
+                            jobs_scraped += len(page_jobs)
+                            yield page_jobs
                             logger.info(f"Scraped {len(page_jobs)} jobs from page 2")
                             
                 except Exception as e:
                     logger.warning(f"Pagination handling failed: {e}")
                 
-                await browser.close()
-                
         except Exception as e:
             logger.error(f"Error scraping BMO: {e}")
             raise
         
-        logger.info(f"Total jobs scraped from BMO: {len(jobs)}")
+        logger.info(f"Total jobs scraped from BMO: {jobs_scraped}")
+    
+    async def _extract_current_page(
+        self,
+        page: Page,
+        capture: Optional[ResponseCapture],
+        first_load: bool = False
+    ) -> List[Dict[str, str]]:
+        """
+        Jobs of the results page on screen, from the first source available: the search API responses it
+        fetched, the search results JSON embedded in it (first load only), or the rendered DOM
+        """
+        if capture is not None:
+            captured_jobs = self._jobs_from_search_responses(await capture.collect())
+            if captured_jobs is not None:
+                increment("pages_from_api_responses")
+                return captured_jobs
+            logger.info("No BMO search API response captured")
+        
+        if first_load:
+            # A freshly loaded results page carries its results as embedded JSON; after clicking
+            # through pages that JSON is stale, so only the first page can use it
+            content = await page.content()
+            record_page(len(content.encode()))
+            embedded_jobs = await parse_html(self._parse_embedded_page, content)
+            if embedded_jobs is not None:
+                increment("pages_from_embedded_json")
+                return embedded_jobs
+            logger.info("No embedded BMO search results, extracting jobs from the rendered page")
+            
+            # Wait for job listings to load
+            try:
+                await page.wait_for_selector('[data-automation-id="jobTitle"], .job-title, .search-result, article', timeout=10000)
+            except:
+                logger.warning("No job selectors found, trying alternative approach")
+        
+        # Get the page content
+        content = await page.content()
+        record_page(len(content.encode()))
+        
+        # Extract jobs from the page off the event loop
+        return await parse_html(self._parse_page, content)
+    
+    def _jobs_from_search_responses(self, payloads: List) -> Optional[List[Dict[str, str]]]:
+        """Map captured Phenom refineSearch responses to job records; None when none of them is one"""
+        jobs = None
+        for payload in payloads:
+            search = payload.get("refineSearch") if isinstance(payload, dict) else None
+            if isinstance(search, dict):
+                jobs = (jobs or []) + self._jobs_from_search(search)
         return jobs
     
+    def _jobs_from_search(self, search: Dict) -> List[Dict[str, str]]:
+        return phenom.jobs_from_search(search, "bmo", self.COMPANY_NAME, self.SITE_URL, self.keywords)
+    
+    def _parse_embedded_page(self, html: str) -> Optional[List[Dict[str, str]]]:
+        """Jobs of the search results JSON embedded in a first-loaded page, None if it has none (runs in the parse pool)"""
+        search = phenom.extract_search_results(html)
+        return self._jobs_from_search(search) if search is not None else None
+    
+    def _parse_page(self, html: str) -> List[Dict[str, str]]:
+        """Parse a rendered search results page into job records (runs in the parse pool)"""
+        return self._extract_jobs_from_html(parse_document(html))
+    
     def _extract_jobs_from_html(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
         """Extract all jobs from the HTML page"""
         jobs = []
         
         try:
-            # Look for job listings - BMO uses dynamic content, so we need broader selectors
-            job_selectors = [
-                'div[data-automation-id="jobTitle"]',
-                '.job-title',
-                '.job-listing',
-                '.search-result',
-                'article',
-                '.job-item',
-                '[data-testid="job-card"]',
-                '.job-card',
-                '.search-result-item',
-                # BMO-specific selectors
-                '[data-automation-id*="job"]',
-                '[data-testid*="job"]',
-                '.css-1q2dra3',  # Common BMO selector
-                '.css-19uc56f',  # Common BMO selector
-                'div[class*="job"]',
-                'div[class*="result"]',
-                'div[class*="card"]',
-                'div[class*="item"]'
-            ]
-            
-            job_elements = []
-            for selector in job_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    job_elements = elements
-                    logger.info(f"Found {len(elements)} job elements using selector: {selector}")
-                    break
+            # Look for job listings with the compiled container cascade
+            job_elements, selector = self.SELECTORS.find_containers(soup)
+            if job_elements:
+                logger.info(f"Found {len(job_elements)} job elements using selector: {selector}")
             
             if not job_elements:
                 # Fallback: look for any div with job-related classes or attributes
@@ -199,25 +309,11 @@ class BMOScraper:
     def _extract_job_data(self, job_element) -> Optional[Dict[str, str]]:
         """Extract job data from a single job element"""
         try:
-            # Extract job title
-            title = None
-            title_selectors = [
-                'a[data-automation-id="jobTitle"]',
-                '.job-title a',
-                'h3 a',
-                'h2 a',
-                'a[href*="/job/"]',
-                '.title a',
-                '.job-title',
-                'h3',
-                'h2'
-            ]
+            # Resolve every field's selector cascade in one pass over the element
+            fields = self.SELECTORS.extract(job_element)
             
-            for selector in title_selectors:
-                title_elem = job_element.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    break
+            # Extract job title
+            title = fields["title"].get_text(strip=True) if fields["title"] else None
             
             if not title:
                 # Try to find any link that might be a job title
@@ -232,76 +328,23 @@ class BMOScraper:
                 return None
             
             # Extract job URL
-            url = None
-            url_selectors = [
-                'a[data-automation-id="jobTitle"]',
-                '.job-title a',
-                'h3 a',
-                'h2 a',
-                'a[href*="/job/"]'
-            ]
-            
-            for selector in url_selectors:
-                url_elem = job_element.select_one(selector)
-                if url_elem and url_elem.get('href'):
-                    url = url_elem.get('href')
-                    if url.startswith('/'):
-                        url = self.BASE_URL + url
-                    break
+            url = fields["url"].get('href') if fields["url"] else None
+            if url and url.startswith('/'):
+                url = self.BASE_URL + url
             
             if not url:
                 logger.debug(f"No URL found for job: {title}")
                 return None
+            url = canonicalize_url(url)
             
             # Extract location
-            location = None
-            location_selectors = [
-                '[data-automation-id="jobLocation"]',
-                '.job-location',
-                '.location',
-                '.job-city',
-                '.city',
-                '.job-location-text'
-            ]
-            
-            for selector in location_selectors:
-                loc_elem = job_element.select_one(selector)
-                if loc_elem:
-                    location = loc_elem.get_text(strip=True)
-                    break
+            location = fields["location"].get_text(strip=True) if fields["location"] else None
             
             # Extract team/department
-            team = None
-            team_selectors = [
-                '[data-automation-id="jobCategory"]',
-                '.job-category',
-                '.department',
-                '.team',
-                '.job-category-text'
-            ]
-            
-            for selector in team_selectors:
-                team_elem = job_element.select_one(selector)
-                if team_elem:
-                    team = team_elem.get_text(strip=True)
-                    break
-            
-            # Extract job ID from URL
-            job_id = None
-            if url:
-                # Try to extract job ID from URL
-                id_match = re.search(r'/job/(\d+)', url)
-                if id_match:
-                    job_id = id_match.group(1)
-                else:
-                    # Use URL hash as ID
-                    job_id = str(hash(url))[-8:]  # Last 8 characters of hash
-            
-            if not job_id:
-                job_id = f"bmo_{hash(url)}"
+            team = fields["team"].get_text(strip=True) if fields["team"] else None
             
-            # Create unique ID with company prefix
-            unique_id = f"bmo_{job_id}"
+            # The site's job ID from the URL, or a digest of the canonical URL when it has none
+            unique_id = job_id_from_url("bmo", url, self.JOB_ID_PATTERN)
             
             # Check if this is an intern/co-op position
             title_lower = title.lower()
@@ -0,0 +1,190 @@
+"""
+Shared Playwright browser
+One Chromium process for every browser-backed scraper, handing out a fresh context per page and
+relaunching the process once it has served enough pages or grown too large
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import logging
+import os
+import time
+
+from playwright.async_api import Browser, Page, Playwright, async_playwright
+
+try:
+    import psutil
+except ImportError:  # RSS-based recycling is skipped without psutil (in requirements.txt)
+    psutil = None
+
+from .stats import increment
+
+logger = logging.getLogger(__name__)
+
+# Pages open at once across all scrapers
+BROWSER_POOL_MAX_PAGES = int(os.getenv("BROWSER_POOL_MAX_PAGES", "4"))
+# Relaunch Chromium after this many pages, or once its processes use more than this much memory (0 disables)
+BROWSER_RECYCLE_PAGES = int(os.getenv("BROWSER_RECYCLE_PAGES", "50"))
+BROWSER_RECYCLE_RSS_MB = float(os.getenv("BROWSER_RECYCLE_RSS_MB", "1024"))
+# Close Chromium after this long without pages, unless a browser-backed scrape is due soon
+BROWSER_IDLE_SECONDS = float(os.getenv("BROWSER_IDLE_SECONDS", "600"))
+
+
+def _chromium_rss_mb() -> Optional[float]:
+    """Resident memory of the Chromium processes under this one, or None without psutil"""
+    if psutil is None:
+        return None
+    total = 0
+    for child in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            if "chrom" in child.name().lower() or "headless_shell" in child.name().lower():
+                total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium shared by the browser-backed scrapers
+
+    Each lease gets its own browser context, so cookies and storage never leak between scrapers, and
+    costs a context instead of a process launch. A browser due for recycling stops taking new leases
+    and is closed once its last page is.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = BROWSER_POOL_MAX_PAGES,
+        recycle_pages: int = BROWSER_RECYCLE_PAGES,
+        recycle_rss_mb: float = BROWSER_RECYCLE_RSS_MB
+    ):
+        self.max_pages = max(1, max_pages)
+        self.recycle_pages = recycle_pages
+        self.recycle_rss_mb = recycle_rss_mb
+        if recycle_rss_mb > 0 and psutil is None:
+            logger.warning("psutil is not installed; Chromium will not be recycled by memory (BROWSER_RECYCLE_RSS_MB)")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        # Open pages per browser, including retired browsers still finishing theirs
+        self._leases: Dict[Browser, int] = {}
+        self._pages_served = 0
+        self.launches = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    def _bind_loop(self):
+        # asyncio primitives and Playwright objects belong to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_pages)
+            self._playwright = None
+            self._browser = None
+            self._leases = {}
+
+    def _due_for_recycling(self) -> bool:
+        if self.recycle_pages > 0 and self._pages_served >= self.recycle_pages:
+            logger.info(f"Recycling Chromium after {self._pages_served} pages")
+            return True
+        if self.recycle_rss_mb > 0:
+            rss_mb = _chromium_rss_mb()
+            if rss_mb is not None and rss_mb > self.recycle_rss_mb:
+                logger.info(f"Recycling Chromium at {rss_mb:.0f} MB RSS")
+                return True
+        return False
+
+    async def _close_browser(self, browser: Browser):
+        self._leases.pop(browser, None)
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing Chromium: {e}")
+
+    async def _retire_browser(self):
+        browser, self._browser = self._browser, None
+        if browser is not None and not self._leases.get(browser):
+            await self._close_browser(browser)
+
+    async def _get_browser(self) -> Browser:
+        async with self._lock:
+            if self._browser is not None and (not self._browser.is_connected() or self._due_for_recycling()):
+                await self._retire_browser()
+            if self._browser is None:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                started = time.monotonic()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._leases[self._browser] = 0
+                self._pages_served = 0
+                self.launches += 1
+                increment("browser_launches")
+                logger.info(f"Launched Chromium in {time.monotonic() - started:.1f}s")
+            return self._browser
+
+    async def start(self):
+        """Launch Chromium ahead of a scrape so the scrape only pays for navigation"""
+        self._bind_loop()
+        await self._get_browser()
+        self.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def page(self, **context_options) -> AsyncIterator[Page]:
+        """
+        async with browser_pool.page(user_agent=...) as page: ... leases a page in a fresh context
+
+        Args:
+            context_options: Options for browser.new_context (e.g., user_agent, viewport)
+
+        Yields:
+            A page, closed together with its context when the block exits
+        """
+        self._bind_loop()
+        async with self._slots:
+            browser = await self._get_browser()
+            self._leases[browser] = self._leases.get(browser, 0) + 1
+            self._pages_served += 1
+            try:
+                context = await browser.new_context(**context_options)
+                try:
+                    yield await context.new_page()
+                finally:
+                    await context.close()
+            finally:
+                self.last_used = time.monotonic()
+                self._leases[browser] -= 1
+                if browser is not self._browser and not self._leases[browser]:
+                    await self._close_browser(browser)
+
+    async def close_if_idle(self, idle_seconds: float = BROWSER_IDLE_SECONDS) -> bool:
+        """Close Chromium when no page has been open for idle_seconds; returns whether it was closed"""
+        if not self.is_running or self._lock is None:
+            return False
+        async with self._lock:
+            if any(self._leases.values()) or time.monotonic() - self.last_used < idle_seconds:
+                return False
+            logger.info(f"Closing Chromium after {idle_seconds:.0f}s idle")
+            await self._retire_browser()
+            return True
+
+    async def close(self):
+        """Close Chromium and stop Playwright (call on application shutdown)"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for browser in list(self._leases):
+            await self._close_browser(browser)
+        self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+# The pool shared by every browser-backed scraper in this process
+browser_pool = BrowserPool()
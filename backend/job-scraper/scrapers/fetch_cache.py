@@ -0,0 +1,148 @@
+"""
+Conditional page fetches
+Sends If-None-Match / If-Modified-Since for pages fetched before and reuses the jobs parsed last time
+when the server answers 304 or returns a byte-identical body
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+import httpx
+
+from models import FetchState
+from models.database import SessionLocal
+from .parse_pool import parse_html
+from .resilience import get_with_retries
+from .stats import increment, record_page
+
+logger = logging.getLogger(__name__)
+
+FETCH_CACHE_ENABLED = os.getenv("FETCH_CACHE_ENABLED", "true").lower() == "true"
+# Bump when extraction logic changes so results parsed by the old code are not reused
+FETCH_CACHE_VERSION = 4
+
+# Marks a datetime in stored parse results, so it comes back as a datetime rather than a string
+DATETIME_TAG = "__datetime__"
+
+
+def _cache_key(url: str, variant: str) -> str:
+    return hashlib.sha256(f"{FETCH_CACHE_VERSION}|{variant}|{url}".encode()).hexdigest()
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {DATETIME_TAG: value.isoformat()}
+    return str(value)
+
+
+def _decode_object(value: Dict) -> Any:
+    if len(value) == 1 and DATETIME_TAG in value:
+        return datetime.fromisoformat(value[DATETIME_TAG])
+    return value
+
+
+def dump_result(result: Any) -> str:
+    """JSON of a parse result; datetimes (e.g., posted_date) are kept as ISO strings tagged for load_result"""
+    return json.dumps(result, default=_encode_value)
+
+
+def load_result(stored: str) -> Any:
+    """Parse result stored by dump_result, with its datetimes restored"""
+    return json.loads(stored, object_hook=_decode_object)
+
+
+def _load_state(key: str) -> Optional[Dict]:
+    db = SessionLocal()
+    try:
+        state = db.query(FetchState).filter(FetchState.key == key).first()
+        if state is None:
+            return None
+        return {
+            "etag": state.etag,
+            "last_modified": state.last_modified,
+            "body_hash": state.body_hash,
+            "result": state.result,
+        }
+    finally:
+        db.close()
+
+
+def _save_state(key: str, url: str, values: Dict):
+    db = SessionLocal()
+    try:
+        state = db.query(FetchState).filter(FetchState.key == key).first()
+        if state is None:
+            state = FetchState(key=key, url=url)
+            db.add(state)
+        for name, value in values.items():
+            setattr(state, name, value)
+        state.updated_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+async def fetch_and_parse(
+    client: httpx.AsyncClient,
+    url: str,
+    parse: Callable[[str], Any],
+    params: Optional[Dict[str, str]] = None,
+    variant: str = ""
+) -> Any:
+    """
+    GET a page and parse it in the parse pool, skipping the parse when the page has not changed
+
+    Args:
+        client: HTTP client to fetch with
+        url: Page URL
+        parse: Scraper parse method (see parse_html); its result must be JSON-serialisable apart from datetimes
+        params: Query parameters
+        variant: Settings that change what parse returns for the same page (e.g., keyword filters)
+
+    Returns:
+        The parse result, fresh or from the last fetch of this page
+    """
+    if not FETCH_CACHE_ENABLED:
+        response = await get_with_retries(client, url, params=params)
+        record_page(len(response.content))
+        return await parse_html(parse, response.text)
+
+    full_url = str(client.build_request("GET", url, params=params).url)
+    key = _cache_key(full_url, f"{parse.__qualname__}|{variant}")
+    state = await asyncio.to_thread(_load_state, key)
+
+    headers = {}
+    if state and state["result"] is not None:
+        if state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state["last_modified"]:
+            headers["If-Modified-Since"] = state["last_modified"]
+
+    response = await get_with_retries(client, url, params=params, headers=headers)
+    record_page(len(response.content))
+
+    if response.status_code == 304 and headers:
+        increment("pages_not_modified")
+        logger.info(f"Not modified, reusing parsed jobs: {full_url}")
+        return load_result(state["result"])
+
+    body_hash = hashlib.sha256(response.content).hexdigest()
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": body_hash,
+    }
+
+    if state and state["result"] is not None and state["body_hash"] == body_hash:
+        increment("pages_unchanged")
+        logger.info(f"Page unchanged, reusing parsed jobs: {full_url}")
+        await asyncio.to_thread(_save_state, key, full_url, validators)
+        return load_result(state["result"])
+
+    result = await parse_html(parse, response.text)
+    await asyncio.to_thread(_save_state, key, full_url, {**validators, "result": dump_result(result)})
+    return result
@@ -1,14 +1,30 @@
 import asyncio
-from typing import List, Dict, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional, Set
 import logging
-from datetime import datetime
-import httpx
-from bs4 import BeautifulSoup
+import math
+import os
 import re
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import Page
+
+from .browser_pool import browser_pool
+from .identity import canonicalize_url, job_id_from_url, stable_job_id
+from .paginator import paginate
+from .resilience import goto_with_retries
+from .resource_blocking import block_resources
+from .stats import increment, record_page
 
 logger = logging.getLogger(__name__)
 
+# Result pages loaded at once, each in its own tab leased from the shared browser pool
+GOOGLE_PAGE_TABS = int(os.getenv("GOOGLE_PAGE_TABS", "3"))
+# Upper bound on result pages followed, in case the page count can't be read
+GOOGLE_MAX_PAGES = int(os.getenv("GOOGLE_MAX_PAGES", "25"))
+# How long a results page gets to render any job listing selector
+GOOGLE_RESULTS_TIMEOUT_MS = int(os.getenv("GOOGLE_RESULTS_TIMEOUT_MS", "8000"))
+# Text nodes the fallback job search inspects before giving up
+GOOGLE_TEXT_SCAN_LIMIT = int(os.getenv("GOOGLE_TEXT_SCAN_LIMIT", "5000"))
+
 class GoogleScraper:
     """
     Scraper for Google careers page using Playwright.
@@ -17,6 +33,14 @@ class GoogleScraper:
     BASE_URL = "https://www.google.com"
     CAREERS_URL = "https://www.google.com/about/careers/applications/jobs/results/"
     COMPANY_NAME = "Google"
+    # Link given to jobs whose card has none
+    CAREERS_HOME = "https://careers.google.com"
+    # Job ID in job links (jobs/results/<id>-<slug>)
+    JOB_ID_PATTERN = re.compile(r"/jobs/results/(\d+)")
+    # Google careers lists 20 jobs per results page
+    RESULTS_PER_PAGE = 20
+    # Signs that job listings have rendered, raced against each other
+    RESULT_SELECTORS = ['[data-testid="job-card"]', '.job-card', '[class*="job-card"]', 'li h3']
 
     def __init__(
         self,
@@ -39,10 +63,13 @@ class GoogleScraper:
         self.search_query = search_query
         self.locations = locations or ["Canada", "United States"]
 
-    def _build_url(self) -> str:
+    def _build_url(self, page: int = 1) -> str:
         """
         Build the careers URL with filters.
         
+        Args:
+            page: Results page number (1-based)
+        
         Returns:
             URL string with query parameters
         """
@@ -53,22 +80,8 @@ class GoogleScraper:
             "q": f'"{self.search_query}"'
         }
         
-        # Add location parameters - each location needs its own parameter
-        for i, location in enumerate(self.locations):
-            params[f"location"] = location
-        
-        # Add company parameters for Google and its subsidiaries
-        companies = ["GFiber", "Wing", "Verily Life Sciences", "Waymo", "X", "Fitbit", "Google", "YouTube"]
-        for company in companies:
-            params[f"company"] = company
-        
         # Build query string
-        query_parts = []
-        
-        # Add basic parameters
-        for key, value in params.items():
-            if key not in ["location", "company"]:  # Handle these separately
-                query_parts.append(f"{key}={value}")
+        query_parts = [f"{key}={value}" for key, value in params.items()]
         
         # Add location parameters (each location gets its own parameter)
         for location in self.locations:
@@ -79,8 +92,29 @@ class GoogleScraper:
         for company in companies:
             query_parts.append(f"company={company}")
         
+        if page > 1:
+            query_parts.append(f"page={page}")
+        
         return f"{self.CAREERS_URL}?{'&'.join(query_parts)}"
 
+    @classmethod
+    def job_id(cls, url: str, title: str, location: Optional[str]) -> str:
+        """
+        Stable ID for a Google job
+        
+        Args:
+            url: Job link (CAREERS_HOME when the card had none)
+            title: Job title
+            location: Job location
+            
+        Returns:
+            "google_<id>" from the link, else a digest of the canonical link, or of title and location
+            for jobs without a link of their own
+        """
+        if canonicalize_url(url) == canonicalize_url(cls.CAREERS_HOME):
+            return stable_job_id("google", canonicalize_url(url), title, location or "")
+        return job_id_from_url("google", url, cls.JOB_ID_PATTERN)
+
     async def scrape(self) -> List[Dict[str, str]]:
         """
         Scrape job postings from Google careers page.
@@ -89,46 +123,151 @@ class GoogleScraper:
             List of job dictionaries with keys: id, company, title, team, location, url, description, posted_date
         """
         jobs = []
+        async for page_jobs in self.stream():
+            jobs.extend(page_jobs)
+        return jobs
+
+    async def stream(self) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Scrape job postings from Google careers page, yielding each page's jobs as soon as they are extracted.
+        
+        Page 1 says how many results there are; the remaining pages are loaded GOOGLE_PAGE_TABS at a time,
+        each in its own tab.
+        
+        Yields:
+            Lists of job dictionaries with keys: id, company, title, team, location, url, description, posted_date
+        """
+        jobs_scraped = 0
+        seen: Set[str] = set()
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
-                try:
-                    url = self._build_url()
-                    logger.info(f"Navigating to {url}")
-                    
-                    await page.goto(url, wait_until="networkidle", timeout=30000)
-                    
-                    # Wait for job listings to load - try multiple selectors
-                    try:
-                        await page.wait_for_selector('[data-testid="job-card"]', timeout=5000)
-                    except:
-                        try:
-                            await page.wait_for_selector('.job-card', timeout=5000)
-                        except:
-                            try:
-                                await page.wait_for_selector('h3', timeout=5000)  # Job titles are in h3 elements
-                            except:
-                                logger.warning("Could not find job card selector, proceeding with extraction")
-                    
-                    # Extract jobs from the page
-                    jobs = await self._extract_jobs_from_page(page)
-                    
-                    logger.info(f"Total jobs scraped from Google: {len(jobs)}")
-                    
-                except Exception as e:
-                    logger.error(f"Error during scraping: {e}")
-                    raise
-                finally:
-                    await browser.close()
+            async with browser_pool.page() as page:
+                page_jobs = await self._scrape_page(page, 1)
+                total_results = await self._result_count(page)
+                has_next = await page.locator('a[aria-label*="next" i], button[aria-label*="next" i]').count() > 0
+            
+            page_jobs = [job for job in page_jobs if job["id"] not in seen]
+            seen.update(job["id"] for job in page_jobs)
+            jobs_scraped += len(page_jobs)
+            yield page_jobs
+            logger.info(f"Scraped {len(page_jobs)} jobs from page 1")
+            
+            if total_results is not None:
+                last_page = min(math.ceil(total_results / self.RESULTS_PER_PAGE), GOOGLE_MAX_PAGES)
+                logger.info(f"Google reports {total_results} results over {last_page} pages")
+            elif has_next and page_jobs:
+                # No count on the page: follow pages until one has nothing new
+                last_page = GOOGLE_MAX_PAGES
+                logger.info(f"Google result count not found, following up to {last_page} pages")
+            else:
+                last_page = 1
+            
+            async def fetch_page(page_num: int) -> List[Dict[str, str]]:
+                async with browser_pool.page() as tab:
+                    return await self._scrape_page(tab, page_num)
+            
+            async with aclosing(paginate(range(2, last_page + 1), fetch_page, GOOGLE_PAGE_TABS)) as results:
+                async for page_num, page_jobs in results:
+                    page_jobs = [job for job in page_jobs if job["id"] not in seen]
+                    if not page_jobs:
+                        # Past the last page Google repeats the final results or shows none
+                        logger.info(f"No new jobs on page {page_num}, stopping")
+                        break
+                    seen.update(job["id"] for job in page_jobs)
+                    jobs_scraped += len(page_jobs)
+                    yield page_jobs
+                    logger.info(f"Scraped {len(page_jobs)} jobs from page {page_num}")
                 
         except Exception as e:
             logger.error(f"Error scraping Google: {e}")
             raise
         
-        return jobs
+        logger.info(f"Total jobs scraped from Google: {jobs_scraped}")
+
+    async def _scrape_page(self, page: Page, page_num: int) -> List[Dict[str, str]]:
+        """
+        Load one results page in a leased tab and extract its jobs
+        
+        Args:
+            page: Playwright page (a tab of the browser pool)
+            page_num: Results page number
+            
+        Returns:
+            List of job dictionaries
+        """
+        # Skip images, fonts, media and trackers; extraction only needs the DOM
+        await block_resources(page)
+        
+        url = self._build_url(page_num)
+        logger.info(f"Navigating to {url}")
+        
+        response = await goto_with_retries(page, url, wait_until="networkidle", timeout=30000)
+        if response:
+            record_page(len(await response.body()))
+        
+        selector = await self._wait_for_results(page)
+        if selector is None:
+            logger.warning(f"Could not find job card selector on page {page_num}, proceeding with extraction")
+        
+        return await self._extract_jobs_from_page(page)
+
+    async def _wait_for_results(self, page: Page) -> Optional[str]:
+        """
+        Wait for job listings to render, racing all RESULT_SELECTORS instead of trying them one by one
+        
+        Args:
+            page: Playwright page
+            
+        Returns:
+            The first selector to appear, or None when none did within GOOGLE_RESULTS_TIMEOUT_MS
+        """
+        waits = {
+            asyncio.ensure_future(page.wait_for_selector(selector, timeout=GOOGLE_RESULTS_TIMEOUT_MS)): selector
+            for selector in self.RESULT_SELECTORS
+        }
+        pending = set(waits)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for wait in done:
+                    # A wait that timed out only rules out its own selector
+                    if not wait.cancelled() and wait.exception() is None:
+                        return waits[wait]
+            increment("result_wait_timeouts")
+            return None
+        finally:
+            for wait in pending:
+                wait.cancel()
+            await asyncio.gather(*waits, return_exceptions=True)
+
+    async def _result_count(self, page: Page) -> Optional[int]:
+        """
+        Total number of results from the "1–20 of 57" range Google shows above the listings
+        
+        Args:
+            page: Playwright page showing results page 1
+            
+        Returns:
+            Result count, or None when no range text was found
+        """
+        try:
+            total = await page.evaluate("""
+                (limit) => {
+                    const range = /\\d[\\d,]*\\s*[-\u2010-\u2013]\\s*\\d[\\d,]*\\s+of\\s+(\\d[\\d,]*)/i;
+                    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+                    for (let node = walker.nextNode(), seen = 0; node && seen < limit; node = walker.nextNode(), seen++) {
+                        const match = node.nodeValue.match(range);
+                        if (match) {
+                            return parseInt(match[1].replace(/,/g, ''), 10);
+                        }
+                    }
+                    return null;
+                }
+            """, GOOGLE_TEXT_SCAN_LIMIT)
+        except Exception as e:
+            logger.warning(f"Could not read Google result count: {e}")
+            return None
+        return total if isinstance(total, int) else None
 
     async def _extract_jobs_from_page(self, page: Page) -> List[Dict[str, str]]:
         """
@@ -145,7 +284,7 @@ class GoogleScraper:
         try:
             # Execute JavaScript to extract job data with multiple fallback strategies
             job_data = await page.evaluate("""
-                () => {
+                ({ scanLimit, careersHome }) => {
                     const jobs = [];
                     
                     // Strategy 1: Look for job cards with data-testid
@@ -165,14 +304,27 @@ class GoogleScraper:
                         });
                     }
                     
-                    // Strategy 4: Look for any elements with job-related text
+                    // Strategy 4: Look for job-related text. Walk at most scanLimit text nodes once and
+                    // climb a few levels from each mention to the block holding the whole listing, rather
+                    // than reading textContent of every element (which re-reads the page per ancestor)
                     if (jobElements.length === 0) {
-                        const allElements = document.querySelectorAll('*');
-                        jobElements = Array.from(allElements).filter(el => {
-                            const text = el.textContent.toLowerCase();
-                            return (text.includes('software developer') || text.includes('software engineering')) && 
-                                   (text.includes('intern') || text.includes('summer'));
-                        });
+                        const found = new Set();
+                        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+                        for (let node = walker.nextNode(), seen = 0; node && seen < scanLimit; node = walker.nextNode(), seen++) {
+                            const text = node.nodeValue.toLowerCase();
+                            if (!text.includes('software developer') && !text.includes('software engineering')) {
+                                continue;
+                            }
+                            let el = node.parentElement;
+                            for (let depth = 0; el && el !== document.body && depth < 4; depth++, el = el.parentElement) {
+                                const blockText = el.textContent.toLowerCase();
+                                if (blockText.includes('intern') || blockText.includes('summer')) {
+                                    found.add(el);
+                                    break;
+                                }
+                            }
+                        }
+                        jobElements = Array.from(found);
                     }
                     
                     console.log(`Found ${jobElements.length} potential job elements`);
@@ -223,29 +375,13 @@ class GoogleScraper:
                             }
                             const jobUrl = linkElement ? linkElement.href : '';
                             
-                            // Extract job ID from URL or create one
-                            let jobId = '';
-                            if (jobUrl) {
-                                const match = jobUrl.match(/\\/jobs\\/([^\\/]+)/);
-                                if (match) {
-                                    jobId = match[1];
-                                }
-                            }
-                            
-                            // If no job ID found, create one from title and index
-                            if (!jobId) {
-                                const titleSlug = title.toLowerCase().replace(/[^a-z0-9]/g, '_').substring(0, 20);
-                                jobId = `google_${titleSlug}_${index}`;
-                            }
-                            
                             // Only add if we have a meaningful title
                             if (title && title.length > 5 && (title.toLowerCase().includes('software') || title.toLowerCase().includes('developer'))) {
                                 jobs.push({
-                                    id: jobId,
                                     title: title,
                                     company: company,
                                     location: location,
-                                    url: jobUrl || 'https://careers.google.com'
+                                    url: jobUrl || careersHome
                                 });
                             }
                         } catch (error) {
@@ -255,13 +391,12 @@ class GoogleScraper:
                     
                     return jobs;
                 }
-            """)
+            """, {"scanLimit": GOOGLE_TEXT_SCAN_LIMIT, "careersHome": self.CAREERS_HOME})
             
             # Process the extracted data
             for job_info in job_data:
                 try:
                     # Get job details
-                    job_id = job_info.get("id", "")
                     title = job_info.get("title", "").strip()
                     company = job_info.get("company", "Google").strip()
                     location = job_info.get("location", "Multiple Locations").strip()
@@ -269,13 +404,10 @@ class GoogleScraper:
                     
                     if not title or not job_url:
                         continue
-                    
-                    # Clean up the job ID
-                    if not job_id.startswith("google_"):
-                        job_id = f"google_{job_id}"
+                    job_url = canonicalize_url(job_url)
                     
                     job_dict = {
-                        "id": job_id,
+                        "id": self.job_id(job_url, title, location),
                         "company": company,
                         "title": title,
                         "team": "Software Engineering",  # Default team for software developer roles
@@ -0,0 +1,105 @@
+"""
+HTML parser backends
+Builds the BeautifulSoup tree the scrapers extract from with a configurable backend, parsing only the
+part of the page that can hold results
+"""
+from typing import List, Optional
+import importlib.util
+import logging
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# lxml (default), html.parser (pure Python) or selectolax (pip install selectolax; falls back to lxml)
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "lxml").lower()
+# Drop script, style and similar element bodies before parsing; they hold no listings
+HTML_STRIP_RAW_TEXT = os.getenv("HTML_STRIP_RAW_TEXT", "true").lower() == "true"
+
+BACKENDS = ["html.parser", "lxml", "selectolax"]
+RAW_TEXT_ELEMENTS = ["script", "style", "noscript", "template", "svg"]
+
+# A raw-text element from its opening tag through the matching closing tag (or a self-closing tag). The
+# body is matched as runs of non-'<' text and '<'s that don't close the element, which keeps the scan
+# linear and lets an svg swallow the style elements nested in it.
+_RAW_TEXT = re.compile(
+    r"<(" + "|".join(RAW_TEXT_ELEMENTS) + r")(?=[\s/>])[^>]*?"
+    r"(?:/>|>[^<]*(?:<(?!/\1[\s>])[^<]*)*</\1\s*>)",
+    re.IGNORECASE,
+)
+
+# Region most scrapers need: the page body, skipping the head and whatever it carries
+BODY = SoupStrainer("body")
+
+
+def available_backends() -> List[str]:
+    """Backends whose libraries are installed"""
+    return [
+        backend for backend in BACKENDS
+        if backend == "html.parser" or importlib.util.find_spec(backend) is not None
+    ]
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown HTML_PARSER_BACKEND {backend}, using html.parser")
+        return "html.parser"
+    if backend not in available_backends():
+        fallback = "lxml" if "lxml" in available_backends() else "html.parser"
+        logger.warning(f"HTML parser backend {backend} is not installed, using {fallback}")
+        return fallback
+    return backend
+
+
+_backend: Optional[str] = None
+
+
+def get_backend() -> str:
+    """The configured backend, checked once per process"""
+    global _backend
+    if _backend is None:
+        _backend = _resolve_backend(HTML_PARSER_BACKEND)
+    return _backend
+
+
+def strip_raw_text(html: str) -> str:
+    """Cut script, style, noscript, template and svg elements out of raw HTML"""
+    return _RAW_TEXT.sub("", html)
+
+
+def _selectolax_region(html: str, region: Optional[SoupStrainer]) -> str:
+    """Use lexbor (C) to drop raw-text elements and cut out the body, for BeautifulSoup to parse the rest"""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    if HTML_STRIP_RAW_TEXT:
+        tree.strip_tags(RAW_TEXT_ELEMENTS)
+    if region is BODY and tree.body is not None:
+        return tree.body.html
+    return tree.html
+
+
+def parse_document(html: str, region: Optional[SoupStrainer] = BODY, backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse a page for extraction
+
+    Args:
+        html: Raw page HTML
+        region: SoupStrainer for the part of the page to build a tree for (default: the body); None
+            parses everything
+        backend: Override HTML_PARSER_BACKEND (e.g., for benchmarks)
+
+    Returns:
+        A BeautifulSoup tree of the region, script and style bodies removed
+    """
+    backend = _resolve_backend(backend) if backend else get_backend()
+
+    if backend == "selectolax":
+        html = _selectolax_region(html, region)
+        backend = "lxml" if "lxml" in available_backends() else "html.parser"
+    elif HTML_STRIP_RAW_TEXT:
+        html = strip_raw_text(html)
+
+    return BeautifulSoup(html, backend, parse_only=region)
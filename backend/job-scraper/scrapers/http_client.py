@@ -0,0 +1,100 @@
+"""
+Shared HTTP clients
+One long-lived httpx.AsyncClient per header profile, so scrapers reuse pooled keep-alive connections and cookies
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Tuple
+import asyncio
+import importlib.util
+import logging
+import os
+
+import httpx
+
+from .rate_limit import rate_limit_request
+
+logger = logging.getLogger(__name__)
+
+# Headers browsers send, per kind of endpoint scraped. Accept-Encoding is left to httpx so it only
+# advertises encodings it can decode.
+HEADER_PROFILES: Dict[str, Dict[str, str]] = {
+    # Server-rendered career sites (RBC, CIBC, Interac)
+    "html": {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Upgrade-Insecure-Requests": "1",
+    },
+    # JSON search APIs (Microsoft)
+    "json": {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "application/json",
+    },
+}
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+# Connection pool limits per client
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+# Clients are bound to the event loop that created them: profile -> (loop, client)
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the h2 package is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def get_client(profile: str = "html") -> httpx.AsyncClient:
+    """
+    The shared client for a header profile, created on first use in the running event loop
+
+    Args:
+        profile: Key of HEADER_PROFILES
+
+    Returns:
+        A long-lived client; do not close it, close_clients() does on shutdown
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(profile)
+    if entry is not None and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+
+    client = httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        headers=HEADER_PROFILES[profile],
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=_http2_available(),
+        # Every request, retry and redirect waits for its host's rate limiter
+        event_hooks={"request": [rate_limit_request]},
+    )
+    _clients[profile] = (loop, client)
+    return client
+
+
+@asynccontextmanager
+async def borrow_client(profile: str = "html") -> AsyncIterator[httpx.AsyncClient]:
+    """async with borrow_client("html") as client: ... uses the shared client without closing it"""
+    yield get_client(profile)
+
+
+async def close_clients():
+    """Close every shared client (call on application shutdown)"""
+    loop = asyncio.get_running_loop()
+    for profile, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+        del _clients[profile]
@@ -0,0 +1,91 @@
+"""
+Job identity
+Canonical job URLs and deterministic job IDs, so a posting keeps the same primary key across restarts,
+worker processes and changes in result order
+"""
+from typing import Pattern
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import re
+
+# Query parameters added by campaigns and referrers; they never pick a different posting
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "dclid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid",
+    "ref", "referrer", "src", "source", "trk", "icid", "cmpid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Numeric job ID in a job page path (e.g., /job/12345/software-intern)
+JOB_PATH_ID = re.compile(r"/job/(\d+)")
+
+# Hex digits of the SHA-1 kept in digest IDs (64 bits; collisions need billions of postings)
+DIGEST_LENGTH = 16
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a job URL so every link to the same posting compares equal
+
+    Lowercases the scheme and host, drops default ports, a trailing dot on the host, the fragment,
+    tracking parameters and a trailing slash, and sorts the remaining query parameters.
+
+    Args:
+        url: Absolute job URL as scraped
+
+    Returns:
+        Canonical URL (the input unchanged when it isn't an absolute http(s) URL)
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def stable_job_id(prefix: str, *parts: str) -> str:
+    """
+    Job ID derived from a SHA-1 digest, the same in every process (unlike hash(), which Python salts)
+
+    Args:
+        prefix: Source key (e.g., "rbc")
+        parts: What identifies the posting, usually just its canonical URL
+
+    Returns:
+        ID of the form "<prefix>_<16 hex digits>"
+    """
+    digest = hashlib.sha1("\x1f".join(parts).encode()).hexdigest()[:DIGEST_LENGTH]
+    return f"{prefix}_{digest}"
+
+
+def job_id_from_url(prefix: str, url: str, pattern: Pattern = JOB_PATH_ID) -> str:
+    """
+    Job ID for a posting link: the site's own ID when the path carries one, else a digest of the URL
+
+    Args:
+        prefix: Source key (e.g., "rbc")
+        url: Job URL, canonical or not
+        pattern: Regular expression whose first group is the site's job ID
+
+    Returns:
+        Job ID with the source prefix
+    """
+    canonical = canonicalize_url(url)
+    match = pattern.search(urlsplit(canonical).path)
+    if match:
+        return f"{prefix}_{match.group(1)}"
+    return stable_job_id(prefix, canonical)
@@ -3,13 +3,16 @@ Interac Careers Scraper
 Scrapes job listings from Interac's career page
 """
 import asyncio
-from typing import List, Dict, Optional
-import httpx
+from typing import AsyncIterator, List, Dict, Optional
 import logging
-from datetime import datetime
 from bs4 import BeautifulSoup
 import re
-import json
+
+from .fetch_cache import fetch_and_parse
+from .html_parser import parse_document
+from .http_client import borrow_client
+from .identity import canonicalize_url, job_id_from_url
+from .selector_cascade import Cascade, CascadeExtractor, has_href
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +22,73 @@ class InteracScraper:
     
     BASE_URL = "https://www.interac.ca"
     SEARCH_URL = "https://www.interac.ca/en/careers"
+    # Numeric job ID in job links (/careers/<id> or /jobs/<id>); links without one are keyed by a digest of the URL
+    JOB_ID_PATTERN = re.compile(r"/(?:careers|jobs)/(\d+)")
     COMPANY_NAME = "Interac"
+    # Selector cascades, most specific first, compiled once; which selector each field came from is
+    # counted in the run metrics (selector_hits)
+    SELECTORS = CascadeExtractor(
+        containers=[
+            '.job-listing',
+            '.career-item',
+            '.job-item',
+            '.position',
+            '.job-card',
+            '.career-card',
+            'article',
+            '.job',
+            '[data-testid*="job"]',
+            '[class*="job"]',
+            '[class*="career"]',
+            '[class*="position"]',
+        ],
+        fields={
+            "title": Cascade([
+                'h3 a',
+                'h2 a',
+                'h4 a',
+                '.job-title a',
+                '.title a',
+                '.position-title a',
+                'a[href*="/careers/"]',
+                'a[href*="/jobs/"]',
+                '.job-title',
+                '.title',
+                '.position-title',
+                'h3',
+                'h2',
+                'h4',
+            ]),
+            "url": Cascade([
+                'h3 a',
+                'h2 a',
+                'h4 a',
+                '.job-title a',
+                '.title a',
+                '.position-title a',
+                'a[href*="/careers/"]',
+                'a[href*="/jobs/"]',
+            ], require=has_href),
+            "location": Cascade([
+                '.location',
+                '.job-location',
+                '.city',
+                '.job-city',
+                '.position-location',
+                '[class*="location"]',
+                '[class*="city"]',
+            ]),
+            "team": Cascade([
+                '.department',
+                '.team',
+                '.job-category',
+                '.position-category',
+                '[class*="department"]',
+                '[class*="team"]',
+                '[class*="category"]',
+            ]),
+        }
+    )
     
     def __init__(
         self, 
@@ -47,68 +116,50 @@ class InteracScraper:
             List of job dictionaries with keys: id, company, title, team, location, url
         """
         jobs = []
+        async for page_jobs in self.stream():
+            jobs.extend(page_jobs)
+        return jobs
+    
+    async def stream(self) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Scrape all job postings from Interac careers page, yielding the jobs of each page as soon as it is parsed
+        
+        Yields:
+            Lists of job dictionaries with keys: id, company, title, team, location, url
+        """
+        jobs_scraped = 0
         
         try:
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                follow_redirects=True,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "en-US,en;q=0.5",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Connection": "keep-alive",
-                    "Upgrade-Insecure-Requests": "1",
-                }
-            ) as client:
+            async with borrow_client("html") as client:
                 logger.info(f"Scraping Interac careers: {self.SEARCH_URL}")
                 
-                response = await client.get(self.SEARCH_URL)
-                response.raise_for_status()
-                
-                # Parse the HTML response
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract jobs from the page
-                page_jobs = self._extract_jobs_from_html(soup)
-                jobs.extend(page_jobs)
+                # Fetch conditionally and parse off the event loop; an unchanged page reuses the jobs parsed last time
+                page_jobs = await fetch_and_parse(
+                    client, self.SEARCH_URL, self._parse_page, variant=",".join(self.keywords)
+                )
+                jobs_scraped += len(page_jobs)
+                yield page_jobs
                 logger.info(f"Scraped {len(page_jobs)} jobs from Interac")
                 
         except Exception as e:
             logger.error(f"Error scraping Interac: {e}")
             raise
         
-        logger.info(f"Total jobs scraped from Interac: {len(jobs)}")
-        return jobs
+        logger.info(f"Total jobs scraped from Interac: {jobs_scraped}")
+    
+    def _parse_page(self, html: str) -> List[Dict[str, str]]:
+        """Parse the careers page into job records (runs in the parse pool)"""
+        return self._extract_jobs_from_html(parse_document(html))
     
     def _extract_jobs_from_html(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
         """Extract all jobs from the HTML page"""
         jobs = []
         
         try:
-            # Look for job listings - Interac might use different selectors
-            job_selectors = [
-                '.job-listing',
-                '.career-item',
-                '.job-item',
-                '.position',
-                '.job-card',
-                '.career-card',
-                'article',
-                '.job',
-                '[data-testid*="job"]',
-                '[class*="job"]',
-                '[class*="career"]',
-                '[class*="position"]'
-            ]
-            
-            job_elements = []
-            for selector in job_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    job_elements = elements
-                    logger.info(f"Found {len(elements)} job elements using selector: {selector}")
-                    break
+            # Look for job listings with the compiled container cascade
+            job_elements, selector = self.SELECTORS.find_containers(soup)
+            if job_elements:
+                logger.info(f"Found {len(job_elements)} job elements using selector: {selector}")
             
             if not job_elements:
                 # Fallback: look for any div with job-related classes
@@ -133,30 +184,11 @@ class InteracScraper:
     def _extract_job_data(self, job_element) -> Optional[Dict[str, str]]:
         """Extract job data from a single job element"""
         try:
-            # Extract job title
-            title = None
-            title_selectors = [
-                'h3 a',
-                'h2 a',
-                'h4 a',
-                '.job-title a',
-                '.title a',
-                '.position-title a',
-                'a[href*="/careers/"]',
-                'a[href*="/jobs/"]',
-                '.job-title',
-                '.title',
-                '.position-title',
-                'h3',
-                'h2',
-                'h4'
-            ]
+            # Resolve every field's selector cascade in one pass over the element
+            fields = self.SELECTORS.extract(job_element)
             
-            for selector in title_selectors:
-                title_elem = job_element.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    break
+            # Extract job title
+            title = fields["title"].get_text(strip=True) if fields["title"] else None
             
             if not title:
                 # Try to find any link that might be a job title
@@ -171,82 +203,23 @@ class InteracScraper:
                 return None
             
             # Extract job URL
-            url = None
-            url_selectors = [
-                'h3 a',
-                'h2 a',
-                'h4 a',
-                '.job-title a',
-                '.title a',
-                '.position-title a',
-                'a[href*="/careers/"]',
-                'a[href*="/jobs/"]'
-            ]
-            
-            for selector in url_selectors:
-                url_elem = job_element.select_one(selector)
-                if url_elem and url_elem.get('href'):
-                    url = url_elem.get('href')
-                    if url.startswith('/'):
-                        url = self.BASE_URL + url
-                    break
+            url = fields["url"].get('href') if fields["url"] else None
+            if url and url.startswith('/'):
+                url = self.BASE_URL + url
             
             if not url:
                 logger.debug(f"No URL found for job: {title}")
                 return None
+            url = canonicalize_url(url)
             
             # Extract location
-            location = None
-            location_selectors = [
-                '.location',
-                '.job-location',
-                '.city',
-                '.job-city',
-                '.position-location',
-                '[class*="location"]',
-                '[class*="city"]'
-            ]
-            
-            for selector in location_selectors:
-                loc_elem = job_element.select_one(selector)
-                if loc_elem:
-                    location = loc_elem.get_text(strip=True)
-                    break
+            location = fields["location"].get_text(strip=True) if fields["location"] else None
             
             # Extract team/department
-            team = None
-            team_selectors = [
-                '.department',
-                '.team',
-                '.job-category',
-                '.position-category',
-                '[class*="department"]',
-                '[class*="team"]',
-                '[class*="category"]'
-            ]
-            
-            for selector in team_selectors:
-                team_elem = job_element.select_one(selector)
-                if team_elem:
-                    team = team_elem.get_text(strip=True)
-                    break
-            
-            # Extract job ID from URL
-            job_id = None
-            if url:
-                # Try to extract job ID from URL
-                id_match = re.search(r'/careers/(\d+)', url) or re.search(r'/jobs/(\d+)', url)
-                if id_match:
-                    job_id = id_match.group(1)
-                else:
-                    # Use URL hash as ID
-                    job_id = str(hash(url))[-8:]  # Last 8 characters of hash
-            
-            if not job_id:
-                job_id = f"interac_{hash(url)}"
+            team = fields["team"].get_text(strip=True) if fields["team"] else None
             
-            # Create unique ID with company prefix
-            unique_id = f"interac_{job_id}"
+            # The site's job ID from the URL, or a digest of the canonical URL when it has none
+            unique_id = job_id_from_url("interac", url, self.JOB_ID_PATTERN)
             
             # Check if this is an intern/co-op position
             title_lower = title.lower()
@@ -0,0 +1,115 @@
+"""
+Job detail extraction
+Pulls the full description out of job detail pages and APIs, for the enrichment stage (app/enrichment.py)
+"""
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+from . import phenom
+
+logger = logging.getLogger(__name__)
+
+# JSON-LD blocks; most applicant tracking systems (Workday included) describe job pages as schema.org JobPosting
+JSON_LD = re.compile(
+    r"<script[^>]*type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Description containers on pages without structured data, most specific first
+DESCRIPTION_SELECTORS = [
+    '[itemprop="description"]',
+    '[data-automation-id="jobPostingDescription"]',
+    '.job-description',
+    '[class*="job-description"]',
+    '[class*="jobDescription"]',
+]
+
+# Sections of a Microsoft job API result, in the order they are shown on the job page
+MICROSOFT_SECTIONS = ["description", "responsibilities", "qualifications"]
+
+
+def html_to_text(fragment: str) -> str:
+    """Plain text of an HTML fragment, one line per block"""
+    return BeautifulSoup(fragment, "lxml").get_text("\n", strip=True)
+
+
+def _job_postings(value: Any) -> List[Dict]:
+    """schema.org JobPosting objects anywhere in a decoded JSON-LD value (lists and @graph included)"""
+    if isinstance(value, list):
+        return [posting for item in value for posting in _job_postings(item)]
+    if not isinstance(value, dict):
+        return []
+    if "@graph" in value:
+        return _job_postings(value["@graph"])
+    types = value.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return [value] if "JobPosting" in types else []
+
+
+def description_from_json_ld(html: str) -> Optional[str]:
+    """Description of the schema.org JobPosting a page declares, or None"""
+    for block in JSON_LD.findall(html):
+        try:
+            value = json.loads(block)
+        except ValueError:
+            continue
+        for posting in _job_postings(value):
+            if posting.get("description"):
+                return html_to_text(posting["description"])
+    return None
+
+
+def description_from_phenom(html: str) -> Optional[str]:
+    """Description of the job a Phenom job page embeds, or None"""
+    job = phenom.extract_job_detail(html)
+    if not job:
+        return None
+    sections = [job.get(key) for key in ("description", "responsibilities", "qualifications")]
+    text = "\n".join(html_to_text(section) for section in sections if section)
+    return text or None
+
+
+def description_from_html(html: str) -> Optional[str]:
+    """Text of the first description container found on the page, or None"""
+    soup = BeautifulSoup(html, "lxml")
+    for selector in DESCRIPTION_SELECTORS:
+        element = soup.select_one(selector)
+        if element is not None:
+            text = element.get_text("\n", strip=True)
+            if text:
+                return text
+    return None
+
+
+def parse_job_page(html: str) -> Optional[str]:
+    """
+    Description of a job detail page, from the first source that has one: Phenom's embedded job,
+    schema.org JSON-LD, or a description container in the markup (runs in the parse pool)
+
+    Args:
+        html: Job page as served or rendered
+
+    Returns:
+        Plain text description, or None when the page has none
+    """
+    return description_from_phenom(html) or description_from_json_ld(html) or description_from_html(html)
+
+
+def description_from_microsoft(data: Dict) -> Optional[str]:
+    """
+    Description of a Microsoft job API response
+
+    Args:
+        data: Decoded response of the job endpoint (operationResult.result holds the job)
+
+    Returns:
+        Plain text of the description, responsibilities and qualifications, or None
+    """
+    job = ((data or {}).get("operationResult") or {}).get("result") or {}
+    sections = [job.get(key) for key in MICROSOFT_SECTIONS]
+    text = "\n".join(html_to_text(section) for section in sections if section)
+    return text or None
@@ -2,12 +2,17 @@
 Microsoft Careers Scraper
 Scrapes job listings from Microsoft's career API
 """
-import asyncio
-from typing import List, Dict, Optional
-import httpx
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional
 import logging
 from datetime import datetime
 
+from .http_client import borrow_client
+from .job_details import description_from_microsoft
+from .paginator import paginate
+from .resilience import get_with_retries
+from .stats import record_page
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +20,7 @@ class MicrosoftScraper:
     """Scraper for Microsoft careers API"""
     
     BASE_URL = "https://gcsservices.careers.microsoft.com/search/api/v1/search"
+    JOB_API_URL = "https://gcsservices.careers.microsoft.com/search/api/v1/job/{job_id}"
     COMPANY_NAME = "Microsoft"
     
     def __init__(
@@ -104,27 +110,33 @@ class MicrosoftScraper:
             List of job dictionaries with keys: id, company, title, team, location, url
         """
         jobs = []
+        async for page_jobs in self.stream():
+            jobs.extend(page_jobs)
+        return jobs
+    
+    async def stream(self) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Scrape all job postings from Microsoft careers API, yielding the jobs of each page as soon as it is parsed
+        
+        Yields:
+            Lists of job dictionaries with keys: id, company, title, team, location, url
+        """
+        jobs_scraped = 0
         
         try:
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                follow_redirects=True,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Accept": "application/json",
-                }
-            ) as client:
+            async with borrow_client("json") as client:
                 # Scrape first page
                 url = self._build_url_with_multiple_professions(1)
                 logger.info(f"Scraping Microsoft careers API: {url}")
-                response = await client.get(url)
-                response.raise_for_status()
+                response = await get_with_retries(client, url)
+                record_page(len(response.content))
                 
                 data = response.json()
                 
                 # Extract jobs from first page
                 page_jobs = self._extract_jobs_from_response(data)
-                jobs.extend(page_jobs)
+                jobs_scraped += len(page_jobs)
+                yield page_jobs
                 logger.info(f"Scraped {len(page_jobs)} jobs from page 1")
                 
                 # Check if there are more pages
@@ -134,26 +146,38 @@ class MicrosoftScraper:
                 
                 logger.info(f"Found {total_jobs} total jobs across {total_pages} page(s)")
                 
-                # Scrape remaining pages
-                for page_num in range(2, total_pages + 1):
-                    await asyncio.sleep(0.5)  # Be respectful
-                    
-                    url = self._build_url_with_multiple_professions(page_num)
-                    logger.info(f"Scraping page {page_num}...")
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    page_jobs = self._extract_jobs_from_response(data)
-                    jobs.extend(page_jobs)
-                    logger.info(f"Scraped {len(page_jobs)} jobs from page {page_num}")
+                async def fetch_page(page_num: int) -> List[Dict[str, str]]:
+                    response = await get_with_retries(client, self._build_url_with_multiple_professions(page_num))
+                    record_page(len(response.content))
+                    return self._extract_jobs_from_response(response.json())
+                
+                # Fetch the remaining pages in parallel, handled in page order
+                async with aclosing(paginate(range(2, total_pages + 1), fetch_page)) as results:
+                    async for page_num, page_jobs in results:
+                        jobs_scraped += len(page_jobs)
+                        yield page_jobs
+                        logger.info(f"Scraped {len(page_jobs)} jobs from page {page_num}")
                 
         except Exception as e:
             logger.error(f"Error scraping Microsoft: {e}")
             raise
         
-        logger.info(f"Total jobs scraped from Microsoft: {len(jobs)}")
-        return jobs
+        logger.info(f"Total jobs scraped from Microsoft: {jobs_scraped}")
+    
+    async def fetch_job_detail(self, job_id: str) -> Optional[str]:
+        """
+        Fetch the full description of one job from the job detail API (used by the enrichment stage)
+        
+        Args:
+            job_id: Microsoft job ID, without the microsoft_ prefix
+            
+        Returns:
+            Plain text description, responsibilities and qualifications, or None when the API has none
+        """
+        async with borrow_client("json") as client:
+            response = await get_with_retries(client, self.JOB_API_URL.format(job_id=job_id), params={"lang": "en_us"})
+            record_page(len(response.content))
+            return description_from_microsoft(response.json())
     
     def _extract_jobs_from_response(self, data: Dict) -> List[Dict[str, str]]:
         """Extract all jobs from the API response"""
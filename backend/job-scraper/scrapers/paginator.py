@@ -0,0 +1,59 @@
+"""
+Bounded-concurrency pagination
+Fetches the remaining result pages of a search in parallel once page 1 has told us how many there are,
+and hands them back in page order
+"""
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Result pages of one search fetched at the same time
+PAGINATE_CONCURRENCY = int(os.getenv("PAGINATE_CONCURRENCY", "4"))
+
+
+async def paginate(
+    page_numbers: Iterable[int],
+    fetch_page: Callable[[int], Awaitable[T]],
+    concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[int, T]]:
+    """
+    Fetch pages with at most `concurrency` in flight, yielding each result in page order
+
+    Pages are fetched ahead of the consumer, so a page is usually ready by the time the one before it has
+    been handled. Request pacing is left to the host rate limiter the fetches go through (rate_limit.py).
+    Close the generator (contextlib.aclosing) when stopping early; fetches still running
+    are cancelled.
+
+    Args:
+        page_numbers: Pages to fetch, in the order they should be yielded
+        fetch_page: Coroutine function fetching and parsing one page (retries are its own business)
+        concurrency: Fetches in flight at once (default PAGINATE_CONCURRENCY)
+
+    Yields:
+        (page number, fetch_page result) tuples
+
+    Raises:
+        Exception: The error of a failed page, once the consumer reaches that page
+    """
+    concurrency = max(1, concurrency if concurrency is not None else PAGINATE_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(page_num: int) -> T:
+        async with semaphore:
+            logger.info(f"Scraping page {page_num}...")
+            return await fetch_page(page_num)
+
+    tasks: Dict[int, asyncio.Task] = {page_num: asyncio.create_task(fetch(page_num)) for page_num in page_numbers}
+    try:
+        for page_num, task in tasks.items():
+            yield page_num, await task
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        # Let cancelled fetches unwind (and release their connections) before returning
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
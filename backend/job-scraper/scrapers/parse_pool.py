@@ -0,0 +1,87 @@
+"""
+HTML parse pool
+Runs BeautifulSoup parsing and job extraction in worker processes so it never blocks the API event loop
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+
+from .selector_cascade import take_hits
+from .stats import current_stats, increment
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used for parsing; 0 parses inline on the event loop
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker():
+    """Spawned workers start with a bare logging setup; match the API's"""
+    logging.basicConfig(level=logging.INFO)
+
+
+def _parse_with_hits(parse: Callable[[str], Any], html: str) -> Tuple[Any, Dict]:
+    """Run parse and hand back the selector cascade hits it recorded, which live in the worker process"""
+    take_hits()
+    result = parse(html)
+    return result, take_hits()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: the API process runs threads (scheduler, DB pool) that fork would copy mid-state
+        _executor = ProcessPoolExecutor(
+            max_workers=PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        logger.info(f"Started HTML parse pool with {PARSE_WORKERS} worker(s)")
+    return _executor
+
+
+async def parse_html(parse: Callable[[str], Any], html: str) -> Any:
+    """
+    Run a scraper's parse method on raw HTML in the parse pool
+
+    Args:
+        parse: Picklable callable taking the HTML, usually a bound scraper method such as self._parse_page
+        html: Raw page HTML
+
+    Returns:
+        Whatever parse returns; keep it to plain records (dicts, lists, ints) so it pickles cheaply
+    """
+    global _executor
+    started = time.perf_counter()
+
+    if PARSE_WORKERS <= 0:
+        result, hits = _parse_with_hits(parse, html)
+    else:
+        try:
+            result, hits = await asyncio.get_running_loop().run_in_executor(_get_executor(), _parse_with_hits, parse, html)
+        except BrokenProcessPool:
+            # A worker died (e.g., OOM); start a fresh pool for the next page
+            logger.error("HTML parse pool broke, restarting it")
+            _executor = None
+            raise
+
+    increment("parse_seconds", round(time.perf_counter() - started, 3))
+    stats = current_stats.get()
+    if stats is not None and hits:
+        stats.record_selector_hits(hits)
+    return result
+
+
+def shutdown_parse_pool():
+    """Stop the worker processes (call on application shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,148 @@
+"""
+Phenom career sites
+RBC and BMO run on Phenom, which embeds the first page of search results as JSON in the page
+(phApp.ddo.eagerLoadRefineSearch) and loads later pages from the same refineSearch API; job pages embed
+the job the same way (phApp.ddo.jobDetail). This module pulls those payloads out with a string scan
+instead of building a DOM, and maps search results to job records.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import json
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+DDO_MARKER = "phApp.ddo = "
+SEARCH_KEY = '"eagerLoadRefineSearch":'
+DETAIL_KEY = '"jobDetail":'
+# Job links are <locale root>/job/<jobId>/<slug>; job IDs may contain letters (e.g., R250012345)
+JOB_PATH_ID = re.compile(r"/job/([^/?#]+)")
+
+_decoder = json.JSONDecoder()
+
+
+def _find_ddo_object(html: str, key: str) -> Optional[Dict]:
+    """First JSON object the page's phApp.ddo holds under key (keys also appear in config as plain strings)"""
+    start = html.find(DDO_MARKER)
+    if start < 0:
+        return None
+
+    while True:
+        start = html.find(key, start)
+        if start < 0:
+            return None
+        index = start + len(key)
+        while html[index:index + 1].isspace():
+            index += 1
+        start = index
+        if html[index:index + 1] != "{":
+            continue
+        try:
+            value, _ = _decoder.raw_decode(html, index)
+        except ValueError as e:
+            logger.warning(f"Could not decode embedded Phenom {key.strip(':')}: {e}")
+            return None
+        return value
+
+
+def extract_search_results(html: str) -> Optional[Dict]:
+    """
+    Decode the search results a Phenom page embeds, without parsing the HTML
+
+    Args:
+        html: Search results page as served (or rendered, as long as it was the first page loaded)
+
+    Returns:
+        The refineSearch payload (keys include hits, totalHits and data.jobs), or None when the page
+        has no embedded search payload
+    """
+    return _find_ddo_object(html, SEARCH_KEY)
+
+
+def extract_job_detail(html: str) -> Optional[Dict]:
+    """
+    Decode the job a Phenom job page embeds (phApp.ddo.jobDetail.data.job)
+
+    Args:
+        html: Job page as served
+
+    Returns:
+        The job (keys include title, description, qualifications), or None when the page has none
+    """
+    detail = _find_ddo_object(html, DETAIL_KEY)
+    job = ((detail or {}).get("data") or {}).get("job")
+    return job if isinstance(job, dict) else None
+
+
+def page_count(search: Dict) -> int:
+    """Number of result pages a refineSearch payload says there are"""
+    page_size = search.get("hits") or len((search.get("data") or {}).get("jobs") or [])
+    if not page_size:
+        return 1
+    return max(1, math.ceil((search.get("totalHits") or 0) / page_size))
+
+
+def job_from_result(
+    result: Dict,
+    id_prefix: str,
+    company: str,
+    site_url: str,
+    keywords: Iterable[str]
+) -> Optional[Dict]:
+    """
+    Map one job of a refineSearch payload to a job record
+
+    Args:
+        result: Entry of data.jobs
+        id_prefix: Source key prefixed to the job id (e.g., "rbc")
+        company: Company name stored on the record
+        site_url: Locale root job links hang off (e.g., "https://jobs.rbc.com/ca/en")
+        keywords: Title keywords a job needs one of (intern, co-op, ...)
+
+    Returns:
+        Job dictionary, or None when the job has no id or title or matches none of the keywords
+    """
+    job_id = result.get("jobId") or result.get("jobSeqNo")
+    title = (result.get("title") or "").strip()
+    if not job_id or not title:
+        return None
+
+    if not any(keyword in title.lower() for keyword in keywords):
+        logger.debug(f"Job '{title}' doesn't match intern keywords, skipping")
+        return None
+
+    location = result.get("location") or result.get("cityStateCountry")
+    if not location:
+        location = ", ".join(part for part in [result.get("city"), result.get("state")] if part) or None
+
+    posted_date = None
+    if result.get("postedDate"):
+        try:
+            posted_date = datetime.fromisoformat(result["postedDate"].replace("Z", "+00:00"))
+        except ValueError:
+            logger.debug(f"Could not parse posting date '{result['postedDate']}'")
+
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", title).strip("-")
+    return {
+        "id": f"{id_prefix}_{job_id}",
+        "company": company,
+        "title": title,
+        "team": result.get("category"),
+        "location": location,
+        "url": f"{site_url}/job/{job_id}/{slug}",
+        "description": result.get("descriptionTeaser"),
+        "posted_date": posted_date,
+    }
+
+
+def jobs_from_search(search: Dict, id_prefix: str, company: str, site_url: str, keywords: Iterable[str]) -> List[Dict]:
+    """Job records of a refineSearch payload (see job_from_result for the arguments)"""
+    keywords = list(keywords)
+    jobs = []
+    for result in (search.get("data") or {}).get("jobs") or []:
+        job = job_from_result(result, id_prefix, company, site_url, keywords)
+        if job:
+            jobs.append(job)
+    return jobs
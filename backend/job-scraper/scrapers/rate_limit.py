@@ -0,0 +1,96 @@
+"""
+Host rate limiting
+One token bucket per hostname, shared by every scraper, HTTP client and browser page in the process
+"""
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+from .stats import increment
+
+logger = logging.getLogger(__name__)
+
+# Requests per second a host is sent on average, and how many may go out back to back
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "2"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "4"))
+# Per-host overrides as host=rate:burst, comma separated; Microsoft's JSON search API takes a faster pace
+RATE_LIMIT_HOSTS = os.getenv("RATE_LIMIT_HOSTS", "gcsservices.careers.microsoft.com=5:10")
+
+
+def _parse_host_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    limits = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        try:
+            host, spec = entry.split("=", 1)
+            rate, _, burst = spec.partition(":")
+            limits[host.strip().lower()] = (float(rate), float(burst or rate))
+        except ValueError:
+            logger.warning(f"Ignoring malformed RATE_LIMIT_HOSTS entry: {entry}")
+    return limits
+
+
+HOST_LIMITS = _parse_host_limits(RATE_LIMIT_HOSTS)
+
+
+class TokenBucket:
+    """
+    Token bucket handing out one token per request
+
+    Callers reserve a token up front and sleep until it is due, so concurrent waiters are served
+    in arrival order without a lock and the bucket works from any event loop.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        # A negative balance is the queue of earlier reservations still waiting for their token
+        return max(0.0, -self.tokens / self.rate)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def get_bucket(host: str) -> TokenBucket:
+    """The token bucket of a host, created on first use"""
+    host = host.lower()
+    if host not in _buckets:
+        rate, burst = HOST_LIMITS.get(host, (RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST))
+        _buckets[host] = TokenBucket(rate, burst)
+    return _buckets[host]
+
+
+async def acquire(url: str, host: Optional[str] = None):
+    """
+    Wait for the host of a URL to accept another request
+
+    Args:
+        url: Request URL
+        host: Hostname, when the caller already has it parsed
+    """
+    host = host or urlsplit(url).hostname
+    if not host:
+        return
+    wait = get_bucket(host).reserve()
+    if wait > 0:
+        increment("rate_limited_requests")
+        increment("rate_limit_wait_seconds", round(wait, 3))
+        await asyncio.sleep(wait)
+
+
+async def rate_limit_request(request):
+    """httpx request event hook; also applies to retries and redirects"""
+    await acquire(str(request.url), request.url.host)
@@ -2,14 +2,19 @@
 RBC Careers Scraper
 Scrapes job listings from RBC's career page
 """
-import asyncio
-from typing import List, Dict, Optional
-import httpx
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 import logging
-from datetime import datetime
 from bs4 import BeautifulSoup
 import re
-import json
+
+from . import phenom
+from .fetch_cache import fetch_and_parse
+from .html_parser import parse_document
+from .http_client import borrow_client
+from .identity import canonicalize_url, job_id_from_url
+from .paginator import paginate
+from .selector_cascade import Cascade, CascadeExtractor, has_href
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +25,52 @@ class RBCScraper:
     BASE_URL = "https://jobs.rbc.com"
     SEARCH_URL = "https://jobs.rbc.com/ca/en/search-results"
     COMPANY_NAME = "RBC"
+    # Job ID segment of links on the site (/job/<jobId>/<slug>)
+    JOB_ID_PATTERN = phenom.JOB_PATH_ID
+    SITE_URL = "https://jobs.rbc.com/ca/en"
+    # Selector cascades, most specific first, compiled once; which selector each field came from is
+    # counted in the run metrics (selector_hits)
+    SELECTORS = CascadeExtractor(
+        containers=[
+            'div[data-automation-id="jobTitle"]',
+            '.job-title',
+            '.job-listing',
+            '.search-result',
+            'article',
+            '.job-item',
+            '[data-testid="job-card"]',
+        ],
+        fields={
+            "title": Cascade([
+                'a[data-automation-id="jobTitle"]',
+                '.job-title a',
+                'h3 a',
+                'h2 a',
+                'a[href*="/job/"]',
+                '.title a',
+            ]),
+            "url": Cascade([
+                'a[data-automation-id="jobTitle"]',
+                '.job-title a',
+                'h3 a',
+                'h2 a',
+                'a[href*="/job/"]',
+            ], require=has_href),
+            "location": Cascade([
+                '[data-automation-id="jobLocation"]',
+                '.job-location',
+                '.location',
+                '.job-city',
+                '.city',
+            ]),
+            "team": Cascade([
+                '[data-automation-id="jobCategory"]',
+                '.job-category',
+                '.department',
+                '.team',
+            ]),
+        }
+    )
     
     def __init__(
         self, 
@@ -57,100 +108,94 @@ class RBCScraper:
             List of job dictionaries with keys: id, company, title, team, location, url
         """
         jobs = []
+        async for page_jobs in self.stream():
+            jobs.extend(page_jobs)
+        return jobs
+    
+    async def stream(self) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Scrape all job postings from RBC careers page, yielding the jobs of each page as soon as it is parsed
+        
+        Yields:
+            Lists of job dictionaries with keys: id, company, title, team, location, url
+        """
+        jobs_scraped = 0
         
         try:
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                follow_redirects=True,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "en-US,en;q=0.5",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Connection": "keep-alive",
-                    "Upgrade-Insecure-Requests": "1",
-                }
-            ) as client:
+            async with borrow_client("html") as client:
                 # First, try to get the search results page
                 search_params = self._build_search_params(1)
                 logger.info(f"Scraping RBC careers: {self.SEARCH_URL}")
                 logger.info(f"Search params: {search_params}")
                 
-                response = await client.get(self.SEARCH_URL, params=search_params)
-                response.raise_for_status()
-                
-                # Parse the HTML response
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract jobs from the page
-                page_jobs = self._extract_jobs_from_html(soup)
-                jobs.extend(page_jobs)
+                # Fetch conditionally and parse off the event loop; unchanged pages reuse the jobs parsed last time
+                page_jobs, max_page = await fetch_and_parse(
+                    client, self.SEARCH_URL, self._parse_page, params=search_params, variant=",".join(self.keywords)
+                )
+                jobs_scraped += len(page_jobs)
+                yield page_jobs
                 logger.info(f"Scraped {len(page_jobs)} jobs from page 1")
                 
-                # Check for pagination
-                pagination = soup.find('nav', class_='pagination') or soup.find('div', class_='pagination')
-                if pagination:
-                    # Try to find total pages
-                    page_links = pagination.find_all('a', href=True)
-                    max_page = 1
-                    for link in page_links:
-                        try:
-                            page_num = int(link.text.strip())
-                            max_page = max(max_page, page_num)
-                        except ValueError:
-                            continue
-                    
+                if max_page > 1:
                     logger.info(f"Found pagination with {max_page} pages")
                     
-                    # Scrape remaining pages
-                    for page_num in range(2, min(max_page + 1, 10)):  # Limit to 10 pages
-                        await asyncio.sleep(1.0)  # Be respectful
-                        
-                        search_params = self._build_search_params(page_num)
-                        logger.info(f"Scraping page {page_num}...")
-                        
-                        response = await client.get(self.SEARCH_URL, params=search_params)
-                        response.raise_for_status()
-                        
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        page_jobs = self._extract_jobs_from_html(soup)
-                        jobs.extend(page_jobs)
-                        logger.info(f"Scraped {len(page_jobs)} jobs from page {page_num}")
-                        
-                        # If no jobs found on this page, stop
-                        if not page_jobs:
-                            break
+                    async def fetch_page(page_num: int):
+                        return await fetch_and_parse(
+                            client, self.SEARCH_URL, self._parse_page,
+                            params=self._build_search_params(page_num), variant=",".join(self.keywords)
+                        )
+                    
+                    # Fetch the remaining pages in parallel, handled in page order
+                    pages = range(2, min(max_page + 1, 10))  # Limit to 10 pages
+                    async with aclosing(paginate(pages, fetch_page)) as results:
+                        async for page_num, (page_jobs, _) in results:
+                            jobs_scraped += len(page_jobs)
+                            yield page_jobs
+                            logger.info(f"Scraped {len(page_jobs)} jobs from page {page_num}")
+                            
+                            # If no jobs found on this page, stop (pages still in flight are cancelled)
+                            if not page_jobs:
+                                break
                 
         except Exception as e:
             logger.error(f"Error scraping RBC: {e}")
             raise
         
-        logger.info(f"Total jobs scraped from RBC: {len(jobs)}")
-        return jobs
+        logger.info(f"Total jobs scraped from RBC: {jobs_scraped}")
+    
+    def _parse_page(self, html: str) -> Tuple[List[Dict[str, str]], int]:
+        """Parse a search results page into job records and the highest page number it links to (runs in the parse pool)"""
+        # The search results are embedded as JSON; the markup is only a fallback
+        search = phenom.extract_search_results(html)
+        if search is not None:
+            jobs = phenom.jobs_from_search(search, "rbc", self.COMPANY_NAME, self.SITE_URL, self.keywords)
+            return jobs, phenom.page_count(search)
+        
+        soup = parse_document(html)
+        jobs = self._extract_jobs_from_html(soup)
+        
+        # Check for pagination
+        max_page = 1
+        pagination = soup.find('nav', class_='pagination') or soup.find('div', class_='pagination')
+        if pagination:
+            # Try to find total pages
+            for link in pagination.find_all('a', href=True):
+                try:
+                    max_page = max(max_page, int(link.text.strip()))
+                except ValueError:
+                    continue
+        
+        return jobs, max_page
     
     def _extract_jobs_from_html(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
         """Extract all jobs from the HTML page"""
         jobs = []
         
         try:
-            # Look for job listings - RBC might use different selectors
-            job_selectors = [
-                'div[data-automation-id="jobTitle"]',
-                '.job-title',
-                '.job-listing',
-                '.search-result',
-                'article',
-                '.job-item',
-                '[data-testid="job-card"]'
-            ]
-            
-            job_elements = []
-            for selector in job_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    job_elements = elements
-                    logger.info(f"Found {len(elements)} job elements using selector: {selector}")
-                    break
+            # Look for job listings with the compiled container cascade
+            job_elements, selector = self.SELECTORS.find_containers(soup)
+            if job_elements:
+                logger.info(f"Found {len(job_elements)} job elements using selector: {selector}")
             
             if not job_elements:
                 # Fallback: look for any div with job-related classes
@@ -175,22 +220,11 @@ class RBCScraper:
     def _extract_job_data(self, job_element) -> Optional[Dict[str, str]]:
         """Extract job data from a single job element"""
         try:
-            # Extract job title
-            title = None
-            title_selectors = [
-                'a[data-automation-id="jobTitle"]',
-                '.job-title a',
-                'h3 a',
-                'h2 a',
-                'a[href*="/job/"]',
-                '.title a'
-            ]
+            # Resolve every field's selector cascade in one pass over the element
+            fields = self.SELECTORS.extract(job_element)
             
-            for selector in title_selectors:
-                title_elem = job_element.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    break
+            # Extract job title
+            title = fields["title"].get_text(strip=True) if fields["title"] else None
             
             if not title:
                 # Try to find any link that might be a job title
@@ -205,74 +239,23 @@ class RBCScraper:
                 return None
             
             # Extract job URL
-            url = None
-            url_selectors = [
-                'a[data-automation-id="jobTitle"]',
-                '.job-title a',
-                'h3 a',
-                'h2 a',
-                'a[href*="/job/"]'
-            ]
-            
-            for selector in url_selectors:
-                url_elem = job_element.select_one(selector)
-                if url_elem and url_elem.get('href'):
-                    url = url_elem.get('href')
-                    if url.startswith('/'):
-                        url = self.BASE_URL + url
-                    break
+            url = fields["url"].get('href') if fields["url"] else None
+            if url and url.startswith('/'):
+                url = self.BASE_URL + url
             
             if not url:
                 logger.debug(f"No URL found for job: {title}")
                 return None
+            url = canonicalize_url(url)
             
             # Extract location
-            location = None
-            location_selectors = [
-                '[data-automation-id="jobLocation"]',
-                '.job-location',
-                '.location',
-                '.job-city',
-                '.city'
-            ]
-            
-            for selector in location_selectors:
-                loc_elem = job_element.select_one(selector)
-                if loc_elem:
-                    location = loc_elem.get_text(strip=True)
-                    break
+            location = fields["location"].get_text(strip=True) if fields["location"] else None
             
             # Extract team/department
-            team = None
-            team_selectors = [
-                '[data-automation-id="jobCategory"]',
-                '.job-category',
-                '.department',
-                '.team'
-            ]
-            
-            for selector in team_selectors:
-                team_elem = job_element.select_one(selector)
-                if team_elem:
-                    team = team_elem.get_text(strip=True)
-                    break
-            
-            # Extract job ID from URL
-            job_id = None
-            if url:
-                # Try to extract job ID from URL
-                id_match = re.search(r'/job/(\d+)', url)
-                if id_match:
-                    job_id = id_match.group(1)
-                else:
-                    # Use URL hash as ID
-                    job_id = str(hash(url))[-8:]  # Last 8 characters of hash
-            
-            if not job_id:
-                job_id = f"rbc_{hash(url)}"
+            team = fields["team"].get_text(strip=True) if fields["team"] else None
             
-            # Create unique ID with company prefix
-            unique_id = f"rbc_{job_id}"
+            # The site's job ID from the URL, or a digest of the canonical URL when it has none
+            unique_id = job_id_from_url("rbc", url, self.JOB_ID_PATTERN)
             
             # Check if this is an intern/co-op position
             title_lower = title.lower()
@@ -0,0 +1,163 @@
+"""
+Fetch resilience
+Page-level retries with jittered exponential backoff, and a per-source circuit breaker
+"""
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+import logging
+import os
+import random
+
+import httpx
+from playwright.async_api import Error as PlaywrightError, Page, Response
+
+from .rate_limit import acquire
+from .stats import increment
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Attempts per page fetch, including the first
+FETCH_RETRY_ATTEMPTS = int(os.getenv("FETCH_RETRY_ATTEMPTS", "3"))
+# Backoff before retry n is a random delay up to base * 2^(n-1), capped at the max
+FETCH_RETRY_BASE_SECONDS = float(os.getenv("FETCH_RETRY_BASE_SECONDS", "1"))
+FETCH_RETRY_MAX_SECONDS = float(os.getenv("FETCH_RETRY_MAX_SECONDS", "30"))
+# Consecutive failed scrapes before a source is skipped, and for how long
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_COOLDOWN_MINUTES = float(os.getenv("CIRCUIT_COOLDOWN_MINUTES", "30"))
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient failures worth retrying: timeouts, connection errors, throttling and 5xx responses"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, PlaywrightError):
+        # Navigation timeouts and network-level failures (net::ERR_CONNECTION_RESET, ...)
+        return "Timeout" in error.message or "net::" in error.message
+    return False
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            return float(error.response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
+    return None
+
+
+def _backoff_seconds(attempt: int, error: Exception) -> float:
+    retry_after = _retry_after_seconds(error)
+    if retry_after is not None:
+        return min(retry_after, FETCH_RETRY_MAX_SECONDS)
+    # Full jitter keeps sources that failed together from retrying in lockstep
+    return random.uniform(0, min(FETCH_RETRY_MAX_SECONDS, FETCH_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+async def with_retries(fetch: Callable[[], Awaitable[T]], description: str) -> T:
+    """
+    Run a fetch, retrying transient failures with jittered exponential backoff
+
+    Args:
+        fetch: Zero-argument coroutine function performing one attempt
+        description: What is being fetched, for logs
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The last error, once attempts run out or the error is not retryable
+    """
+    for attempt in range(1, FETCH_RETRY_ATTEMPTS + 1):
+        try:
+            return await fetch()
+        except Exception as e:
+            if attempt >= FETCH_RETRY_ATTEMPTS or not is_retryable(e):
+                raise
+            delay = _backoff_seconds(attempt, e)
+            increment("retries")
+            increment("retry_wait_seconds", round(delay, 3))
+            logger.warning(
+                f"Fetching {description} failed ({e}), retry {attempt}/{FETCH_RETRY_ATTEMPTS - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+async def get_with_retries(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    """client.get(...) plus raise_for_status(), retried on transient failures; 304 Not Modified is returned as is"""
+    async def fetch():
+        response = await client.get(url, **kwargs)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    return await with_retries(fetch, url)
+
+
+async def goto_with_retries(page: Page, url: str, **kwargs) -> Optional[Response]:
+    """page.goto(...) retried on navigation timeouts and network errors, each attempt rate limited by host"""
+    async def navigate():
+        await acquire(url)
+        return await page.goto(url, **kwargs)
+
+    return await with_retries(navigate, url)
+
+
+class CircuitBreaker:
+    """
+    Skips a source after CIRCUIT_FAILURE_THRESHOLD consecutive failed scrapes
+
+    After CIRCUIT_COOLDOWN_MINUTES the breaker half-opens and lets one scrape through: success
+    closes it, failure opens it for another cool-down. State lives in the scheduler leader's memory.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, cooldown_minutes: float = CIRCUIT_COOLDOWN_MINUTES):
+        self.failure_threshold = failure_threshold
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[datetime] = None
+
+    @property
+    def retry_at(self) -> Optional[datetime]:
+        return self.opened_at + self.cooldown if self.opened_at else None
+
+    def allow(self) -> bool:
+        """Whether the source may be scraped now"""
+        if self.state == "open" and datetime.utcnow() >= self.retry_at:
+            self.state = "half_open"
+        return self.state != "open"
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = datetime.utcnow()
+
+    def snapshot(self) -> Dict:
+        return {
+            "circuit_state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_retry_at": self.retry_at.isoformat() if self.state == "open" else None,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(source_key: str) -> CircuitBreaker:
+    """The circuit breaker of a source, created closed on first use"""
+    if source_key not in _breakers:
+        _breakers[source_key] = CircuitBreaker()
+    return _breakers[source_key]
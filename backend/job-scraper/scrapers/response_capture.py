@@ -0,0 +1,106 @@
+"""
+Network response capture
+Collects the JSON responses a career site's own front end fetches, so browser scrapers can map the
+site's search API results to job records instead of scraping the rendered DOM
+"""
+from typing import Any, Iterable, List, Optional, Pattern, Union
+import asyncio
+import json
+import logging
+import os
+import re
+
+from playwright.async_api import Page, Response
+
+from .stats import current_stats
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CAPTURE_ENABLED = os.getenv("BROWSER_CAPTURE_RESPONSES", "true").lower() == "true"
+# Anti-JSON-hijacking prefix some Google endpoints put before the JSON body
+XSSI_PREFIX = ")]}'"
+
+
+class ResponseCapture:
+    """
+    Listens to a page's responses and keeps the JSON bodies of those whose URL matches a pattern
+
+        capture = ResponseCapture(page, [r"/widgets$"])
+        capture.start()
+        await page.goto(url)
+        payloads = await capture.collect()
+
+    Bodies are read as responses arrive; collect() hands back everything captured since the last call.
+    """
+
+    def __init__(self, page: Page, patterns: Iterable[Union[str, Pattern]]):
+        """
+        Initialize a response capture
+
+        Args:
+            page: Page whose responses to watch
+            patterns: Regular expressions searched in response URLs
+        """
+        self.page = page
+        self.patterns = [re.compile(pattern) if isinstance(pattern, str) else pattern for pattern in patterns]
+        self._payloads: List[Any] = []
+        self._reads: List[asyncio.Task] = []
+        self._arrived = asyncio.Event()
+        # Playwright runs event handlers outside the scraper's task, so bind its stats now
+        self._stats = current_stats.get()
+
+    def start(self):
+        """Start listening; call before navigating"""
+        self.page.on("response", self._on_response)
+
+    def stop(self):
+        """Stop listening"""
+        self.page.remove_listener("response", self._on_response)
+
+    def _on_response(self, response: Response):
+        if response.request.method not in ("GET", "POST") or not response.ok:
+            return
+        if any(pattern.search(response.url) for pattern in self.patterns):
+            self._reads.append(asyncio.ensure_future(self._read(response)))
+
+    async def _read(self, response: Response):
+        try:
+            body = await response.text()
+        except Exception as e:
+            # The page navigated away or closed before the body was read
+            logger.debug(f"Could not read captured response {response.url}: {e}")
+            return
+        text = body[len(XSSI_PREFIX):] if body.startswith(XSSI_PREFIX) else body
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            logger.debug(f"Captured response is not JSON: {response.url}")
+            return
+        if self._stats is not None:
+            self._stats.record_page(len(body.encode()))
+            self._stats.increment("responses_captured")
+        self._payloads.append(payload)
+        self._arrived.set()
+
+    async def collect(self, timeout: Optional[float] = None) -> List[Any]:
+        """
+        JSON bodies captured since the last call
+
+        Args:
+            timeout: When nothing has been captured yet, wait up to this many seconds for a first payload
+
+        Returns:
+            Decoded JSON payloads in arrival order
+        """
+        if timeout and not self._payloads and not self._reads:
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        # Bodies of matching responses that have arrived but are still being read
+        reads, self._reads = self._reads, []
+        if reads:
+            await asyncio.gather(*reads)
+        payloads, self._payloads = self._payloads, []
+        self._arrived.clear()
+        return payloads
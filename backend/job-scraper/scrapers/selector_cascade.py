@@ -0,0 +1,117 @@
+"""
+Selector cascades
+Fallback CSS selector lists compiled once with soupsieve and evaluated for all fields of a job element
+in one walk, counting which selector each field was taken from
+"""
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+# Recorded when no selector of a cascade matched
+NO_MATCH = "(none)"
+
+# field -> selector -> hits since the last take_hits(), in this process
+_hits: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def has_href(tag: Tag) -> bool:
+    """Cascade requirement for link fields: the element carries a non-empty href"""
+    return bool(tag.get("href"))
+
+
+class Cascade:
+    """Ordered selectors for one field, most specific first"""
+
+    def __init__(self, selectors: Iterable[str], require: Optional[Callable[[Tag], bool]] = None):
+        """
+        Initialize a cascade
+
+        Args:
+            selectors: CSS selectors in order of preference
+            require: Check on a selector's first match; if it fails the selector is skipped, like the
+                `if elem and elem.get('href')` checks it replaces
+        """
+        self.selectors = list(selectors)
+        self.patterns = [soupsieve.compile(selector) for selector in self.selectors]
+        self.require = require
+
+
+class CascadeExtractor:
+    """The container cascade and field cascades of one scraper"""
+
+    def __init__(self, containers: Iterable[str], fields: Dict[str, Cascade]):
+        """
+        Initialize an extractor
+
+        Args:
+            containers: Selectors for job elements; the first one matching anything wins
+            fields: Cascade per field extracted from each job element (e.g., title, url, location)
+        """
+        self.containers = Cascade(containers)
+        self.fields = fields
+
+    def find_containers(self, soup: BeautifulSoup) -> Tuple[List[Tag], Optional[str]]:
+        """
+        Job elements of a page
+
+        Returns:
+            The elements matched by the first container selector that matches any, and that selector
+            (an empty list and None when none does)
+        """
+        for selector, pattern in zip(self.containers.selectors, self.containers.patterns):
+            elements = pattern.select(soup)
+            if elements:
+                _hits["containers"][selector] += 1
+                return elements, selector
+        _hits["containers"][NO_MATCH] += 1
+        return [], None
+
+    def extract(self, element: Tag) -> Dict[str, Optional[Tag]]:
+        """
+        Resolve every field cascade against one job element in a single pass over its descendants
+
+        Gives the same answer as trying element.select_one(selector) for each selector of each field in
+        turn: a field takes the first element (in document order) of its most preferred selector that
+        matches anywhere in the element.
+
+        Returns:
+            The matched element per field, None for fields no selector matched
+        """
+        # Per field: index of the best selector matched so far (len = none yet) and its element
+        best: Dict[str, Tuple[int, Optional[Tag]]] = {
+            name: (len(cascade.patterns), None) for name, cascade in self.fields.items()
+        }
+        # Selectors whose first match has been seen; later matches of them can never win
+        decided: Dict[str, set] = {name: set() for name in self.fields}
+
+        for tag in element.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            settled = True
+            for name, cascade in self.fields.items():
+                limit = best[name][0]
+                for index in range(limit):
+                    if index in decided[name] or not cascade.patterns[index].match(tag):
+                        continue
+                    decided[name].add(index)
+                    if cascade.require is None or cascade.require(tag):
+                        best[name] = (index, tag)
+                        break
+                settled = settled and best[name][0] == 0
+            if settled:
+                break
+
+        fields = {}
+        for name, (index, tag) in best.items():
+            _hits[name][self.fields[name].selectors[index] if tag is not None else NO_MATCH] += 1
+            fields[name] = tag
+        return fields
+
+
+def take_hits() -> Dict[str, Dict[str, int]]:
+    """Selector hits recorded in this process since the last call, as plain dicts"""
+    hits = {field: dict(counts) for field, counts in _hits.items()}
+    _hits.clear()
+    return hits
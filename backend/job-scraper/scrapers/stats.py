@@ -0,0 +1,58 @@
+"""
+Scrape statistics
+Counters a scraper reports while it runs, collected per source by the scheduler
+"""
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class ScrapeStats:
+    """Pages, bytes and free-form counters gathered during one scrape of one source"""
+
+    def __init__(self):
+        self.pages_fetched = 0
+        self.bytes_downloaded = 0
+        self.counters: Dict[str, float] = {}
+        # field -> selector -> job elements whose field came from that selector (see selector_cascade)
+        self.selector_hits: Dict[str, Dict[str, int]] = {}
+
+    def record_page(self, size: int):
+        """Record one fetched page (HTML document, API response or rendered DOM) of the given size in bytes"""
+        self.pages_fetched += 1
+        self.bytes_downloaded += size
+
+    def increment(self, name: str, amount: float = 1):
+        """Add to a named counter (e.g., retries, rate_limit_wait_seconds)"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_selector_hits(self, hits: Dict[str, Dict[str, int]]):
+        """Add selector cascade hit counts from one parsed page"""
+        for field, counts in hits.items():
+            field_hits = self.selector_hits.setdefault(field, {})
+            for selector, count in counts.items():
+                field_hits[selector] = field_hits.get(selector, 0) + count
+
+    def to_dict(self) -> Dict:
+        return {
+            "pages_fetched": self.pages_fetched,
+            "bytes_downloaded": self.bytes_downloaded,
+            **self.counters,
+        }
+
+
+# Stats of the scrape running in the current asyncio task; set by the scheduler per source
+current_stats: ContextVar[Optional[ScrapeStats]] = ContextVar("current_stats", default=None)
+
+
+def record_page(size: int):
+    """Record a fetched page against the current scrape, if one is being tracked"""
+    stats = current_stats.get()
+    if stats is not None:
+        stats.record_page(size)
+
+
+def increment(name: str, amount: float = 1):
+    """Add to a named counter of the current scrape, if one is being tracked"""
+    stats = current_stats.get()
+    if stats is not None:
+        stats.increment(name, amount)
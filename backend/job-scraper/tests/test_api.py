@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from models import ScrapeRun
+from models.database import get_db
+
+
+@pytest.fixture
+def client(db):
+    # Not entered as a context manager, so the startup hooks (scheduler, browser pool) never run
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def add_runs(db, *sources):
+    for run_sources in sources:
+        db.add(ScrapeRun(trigger="manual", status="queued", sources=run_sources))
+    db.commit()
+
+
+def test_scrape_runs_filtered_by_source(client, db):
+    add_runs(db, "rbc,bmo", "bmo", "cibc,rbc")
+
+    response = client.get("/api/scrape/runs", params={"source": "RBC"})
+
+    assert response.status_code == 200
+    assert [run["sources"] for run in response.json()["runs"]] == [["cibc", "rbc"], ["rbc", "bmo"]]
+
+
+@pytest.mark.parametrize("source", ["%", "r_c", "nope"])
+def test_scrape_runs_reject_unknown_source(client, db, source):
+    add_runs(db, "rbc,bmo")
+
+    response = client.get("/api/scrape/runs", params={"source": source})
+
+    assert response.status_code == 400
+    assert "Unknown scrape source" in response.json()["detail"]
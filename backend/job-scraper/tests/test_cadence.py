@@ -0,0 +1,97 @@
+import math
+
+import pytest
+
+from app import cadence
+from app.cadence import CadencePlanner, SourceCadence
+
+
+@pytest.fixture(autouse=True)
+def bounds(monkeypatch):
+    # The defaults, pinned so SCRAPE_* variables in the environment don't change the expected intervals
+    monkeypatch.setattr(cadence, "MIN_INTERVAL_MINUTES", 15.0)
+    monkeypatch.setattr(cadence, "MAX_INTERVAL_MINUTES", 720.0)
+    monkeypatch.setattr(cadence, "HISTORY_SIZE", 6)
+
+
+def source(base_minutes=60, uses_browser=False, runs=()):
+    source_cadence = SourceCadence(base_minutes, uses_browser)
+    for changes, duration in runs:
+        source_cadence.record(changes, duration)
+    return source_cadence
+
+
+def test_base_interval_is_clamped_to_the_bounds():
+    assert source(base_minutes=5).base_minutes == 15
+    assert source(base_minutes=10000).base_minutes == 720
+
+
+def test_no_history_keeps_the_base_interval():
+    assert source(base_minutes=60).desired_minutes() == pytest.approx(60)
+
+
+@pytest.mark.parametrize("changes, minutes", [
+    (1, 15),  # Changed every run
+    (0, 720),  # Never changed
+])
+def test_full_history_reaches_the_bounds(changes, minutes):
+    assert source(runs=[(changes, 30)] * 6).desired_minutes() == pytest.approx(minutes)
+
+
+def test_volatility_interpolates_geometrically():
+    runs = [(1, 30), (0, 30)] * 3
+
+    assert source(runs=runs).volatility == 0.5
+    assert source(runs=runs).desired_minutes() == pytest.approx(math.sqrt(15 * 720))
+
+
+def test_partial_history_stays_close_to_the_base_interval():
+    # Half the history: halfway (geometrically) from the base interval to the target
+    assert source(base_minutes=60, runs=[(1, 30)] * 3).desired_minutes() == pytest.approx(math.sqrt(60 * 15))
+
+
+def test_history_keeps_only_the_latest_runs():
+    assert source(runs=[(1, 30)] * 6 + [(0, 30)] * 6).desired_minutes() == pytest.approx(720)
+
+
+def test_seed_replaces_history():
+    planner = CadencePlanner()
+    planner.register("rbc", 60)
+    planner.record("rbc", 1, 30)
+    planner.seed("rbc", [(0, 30)] * 6)
+    planner.seed("unknown", [(1, 30)])
+
+    assert list(planner.sources["rbc"].changes) == [0] * 6
+    assert "unknown" not in planner.sources
+
+
+def volatile_planner(budget):
+    """Two browser sources changing every run (15 min interval, 5 min runs) and one HTTP source"""
+    planner = CadencePlanner(browser_minutes_per_hour=budget)
+    for key, uses_browser in [("bmo", True), ("google", True), ("rbc", False)]:
+        planner.register(key, 60, uses_browser)
+        planner.seed(key, [(1, 300)] * 6)
+    return planner
+
+
+def test_browser_intervals_are_stretched_to_fit_the_budget():
+    # 2 sources x 5 min per 15 min = 40 browser minutes an hour, four times a budget of 10
+    intervals = volatile_planner(budget=10).intervals()
+
+    assert intervals["bmo"] == pytest.approx(60)
+    assert intervals["google"] == pytest.approx(60)
+    assert intervals["rbc"] == pytest.approx(15)
+
+
+def test_stretched_intervals_stay_within_the_maximum():
+    intervals = volatile_planner(budget=0.5).intervals()
+
+    assert intervals["bmo"] == pytest.approx(720)
+    assert intervals["rbc"] == pytest.approx(15)
+
+
+@pytest.mark.parametrize("budget", [40, 0])
+def test_intervals_within_budget_or_without_one_are_not_stretched(budget):
+    intervals = volatile_planner(budget=budget).intervals()
+
+    assert intervals == pytest.approx({"bmo": 15, "google": 15, "rbc": 15})
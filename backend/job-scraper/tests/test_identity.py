@@ -0,0 +1,80 @@
+import hashlib
+
+import pytest
+
+from scrapers import phenom
+from scrapers.google_scraper import GoogleScraper
+from scrapers.identity import JOB_PATH_ID, canonicalize_url, job_id_from_url, stable_job_id
+from scrapers.interac_scraper import InteracScraper
+
+# IDs are primary keys of stored jobs: a change here orphans every stored posting of the source, so these
+# values are pinned rather than recomputed
+
+
+@pytest.mark.parametrize("url, canonical", [
+    (
+        "HTTPS://Jobs.RBC.com.:443/ca/en/job/R-0000123/Intern/?utm_source=li&b=2&a=1&gclid=x#apply",
+        "https://jobs.rbc.com/ca/en/job/R-0000123/Intern?a=1&b=2",
+    ),
+    ("http://example.com:80/", "http://example.com/"),
+    ("http://example.com:8080/x/", "http://example.com:8080/x"),
+    ("https://www.interac.ca/en/jobs/4567?source=indeed&ref=home", "https://www.interac.ca/en/jobs/4567"),
+    ("https://example.com/search?q=&UTM_Campaign=x", "https://example.com/search?q="),
+    ("  https://careers.google.com  ", "https://careers.google.com/"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+@pytest.mark.parametrize("url", ["/ca/en/job/123", "mailto:careers@example.com", "javascript:void(0)"])
+def test_canonicalize_url_leaves_non_http_urls_alone(url):
+    assert canonicalize_url(url) == url
+
+
+def test_stable_job_id_is_a_truncated_sha1_of_the_joined_parts():
+    expected = hashlib.sha1("https://careers.google.com/\x1fIntern\x1fToronto".encode()).hexdigest()[:16]
+
+    assert stable_job_id("google", "https://careers.google.com/", "Intern", "Toronto") == f"google_{expected}"
+
+
+@pytest.mark.parametrize("prefix, url, pattern, job_id", [
+    # Phenom (RBC, BMO): the requisition ID after /job/
+    ("rbc", "https://jobs.rbc.com/ca/en/job/R-0000123/Summer-Intern", phenom.JOB_PATH_ID, "rbc_R-0000123"),
+    (
+        "rbc", "https://jobs.rbc.com/ca/en/job/R-0000123/Summer-Intern?utm_source=linkedin#apply",
+        phenom.JOB_PATH_ID, "rbc_R-0000123",
+    ),
+    ("bmo", "https://jobs.bmo.com/global/en/job/R240012345/Summer-Analyst", phenom.JOB_PATH_ID, "bmo_R240012345"),
+    # CIBC: numeric /job/<id> paths, else a digest of the Workday link
+    ("cibc", "https://careers.cibc.com/job/12345/intern", JOB_PATH_ID, "cibc_12345"),
+    (
+        "cibc", "https://cibc.wd3.myworkdayjobs.com/search/job/Toronto-ON/Co-op-Student_2512345",
+        JOB_PATH_ID, "cibc_07bc645250e368be",
+    ),
+    (
+        "cibc", "https://cibc.wd3.myworkdayjobs.com/search/job/Toronto-ON/Co-op-Student_2512345/",
+        JOB_PATH_ID, "cibc_07bc645250e368be",
+    ),
+    # Interac: /careers/<id> and /jobs/<id>, else a digest
+    ("interac", "https://www.interac.ca/en/careers/4567/", InteracScraper.JOB_ID_PATTERN, "interac_4567"),
+    ("interac", "https://www.interac.ca/en/jobs/4567?source=indeed", InteracScraper.JOB_ID_PATTERN, "interac_4567"),
+    (
+        "interac", "https://www.interac.ca/en/about/careers/openings/",
+        InteracScraper.JOB_ID_PATTERN, "interac_75a0381890dcf213",
+    ),
+    # Google: /jobs/results/<id>-<slug>
+    (
+        "google", "https://careers.google.com/jobs/results/1234567890-software-engineering-intern/?hl=en",
+        GoogleScraper.JOB_ID_PATTERN, "google_1234567890",
+    ),
+])
+def test_job_id_from_url(prefix, url, pattern, job_id):
+    assert job_id_from_url(prefix, url, pattern) == job_id
+
+
+def test_google_placeholder_links_are_told_apart_by_title_and_location():
+    toronto = GoogleScraper.job_id("https://careers.google.com/", "Software Engineering Intern", "Toronto, ON, Canada")
+    waterloo = GoogleScraper.job_id("https://careers.google.com", "Software Engineering Intern", "Waterloo, ON, Canada")
+
+    assert toronto == "google_5f3ee10990a5a6e5"
+    assert waterloo == "google_8d7ecc825c30ca37"
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.ingest import deactivate_missing_jobs, store_jobs, store_jobs_per_row
+from models import JobPosting
+
+T0 = datetime(2026, 1, 1, 12, 0)
+T1 = T0 + timedelta(minutes=5)
+
+
+def rbc_jobs(*numbers):
+    return [
+        {"id": f"rbc_{n}", "company": "RBC", "title": f"Intern {n}", "url": f"https://jobs.rbc.com/ca/en/job/{n}"}
+        for n in numbers
+    ]
+
+
+def last_seen(db):
+    return {job.id: job.last_seen for job in db.query(JobPosting)}
+
+
+@pytest.mark.parametrize("store", [store_jobs, store_jobs_per_row])
+def test_last_seen_never_moves_backwards(db, store):
+    store(db, rbc_jobs(0, 1, 2), seen_at=T1)
+    db.commit()
+    # A run that started earlier (e.g., a filtered scrape) finishes writing after the later one
+    store(db, rbc_jobs(0), seen_at=T0)
+    db.commit()
+
+    assert last_seen(db) == {"rbc_0": T1, "rbc_1": T1, "rbc_2": T1}
+
+
+@pytest.mark.parametrize("store", [store_jobs, store_jobs_per_row])
+def test_late_earlier_write_does_not_deactivate_jobs_just_seen(db, store):
+    store(db, rbc_jobs(0, 1, 2), seen_at=T1)
+    db.commit()
+    store(db, rbc_jobs(0), seen_at=T0)
+    db.commit()
+    deactivated = deactivate_missing_jobs(db, "rbc_", T1)
+    db.commit()
+
+    assert deactivated == 0
+    assert all(job.is_active for job in db.query(JobPosting))
+
+
+@pytest.mark.parametrize("store", [store_jobs, store_jobs_per_row])
+def test_filtered_run_overlapping_unfiltered_run_only_deactivates_missing_jobs(db, store):
+    store(db, rbc_jobs(0, 1, 2, 3), seen_at=T0 - timedelta(hours=1))
+    db.commit()
+    # The unfiltered run starts at T1 and no longer finds rbc_3
+    store(db, rbc_jobs(0, 1, 2), seen_at=T1)
+    db.commit()
+    # A filtered run that started at T0 writes its subset while the unfiltered run is still going
+    store(db, rbc_jobs(0, 1), seen_at=T0)
+    db.commit()
+    # Only the unfiltered run reconciles
+    deactivated = deactivate_missing_jobs(db, "rbc_", T1)
+    db.commit()
+
+    assert deactivated == 1
+    assert {job.id: job.is_active for job in db.query(JobPosting)} == {
+        "rbc_0": True, "rbc_1": True, "rbc_2": True, "rbc_3": False
+    }
+
+
+def test_newer_write_still_advances_last_seen(db):
+    store_jobs(db, rbc_jobs(0), seen_at=T0)
+    store_jobs(db, rbc_jobs(0), seen_at=T1)
+    db.commit()
+
+    job = db.get(JobPosting, "rbc_0")
+    assert job.last_seen == T1
+    assert job.scraped_count == 2
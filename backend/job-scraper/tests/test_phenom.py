@@ -0,0 +1,48 @@
+import json
+
+from scrapers.phenom import DETAIL_KEY, SEARCH_KEY, _find_ddo_object, extract_job_detail, extract_search_results
+
+SEARCH = {"totalHits": 2, "hits": 10, "data": {"jobs": [{"jobId": "R-1", "title": "Intern {Summer}"}]}}
+
+
+def page(ddo: str, before: str = "") -> str:
+    return f"<html><head><script>{before}\nphApp.ddo = {ddo};\n</script></head><body></body></html>"
+
+
+def test_finds_the_object_under_the_key():
+    html = page(f'{{"siteConfig": {{}}, "eagerLoadRefineSearch": {json.dumps(SEARCH)}, "other": 1}}')
+
+    assert _find_ddo_object(html, SEARCH_KEY) == SEARCH
+    assert extract_search_results(html) == SEARCH
+
+
+def test_skips_the_key_where_it_is_not_followed_by_an_object():
+    ddo = (
+        '{"config": {"eagerLoadRefineSearch": "enabled"}, '
+        f'"eagerLoadRefineSearch":\n    {json.dumps(SEARCH)}}}'
+    )
+
+    assert _find_ddo_object(page(ddo), SEARCH_KEY) == SEARCH
+
+
+def test_ignores_the_key_before_the_ddo():
+    html = page('{"eagerLoadRefineSearch": {"totalHits": 1}}', before='var cache = {"jobDetail": {"data": {}}};')
+
+    assert _find_ddo_object(html, DETAIL_KEY) is None
+
+
+def test_missing_ddo_or_key():
+    assert _find_ddo_object("<html><body>No Phenom here</body></html>", SEARCH_KEY) is None
+    assert _find_ddo_object(page('{"jobDetail": {"data": {}}}'), SEARCH_KEY) is None
+
+
+def test_malformed_object_is_none():
+    assert _find_ddo_object(page('{"eagerLoadRefineSearch": {"totalHits": 2,'), SEARCH_KEY) is None
+
+
+def test_extract_job_detail():
+    job = {"title": "Analyst Intern", "description": "<p>Join us</p>"}
+
+    assert extract_job_detail(page(json.dumps({"jobDetail": {"data": {"job": job}}}))) == job
+    assert extract_job_detail(page(json.dumps({"jobDetail": {"data": {"job": None}}}))) is None
+    assert extract_job_detail(page(json.dumps({"jobDetail": {"status": 404}}))) is None
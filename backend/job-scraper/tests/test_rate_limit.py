@@ -0,0 +1,63 @@
+import pytest
+
+from scrapers import rate_limit
+from scrapers.rate_limit import TokenBucket, _parse_host_limits
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_burst_goes_out_without_waiting(clock):
+    bucket = TokenBucket(rate=2, burst=4)
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, 0]
+
+
+def test_reservations_past_the_burst_queue_at_the_rate(clock):
+    bucket = TokenBucket(rate=2, burst=4)
+    for _ in range(4):
+        bucket.reserve()
+
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.5, 1.0, 1.5])
+
+
+def test_tokens_refill_over_time_up_to_the_burst(clock):
+    bucket = TokenBucket(rate=2, burst=4)
+    for _ in range(5):
+        bucket.reserve()
+
+    clock.now += 1.5  # Pays back the one token owed and refills two
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0, 0, 0.5])
+
+    clock.now += 60  # Idle time never banks more than the burst
+    assert [bucket.reserve() for _ in range(5)] == pytest.approx([0, 0, 0, 0, 0.5])
+
+
+def test_burst_is_at_least_one(clock):
+    bucket = TokenBucket(rate=1, burst=0)
+
+    assert [bucket.reserve(), bucket.reserve()] == pytest.approx([0, 1])
+
+
+def test_zero_rate_disables_limiting(clock):
+    bucket = TokenBucket(rate=0, burst=1)
+
+    assert [bucket.reserve() for _ in range(10)] == [0.0] * 10
+
+
+def test_host_limits_parsing():
+    limits = _parse_host_limits(" API.example.com=5:10, slow.example.com=0.5, bad-entry, other.example.com=x ")
+
+    assert limits == {"api.example.com": (5.0, 10.0), "slow.example.com": (0.5, 0.5)}
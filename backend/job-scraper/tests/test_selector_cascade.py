@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup, Tag
+
+from scrapers.bmo_scraper import BMOScraper
+from scrapers.cibc_scraper import CIBCScraper
+from scrapers.html_parser import parse_document
+from scrapers.interac_scraper import InteracScraper
+from scrapers.rbc_scraper import RBCScraper
+from scrapers.selector_cascade import Cascade, CascadeExtractor, has_href
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bmo_sample.html")
+
+EXTRACTORS = {
+    "rbc": RBCScraper.SELECTORS,
+    "bmo": BMOScraper.SELECTORS,
+    "cibc": CIBCScraper.SELECTORS,
+    "interac": InteracScraper.SELECTORS,
+}
+
+
+def naive_extract(extractor, element):
+    """The select_one cascade CascadeExtractor.extract replaces"""
+    fields = {}
+    for name, cascade in extractor.fields.items():
+        fields[name] = None
+        for selector in cascade.selectors:
+            match = element.select_one(selector)
+            if match is not None and (cascade.require is None or cascade.require(match)):
+                fields[name] = match
+                break
+    return fields
+
+
+@pytest.fixture(scope="module")
+def sample():
+    with open(SAMPLE, encoding="utf-8") as f:
+        return parse_document(f.read())
+
+
+@pytest.mark.parametrize("key", EXTRACTORS)
+def test_extract_matches_select_one_cascade_on_bmo_sample(sample, key):
+    extractor = EXTRACTORS[key]
+    elements = [sample, *(tag for tag in sample.descendants if isinstance(tag, Tag))]
+
+    for element in elements:
+        fields = extractor.extract(element)
+        expected = naive_extract(extractor, element)
+        assert all(fields[name] is expected[name] for name in fields), element.name
+
+
+def test_extract_prefers_selector_order_over_document_order():
+    extractor = CascadeExtractor(
+        containers=[".job"],
+        fields={
+            "title": Cascade([".job-title a", "h3"]),
+            "url": Cascade(["a.primary", 'a[href*="/job/"]'], require=has_href),
+            "location": Cascade([".location"]),
+        },
+    )
+    soup = BeautifulSoup(
+        '<div class="job"><h3>Heading</h3><a class="primary">No link</a>'
+        '<div class="job-title"><a href="/job/1">Analyst Intern</a></div></div>',
+        "html.parser",
+    )
+    element = soup.select_one(".job")
+
+    fields = extractor.extract(element)
+
+    assert fields == naive_extract(extractor, element)
+    assert fields["title"].get_text() == "Analyst Intern"
+    # a.primary's first match has no href, so the cascade falls through to the next selector
+    assert fields["url"]["href"] == "/job/1"
+    assert fields["location"] is None
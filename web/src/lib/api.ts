@@ -7,7 +7,7 @@ export interface JobPosting {
   team: string | null;
   location: string | null;
   url: string;
-  description: string | null;
+  description?: string | null;
   first_seen: string;
   last_seen: string;
   is_active: boolean;